@@ -0,0 +1,28 @@
+"""coin keyset pagination indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_coins_rank_id", "coins", ["market_cap_rank", "id"])
+    op.create_index("ix_coins_price_id", "coins", ["price_usd", "id"])
+    op.create_index("ix_coins_symbol_id", "coins", ["symbol", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_coins_symbol_id", table_name="coins")
+    op.drop_index("ix_coins_price_id", table_name="coins")
+    op.drop_index("ix_coins_rank_id", table_name="coins")
@@ -0,0 +1,32 @@
+"""price history table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_points",
+        sa.Column("coin_id", sa.Integer(), nullable=False),
+        sa.Column("ts", sa.DateTime(), nullable=False),
+        sa.Column("price_usd", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["coin_id"], ["coins.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("coin_id", "ts", name="pk_price_points"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("price_points")
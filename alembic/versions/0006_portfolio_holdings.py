@@ -0,0 +1,33 @@
+"""portfolio holdings: quantity and cost basis
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("portfolio") as batch:
+        batch.add_column(
+            sa.Column("quantity", sa.Float(), server_default="0", nullable=False)
+        )
+        batch.add_column(
+            sa.Column("cost_basis_usd", sa.Float(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("portfolio") as batch:
+        batch.drop_column("cost_basis_usd")
+        batch.drop_column("quantity")
@@ -0,0 +1,42 @@
+"""price alerts table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_alerts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("coin_id", sa.Integer(), nullable=False),
+        sa.Column("direction", sa.String(length=5), nullable=False),
+        sa.Column("threshold", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(), nullable=True),
+        sa.Column("triggered_price", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["coin_id"], ["coins.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_price_alerts_user_id", "price_alerts", ["user_id", "id"])
+    op.create_index("ix_price_alerts_created_at", "price_alerts", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_price_alerts_created_at", table_name="price_alerts")
+    op.drop_index("ix_price_alerts_user_id", table_name="price_alerts")
+    op.drop_table("price_alerts")
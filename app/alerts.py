@@ -0,0 +1,228 @@
+"""In-memory price alert index and the queue of triggered alerts.
+
+Every untriggered alert sits in a per-coin pair of sorted threshold arrays
+("above" and "below") with parallel id arrays. When a refresh moves a coin
+from `old` to `new`, the alerts it crossed are one contiguous slice of one
+of them, found with two bisects:
+
+    rising:  "above" alerts with old <  threshold <= new
+    falling: "below" alerts with new <= threshold <  old
+
+so a refresh costs O(changed coins * log alerts-per-coin) plus the alerts
+actually crossed, however many alerts are armed. Alerts fire on a crossing,
+not on a level: one created while the price is already past its threshold
+waits for the price to come back and cross it.
+
+The index is process-local, like the caches. CoinService syncs it from the
+database before each refresh: first a full load, then the alerts created
+since ALERT_SYNC_OVERLAP_SECONDS before the newest created_at seen, skipping
+ids already indexed. Ids are no watermark on Postgres, where a lower id can
+commit after a higher one; the overlap catches rows whose transaction
+committed late. The database stays the arbiter: crossed ids are
+stamped with a conditional UPDATE, so an alert deleted or already fired
+elsewhere is simply not returned. Anything that leaves the index unsure of
+its state (a failed refresh) invalidates it and the next sync reloads.
+"""
+import asyncio
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Iterable
+
+from app.config import settings
+from app.repositories.alert import AlertRepository, AlertRow
+from app.repositories.price_history import Point
+
+
+_LOAD_CHUNK = 10_000
+
+
+class _Side:
+    """Thresholds kept sorted, with the alert id at the same position."""
+
+    __slots__ = ("thresholds", "ids")
+
+    def __init__(self) -> None:
+        self.thresholds = array("d")
+        self.ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add_many(self, pairs: list[tuple[float, int]]) -> None:
+        if len(pairs) == 1:
+            threshold, alert_id = pairs[0]
+            pos = bisect_right(self.thresholds, threshold)
+            self.thresholds.insert(pos, threshold)
+            self.ids.insert(pos, alert_id)
+            return
+        merged = sorted([*zip(self.thresholds, self.ids), *pairs])
+        self.thresholds = array("d", (t for t, _ in merged))
+        self.ids = array("q", (i for _, i in merged))
+
+    def take(self, lo: int, hi: int) -> list[int]:
+        if lo >= hi:
+            return []
+        taken = self.ids[lo:hi].tolist()
+        del self.thresholds[lo:hi]
+        del self.ids[lo:hi]
+        return taken
+
+    def discard(self, threshold: float, alert_id: int) -> bool:
+        lo = bisect_left(self.thresholds, threshold)
+        hi = bisect_right(self.thresholds, threshold, lo)
+        for pos in range(lo, hi):
+            if self.ids[pos] == alert_id:
+                del self.thresholds[pos]
+                del self.ids[pos]
+                return True
+        return False
+
+
+class _CoinAlerts:
+    __slots__ = ("above", "below")
+
+    def __init__(self) -> None:
+        self.above = _Side()
+        self.below = _Side()
+
+
+class AlertIndex:
+    def __init__(self) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.loaded = False
+        self._coins: dict[int, _CoinAlerts] = {}
+        self._last_price: dict[int, float] = {}
+        self._ids: set[int] = set()
+        self._watermark: datetime | None = None
+
+    def __len__(self) -> int:
+        return sum(len(c.above) + len(c.below) for c in self._coins.values())
+
+    def add(self, rows: Iterable[AlertRow]) -> None:
+        """Index (id, coin_id, direction, threshold) rows; known ids are skipped."""
+        fresh = [row for row in rows if row[0] not in self._ids]
+        self._ids.update(row[0] for row in fresh)
+        ordered = sorted(fresh, key=lambda row: (row[1], row[2]))
+        for (coin_id, direction), group in groupby(ordered, key=lambda row: (row[1], row[2])):
+            pairs = [(threshold, alert_id) for alert_id, _, _, threshold in group]
+            coin = self._coins.get(coin_id)
+            if coin is None:
+                coin = self._coins[coin_id] = _CoinAlerts()
+            (coin.above if direction == "above" else coin.below).add_many(pairs)
+
+    def set_prices(self, prices: Iterable[tuple[int, float]]) -> None:
+        self._last_price.update(prices)
+
+    async def sync(self, repo: AlertRepository) -> None:
+        """Pick up alerts created since the last sync (everything, the first time)."""
+        if not self.loaded:
+            self.invalidate()
+            # Read first: anything committed during the load is newer.
+            self._watermark = await repo.newest_created_at()
+            self.set_prices(await repo.current_prices())
+            after = 0
+            while True:
+                rows = await repo.active_after(after, _LOAD_CHUNK)
+                self.add(rows)
+                if len(rows) < _LOAD_CHUNK:
+                    break
+                after = rows[-1][0]
+            self.loaded = True
+
+        since = None
+        if self._watermark is not None:
+            since = self._watermark - timedelta(seconds=settings.ALERT_SYNC_OVERLAP_SECONDS)
+        rows = await repo.active_created_since(since)
+        self.add(row[:4] for row in rows)
+        if rows:
+            newest = max(row[4] for row in rows)
+            self._watermark = newest if self._watermark is None else max(self._watermark, newest)
+
+    def evaluate(self, points: Iterable[Point]) -> list[int]:
+        """Remove and return the ids of alerts crossed by these new prices."""
+        crossed: list[int] = []
+        for coin_id, _, price in points:
+            old = self._last_price.get(coin_id)
+            self._last_price[coin_id] = price
+            if old is None or old == price:
+                continue
+            coin = self._coins.get(coin_id)
+            if coin is None:
+                continue
+            if price > old:
+                side = coin.above
+                crossed += side.take(
+                    bisect_right(side.thresholds, old), bisect_right(side.thresholds, price)
+                )
+            else:
+                side = coin.below
+                crossed += side.take(
+                    bisect_left(side.thresholds, price), bisect_left(side.thresholds, old)
+                )
+        self._ids.difference_update(crossed)
+        return crossed
+
+    def discard(self, alert_id: int, coin_id: int, direction: str, threshold: float) -> None:
+        coin = self._coins.get(coin_id)
+        if coin is not None:
+            (coin.above if direction == "above" else coin.below).discard(threshold, alert_id)
+        self._ids.discard(alert_id)
+
+
+@dataclass(frozen=True, slots=True)
+class TriggeredAlert:
+    id: int
+    user_id: int
+    coin_id: int
+    direction: str
+    threshold: float
+    price_usd: float
+    triggered_at: datetime
+
+
+class AlertDeliveryQueue:
+    """Bounded hand-off from refreshes to whatever delivers notifications.
+
+    Refreshes never wait on delivery: past `maxlen` pending alerts the
+    oldest are dropped and counted (they stay recorded as triggered in the
+    database). A consumer loops on `next_batch()`.
+    """
+
+    def __init__(self, maxlen: int) -> None:
+        self.dropped = 0
+        self._pending: deque[TriggeredAlert] = deque(maxlen=maxlen)
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def publish(self, alerts: list[TriggeredAlert]) -> None:
+        if not alerts:
+            return
+        overflow = len(self._pending) + len(alerts) - self._pending.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+        self._pending.extend(alerts)
+        self._ready.set()
+
+    async def next_batch(self) -> list[TriggeredAlert]:
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._pending)
+        self._pending.clear()
+        return batch
+
+    def reset(self) -> None:
+        self.dropped = 0
+        self._pending.clear()
+        self._ready.clear()
+
+
+alert_index = AlertIndex()
+alert_deliveries = AlertDeliveryQueue(settings.ALERT_DELIVERY_QUEUE_SIZE)
@@ -0,0 +1,117 @@
+"""In-process fan-out of price changes to /coins/stream subscribers.
+
+CoinService publishes the price points each refresh committed; every
+subscriber gets the ones matching its coin-id filter. Each subscriber owns a
+bounded deque: a consumer that falls behind loses its *oldest* pending
+updates (counted in `dropped`) instead of growing memory or slowing the
+refresh. An idle subscriber is one deque and one Event, nothing per update.
+
+Process-local, like the caches: each worker streams the refreshes it ran.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
+from app.config import settings
+from app.repositories.price_history import Point
+
+
+@dataclass(frozen=True, slots=True)
+class PriceUpdate:
+    coin_id: int
+    price_usd: float
+    ts: datetime
+
+    def as_dict(self) -> dict:
+        return {"coin_id": self.coin_id, "price_usd": self.price_usd, "ts": self.ts}
+
+
+class Subscription:
+    __slots__ = ("coin_ids", "dropped", "_pending", "_ready")
+
+    def __init__(self, coin_ids: frozenset[int] | None, maxlen: int) -> None:
+        self.coin_ids = coin_ids
+        self.dropped = 0
+        self._pending: deque[PriceUpdate] = deque(maxlen=maxlen)
+        self._ready = asyncio.Event()
+
+    def offer(self, updates: list[PriceUpdate]) -> None:
+        overflow = len(self._pending) + len(updates) - self._pending.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+        self._pending.extend(updates)
+        self._ready.set()
+
+    async def next_batch(self) -> tuple[list[PriceUpdate], int]:
+        """Wait for updates; return everything pending and the drops since last call."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._pending)
+        self._pending.clear()
+        dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+
+class PriceBroadcaster:
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._everything: set[Subscription] = set()
+        self._by_coin: dict[int, set[Subscription]] = {}
+        self._last_price: dict[int, float] = {}
+        self.subscribers = 0
+
+    def subscribe(self, coin_ids: Iterable[int] | None = None) -> Subscription:
+        ids = frozenset(coin_ids) if coin_ids else None
+        subscription = Subscription(ids, self.queue_size)
+        self.subscribers += 1
+        if ids is None:
+            self._everything.add(subscription)
+        else:
+            for coin_id in ids:
+                self._by_coin.setdefault(coin_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers -= 1
+        if subscription.coin_ids is None:
+            self._everything.discard(subscription)
+            return
+        for coin_id in subscription.coin_ids:
+            subs = self._by_coin.get(coin_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._by_coin[coin_id]
+
+    def publish(self, points: Iterable[Point]) -> int:
+        """Fan out points whose price differs from the last one published.
+
+        Returns the number of price changes published.
+        """
+        changes: list[PriceUpdate] = []
+        for coin_id, ts, price in points:
+            if self._last_price.get(coin_id) != price:
+                self._last_price[coin_id] = price
+                changes.append(PriceUpdate(coin_id, price, ts))
+        if not changes:
+            return 0
+
+        if self._everything:
+            for subscription in self._everything:
+                subscription.offer(changes)
+        if self._by_coin:
+            per_subscriber: dict[Subscription, list[PriceUpdate]] = {}
+            for update in changes:
+                for subscription in self._by_coin.get(update.coin_id, ()):
+                    per_subscriber.setdefault(subscription, []).append(update)
+            for subscription, updates in per_subscriber.items():
+                subscription.offer(updates)
+        return len(changes)
+
+    def reset(self) -> None:
+        self._last_price.clear()
+
+
+price_broadcaster = PriceBroadcaster(settings.STREAM_QUEUE_SIZE)
@@ -0,0 +1,132 @@
+"""Process-local caches for hot read paths.
+
+The coin list only changes when a refresh commits, so GET /coins is served
+from a snapshot keyed by a version number that refresh_from_provider bumps.
+The TTL bounds staleness when a *different* worker process did the refresh.
+
+Snapshots hold the response body already encoded, so a cache hit is a dict
+lookup plus a bytes write — no per-row Pydantic validation or
+jsonable_encoder pass. orjson is used when installed; it is optional.
+
+Portfolio performance series are cached per (user, range, step) in a small
+LRU that a refresh clears wholesale and a holdings change clears per user.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Hashable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+from app.config import settings
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dump_json(rows: Any) -> bytes:
+    """Encode plain dict rows the way the CoinResponse schema would."""
+    if orjson is not None:
+        return orjson.dumps(rows)
+    return json.dumps(rows, default=_default, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True)
+class CoinListSnapshot:
+    version: int
+    body: bytes
+    etag: str
+    created_at: float
+
+
+class CoinListCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: CoinListSnapshot | None = None
+
+    def get(self) -> CoinListSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version:
+            return None
+        if self.ttl and time.monotonic() - snapshot.created_at > self.ttl:
+            return None
+        return snapshot
+
+    def store(self, version: int, rows: list[dict]) -> CoinListSnapshot:
+        """Build a snapshot for `version`; only keep it if no refresh landed meanwhile."""
+        body = dump_json(rows)
+        # Strong ETag derived from content, so every worker agrees on it.
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        snapshot = CoinListSnapshot(version, body, etag, time.monotonic())
+        if version == self.version:
+            self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._snapshot = None
+
+
+class PerformanceCache:
+    """LRU of computed series keyed by (user_id, query).
+
+    `token(user_id)` is taken before computing and handed back to `store`,
+    so a series computed across a refresh or a holdings change is dropped
+    instead of cached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self._user_generations: dict[int, int] = {}
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[float, Any]] = OrderedDict()
+
+    def token(self, user_id: int) -> tuple[int, int]:
+        return self.generation, self._user_generations.get(user_id, 0)
+
+    def get(self, user_id: int, key: Hashable) -> Any | None:
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            return None
+        created_at, value = entry
+        if self.ttl and time.monotonic() - created_at > self.ttl:
+            del self._entries[(user_id, key)]
+            return None
+        self._entries.move_to_end((user_id, key))
+        return value
+
+    def store(self, user_id: int, key: Hashable, token: tuple[int, int], value: Any) -> None:
+        if token != self.token(user_id) or self.max_entries <= 0:
+            return
+        self._entries[(user_id, key)] = (time.monotonic(), value)
+        self._entries.move_to_end((user_id, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Prices changed: every cached series is stale."""
+        self.generation += 1
+        self._entries.clear()
+
+    def invalidate_user(self, user_id: int) -> None:
+        """This user's holdings changed."""
+        self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+        for cached in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[cached]
+
+
+coin_list_cache = CoinListCache(settings.COINS_CACHE_TTL_SECONDS)
+performance_cache = PerformanceCache(
+    settings.PERFORMANCE_CACHE_MAX_ENTRIES, settings.PERFORMANCE_CACHE_TTL_SECONDS
+)
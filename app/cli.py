@@ -0,0 +1,34 @@
+"""Operational commands.
+
+    python -m app.cli backfill-candles [--coin-id N] [--chunk-size 10000]
+"""
+import argparse
+import asyncio
+
+from app.db import SessionLocal
+from app.services import candles
+
+
+async def _backfill_candles(coin_id: int | None, chunk_size: int) -> None:
+    async with SessionLocal() as db:
+        points, upserts = await candles.backfill(db, coin_id=coin_id, chunk_size=chunk_size)
+    print(f"rebuilt candles from {points} points ({upserts} candle upserts)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-candles", help="rebuild OHLC candles from raw price history"
+    )
+    backfill.add_argument("--coin-id", type=int, default=None)
+    backfill.add_argument("--chunk-size", type=int, default=10_000)
+
+    args = parser.parse_args()
+    if args.command == "backfill-candles":
+        asyncio.run(_backfill_candles(args.coin_id, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,18 +31,162 @@ class Settings:
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    # Verified access tokens kept in memory until they expire; 0 disables.
+    ACCESS_TOKEN_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("ACCESS_TOKEN_CACHE_MAX_ENTRIES", "10000")
+    )
+
+    # bcrypt runs on its own thread pool; beyond workers + queue, or after
+    # waiting `timeout` seconds for a worker, auth requests get a 503.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = float(
+        os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "5")
+    )
 
     DATABASE_URL: str = _normalize_database_url(
         os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./tracker_coin.db")
     )
 
+    # Optional read replicas (comma-separated) for read-only endpoints;
+    # reads go to the primary when none are set or all are ejected.
+    DATABASE_READ_URLS: list[str] = [
+        _normalize_database_url(url.strip())
+        for url in os.getenv("DATABASE_READ_URLS", os.getenv("DATABASE_READ_URL", "")).split(",")
+        if url.strip()
+    ]
+    # A replica that fails with a connection-level error is skipped this long.
+    READ_REPLICA_EJECT_SECONDS: float = float(os.getenv("READ_REPLICA_EJECT_SECONDS", "30"))
+    # After a user changes their portfolio, their reads stay on the primary
+    # for this long so they see their own write despite replica lag.
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Connection pool (Postgres; file-backed SQLite opens a connection per
+    # checkout, so only the pragmas below apply to it).
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = _bool(os.getenv("DB_POOL_PRE_PING"), True)
+    # asyncpg prepared statements cached per connection; 0 behind pgbouncer
+    # in transaction mode.
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+    # Applied to every new SQLite connection.
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
     COINGECKO_URL: str = os.getenv(
         "COINGECKO_URL", "https://api.coingecko.com/api/v3/coins/markets"
     )
     COINCAP_API_KEY: str | None = os.getenv("COINCAP_API_KEY") or None
     COINCAP_URL: str = os.getenv("COINCAP_URL", "https://rest.coincap.io/v3/assets")
 
+    # Shared provider HTTP client (app/providers/http.py)
+    PROVIDER_HTTP_TIMEOUT: float = float(os.getenv("PROVIDER_HTTP_TIMEOUT", "15"))
+    PROVIDER_HTTP_MAX_CONNECTIONS: int = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "20"))
+    PROVIDER_HTTP_MAX_KEEPALIVE: int = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE", "10"))
+    PROVIDER_HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("PROVIDER_HTTP_KEEPALIVE_EXPIRY", "30")
+    )
+    PROVIDER_HTTP2: bool = _bool(os.getenv("PROVIDER_HTTP2"), False)
+
+    # Paged market fetch (app/providers/paging.py): top PROVIDER_MARKET_SIZE
+    # coins in pages of PROVIDER_PAGE_SIZE (clamped to each API's maximum).
+    PROVIDER_MARKET_SIZE: int = int(os.getenv("PROVIDER_MARKET_SIZE", "100"))
+    PROVIDER_PAGE_SIZE: int = int(os.getenv("PROVIDER_PAGE_SIZE", "250"))
+    PROVIDER_PAGE_CONCURRENCY: int = int(os.getenv("PROVIDER_PAGE_CONCURRENCY", "4"))
+    PROVIDER_PAGE_RETRIES: int = int(os.getenv("PROVIDER_PAGE_RETRIES", "2"))
+    PROVIDER_PAGE_RETRY_BACKOFF_SECONDS: float = float(
+        os.getenv("PROVIDER_PAGE_RETRY_BACKOFF_SECONDS", "0.5")
+    )
+    # Per-host token bucket shared by all page requests; rate 0 disables it.
+    PROVIDER_HOST_RATE_PER_SECOND: float = float(
+        os.getenv("PROVIDER_HOST_RATE_PER_SECOND", "5")
+    )
+    PROVIDER_HOST_BURST: int = int(os.getenv("PROVIDER_HOST_BURST", "5"))
+
+    # Hedged fetches (app/providers/hedged.py) across the selected API's own
+    # endpoint and PROVIDER_HEDGE_URLS, further endpoints of the same API
+    # (mirrors, another region or plan). CoinCap and CoinGecko are never
+    # hedged against each other: they give the same coin different ids.
+    PROVIDER_HEDGE_ENABLED: bool = _bool(os.getenv("PROVIDER_HEDGE_ENABLED"), True)
+    PROVIDER_HEDGE_URLS: list[str] = [
+        url.strip() for url in os.getenv("PROVIDER_HEDGE_URLS", "").split(",") if url.strip()
+    ]
+    PROVIDER_HEDGE_PERCENTILE: float = float(os.getenv("PROVIDER_HEDGE_PERCENTILE", "95"))
+    PROVIDER_HEDGE_INITIAL_DELAY_SECONDS: float = float(
+        os.getenv("PROVIDER_HEDGE_INITIAL_DELAY_SECONDS", "2")
+    )
+    PROVIDER_HEDGE_MIN_DELAY_SECONDS: float = float(
+        os.getenv("PROVIDER_HEDGE_MIN_DELAY_SECONDS", "0.2")
+    )
+    # Error rates this close together rank as equal; outcomes older than
+    # the max age are forgotten so a demoted provider gets re-probed.
+    PROVIDER_HEDGE_ERROR_TOLERANCE: float = float(
+        os.getenv("PROVIDER_HEDGE_ERROR_TOLERANCE", "0.1")
+    )
+    PROVIDER_STATS_WINDOW: int = int(os.getenv("PROVIDER_STATS_WINDOW", "100"))
+    PROVIDER_STATS_MAX_AGE_SECONDS: float = float(
+        os.getenv("PROVIDER_STATS_MAX_AGE_SECONDS", "600")
+    )
+
+    # Background price refresher (app/services/refresher.py)
+    PRICE_REFRESH_ENABLED: bool = _bool(os.getenv("PRICE_REFRESH_ENABLED"), True)
+    PRICE_REFRESH_INTERVAL_SECONDS: float = float(
+        os.getenv("PRICE_REFRESH_INTERVAL_SECONDS", "60")
+    )
+    PRICE_REFRESH_JITTER: float = float(os.getenv("PRICE_REFRESH_JITTER", "0.1"))
+    PRICE_REFRESH_BACKOFF_BASE_SECONDS: float = float(
+        os.getenv("PRICE_REFRESH_BACKOFF_BASE_SECONDS", "5")
+    )
+    PRICE_REFRESH_BACKOFF_MAX_SECONDS: float = float(
+        os.getenv("PRICE_REFRESH_BACKOFF_MAX_SECONDS", "600")
+    )
+    # Floor between two executed refreshes; callers inside it get the last result.
+    PRICE_REFRESH_MIN_INTERVAL_SECONDS: float = float(
+        os.getenv("PRICE_REFRESH_MIN_INTERVAL_SECONDS", "10")
+    )
+
+    # GET /coins snapshot cache (app/cache.py); 0 disables the TTL.
+    COINS_CACHE_TTL_SECONDS: float = float(os.getenv("COINS_CACHE_TTL_SECONDS", "30"))
+
+    # Postgres upserts of at least this many rows go through COPY into a
+    # staging table plus one merge (app/repositories/bulk.py); 0 disables.
+    BULK_COPY_MIN_ROWS: int = int(os.getenv("BULK_COPY_MIN_ROWS", "2000"))
+
+    # Cached GET /portfolio/performance series, cleared on every refresh;
+    # 0 disables the TTL.
+    PERFORMANCE_CACHE_MAX_ENTRIES: int = int(os.getenv("PERFORMANCE_CACHE_MAX_ENTRIES", "1024"))
+    PERFORMANCE_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PERFORMANCE_CACHE_TTL_SECONDS", "30")
+    )
+
+    # Upper bound on buckets a single history query may return.
+    HISTORY_MAX_POINTS: int = int(os.getenv("HISTORY_MAX_POINTS", "1000"))
+
+    # OHLC resolutions maintained on every refresh (app/services/candles.py)
+    CANDLE_RESOLUTIONS: list[str] = os.getenv("CANDLE_RESOLUTIONS", "1m,1h,1d").split(",")
+
+    # /coins/stream (app/broadcast.py): pending updates kept per subscriber
+    # before the oldest are dropped, and the SSE keep-alive interval.
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+    STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+    # Triggered price alerts waiting for delivery; oldest dropped beyond this.
+    ALERT_DELIVERY_QUEUE_SIZE: int = int(os.getenv("ALERT_DELIVERY_QUEUE_SIZE", "10000"))
+    # How far behind the newest created_at the alert index re-reads on each
+    # sync; must exceed the longest transaction that creates alerts.
+    ALERT_SYNC_OVERLAP_SECONDS: float = float(os.getenv("ALERT_SYNC_OVERLAP_SECONDS", "60"))
+
     RATE_LIMIT_ENABLED: bool = _bool(os.getenv("RATE_LIMIT_ENABLED"), True)
+    # memory:// keeps buckets per process; redis://host:6379/0 (any
+    # Redis-protocol server, needs `pip install redis`) shares them across
+    # workers. The local table holds at most RATE_LIMIT_MAX_KEYS buckets.
+    RATE_LIMIT_STORAGE_URL: str = os.getenv("RATE_LIMIT_STORAGE_URL", "memory://")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
 
 
 settings = Settings()
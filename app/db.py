@@ -1,23 +1,298 @@
-from typing import AsyncIterator
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
 
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.config import settings
+from app.metrics import db_pool_timeouts, db_pool_wait
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            db_pool_wait.observe(waited)
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    pool: str
+    size: int | None
+    checked_in: int | None
+    checked_out: int
+    overflow: int | None
+    checkouts: int | None
+    timeouts: int | None
+    wait_ms_avg: float | None
+    wait_ms_max: float | None
+
+
+def _sqlite_pragmas(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
 
 
 def _build_engine(url: str) -> AsyncEngine:
     connect_args = {}
-    # aiosqlite shares one connection across the app; check_same_thread=False
-    # is required when used in async contexts that hop event-loop threads.
+    options = {}
     if url.startswith("sqlite"):
+        # aiosqlite shares one connection across the app; check_same_thread=False
+        # is required when used in async contexts that hop event-loop threads.
         connect_args["check_same_thread"] = False
-    return create_async_engine(url, connect_args=connect_args, future=True)
+    else:
+        options = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+        if url.startswith("postgresql+asyncpg"):
+            connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    engine = create_async_engine(url, connect_args=connect_args, future=True, **options)
+
+    if url.startswith("sqlite"):
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+class PoolMonitor:
+    """Pool occupancy for /health/db-pool.
+
+    Checked-out connections are counted from pool events rather than read
+    off the pool, because NullPool (file-backed SQLite) keeps no tally.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.checked_out = 0
+        event.listen(engine.sync_engine, "checkout", self._checkout)
+        event.listen(engine.sync_engine, "checkin", self._checkin)
+
+    def _checkout(self, *_) -> None:
+        self.checked_out += 1
+
+    def _checkin(self, *_) -> None:
+        self.checked_out -= 1
+
+    def stats(self) -> PoolStats:
+        pool = self.engine.pool
+        queued = isinstance(pool, QueuePool)
+        timed = isinstance(pool, InstrumentedQueuePool)
+        avg_wait = None
+        if timed and pool.checkouts:
+            avg_wait = pool.wait_seconds_total / pool.checkouts * 1000
+        return PoolStats(
+            pool=type(pool).__name__,
+            size=pool.size() if queued else None,
+            checked_in=pool.checkedin() if queued else None,
+            checked_out=self.checked_out,
+            overflow=max(0, pool.overflow()) if queued else None,
+            checkouts=pool.checkouts if timed else None,
+            timeouts=pool.timeouts if timed else None,
+            wait_ms_avg=avg_wait,
+            wait_ms_max=pool.wait_seconds_max * 1000 if timed else None,
+        )
 
 
 engine: AsyncEngine = _build_engine(settings.DATABASE_URL)
 SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine, autoflush=False, autocommit=False, expire_on_commit=False
 )
+pool_monitor = PoolMonitor(engine)
+
+
+class _ReplicaSyncSession(Session):
+    """The sync half of ReplicaSession, where the failover happens.
+
+    Every read the async session offers (execute, scalar(s), get, stream,
+    refresh, lazy loads) ends up in Session.execute or Session.scalar, so
+    these two are the whole surface.
+    """
+
+    primary: Session | None = None
+    on_failure: Callable[[], None] | None = None
+    failed_over = False
+
+    def execute(self, *args, **kwargs) -> Any:
+        return self._read(super().execute, "execute", *args, **kwargs)
+
+    def scalar(self, *args, **kwargs) -> Any:
+        return self._read(super().scalar, "scalar", *args, **kwargs)
+
+    def _read(self, own: Callable[..., Any], method: str, *args, **kwargs) -> Any:
+        if not self.failed_over:
+            try:
+                return own(*args, **kwargs)
+            except Exception as error:
+                if self.primary is None or not _replica_unhealthy(error):
+                    raise
+                self.failed_over = True
+                if self.on_failure is not None:
+                    self.on_failure()
+        return getattr(self.primary, method)(*args, **kwargs)
+
+
+class ReplicaSession(AsyncSession):
+    """A replica session whose reads fall back to the primary.
+
+    A statement that fails with a connection-level error calls `on_failure`
+    (which ejects the replica) and is re-run on the primary, as is every
+    later statement on this session. Replica sessions only run read-only
+    queries, so re-running one is safe. A streamed result that fails after
+    its first rows arrived is not retried.
+    """
+
+    sync_session_class = _ReplicaSyncSession
+
+    def fall_back_to(self, primary: AsyncSession, on_failure: Callable[[], None]) -> None:
+        self.sync_session.primary = primary.sync_session
+        self.sync_session.on_failure = on_failure
+
+    @property
+    def failed_over(self) -> bool:
+        return self.sync_session.failed_over
+
+
+@dataclass(frozen=True)
+class ReplicaStatus:
+    index: int
+    healthy: bool
+    ejections: int
+
+
+class ReadReplicas:
+    """Round-robin over the DATABASE_READ_URLS engines, skipping ejected ones.
+
+    A replica that fails with a connection-level error (down, unreachable,
+    or a query cancelled by recovery conflict) is ejected for
+    `eject_seconds`, after which it rejoins the rotation.
+    """
+
+    def __init__(self, urls: list[str], eject_seconds: float) -> None:
+        self.eject_seconds = eject_seconds
+        self.engines = [_build_engine(url) for url in urls]
+        self._sessions = [
+            async_sessionmaker(
+                bind=e,
+                class_=ReplicaSession,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+            )
+            for e in self.engines
+        ]
+        self._next = 0
+        self._ejected_until = [0.0] * len(urls)
+        self._ejections = [0] * len(urls)
+
+    def pick(self) -> int | None:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (index + 1) % len(self.engines)
+            if self._ejected_until[index] <= now:
+                return index
+        return None
+
+    def session(self, index: int) -> ReplicaSession:
+        return self._sessions[index]()
+
+    def eject(self, index: int) -> None:
+        self._ejected_until[index] = time.monotonic() + self.eject_seconds
+        self._ejections[index] += 1
+
+    def status(self) -> list[ReplicaStatus]:
+        now = time.monotonic()
+        return [
+            ReplicaStatus(index=i, healthy=until <= now, ejections=self._ejections[i])
+            for i, until in enumerate(self._ejected_until)
+        ]
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+class RecentWrites:
+    """Users who changed data in the last `window` seconds read from the primary."""
+
+    def __init__(self, window: float, max_entries: int = 100_000) -> None:
+        self.window = window
+        self.max_entries = max_entries
+        self._until: dict[int, float] = {}
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._until) >= self.max_entries:
+            self._until = {u: t for u, t in self._until.items() if t > now}
+        self._until[user_id] = now + self.window
+
+    def is_recent(self, user_id: int) -> bool:
+        return self._until.get(user_id, 0.0) > time.monotonic()
+
+    def clear(self) -> None:
+        self._until.clear()
+
+
+read_replicas = ReadReplicas(settings.DATABASE_READ_URLS, settings.READ_REPLICA_EJECT_SECONDS)
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _replica_unhealthy(error: BaseException) -> bool:
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated or isinstance(
+            error, (exc.OperationalError, exc.InterfaceError)
+        )
+    return isinstance(error, OSError)
+
+
+@asynccontextmanager
+async def read_session(primary: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """A session on the next healthy replica, or `primary` if there is none.
+
+    A replica that fails mid-request is ejected and the failed read is
+    retried on `primary` (see ReplicaSession). Process-local like the
+    caches: each worker keeps its own rotation and ejection state.
+    """
+    index = read_replicas.pick()
+    if index is None:
+        yield primary
+        return
+    async with read_replicas.session(index) as session:
+        session.fall_back_to(primary, lambda: read_replicas.eject(index))
+        yield session
 
 
 async def get_db() -> AsyncIterator[AsyncSession]:
@@ -1,21 +1,25 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_db, read_session, recent_writes
 from app.providers import get_price_provider
 from app.providers.base import PriceProvider
+from app.repositories.alert import AlertRepository
 from app.repositories.coin import CoinRepository
 from app.repositories.portfolio import PortfolioRepository
+from app.repositories.price_history import PriceHistoryRepository
 from app.repositories.refresh_token import RefreshTokenRepository
 from app.repositories.user import UserRepository
-from app.security import decode_access_token
+from app.security import access_token_cache
+from app.services.alert import AlertService
 from app.services.auth import AuthService
-from app.services.coin import CoinService
+from app.services.coin import CoinService, build_coin_service
 from app.services.portfolio import PortfolioService
+from app.services.refresher import PriceRefresher, refresher
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -28,14 +32,16 @@ class CurrentUser(BaseModel):
     email: str
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> CurrentUser:
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> CurrentUser:
+    # async: no I/O here, and a sync dependency would cost a threadpool hop
+    # per request (and share the token cache across threads).
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = decode_access_token(token)
+        payload = access_token_cache.decode(token)
     except ValueError:
         raise credentials_exception
 
@@ -49,6 +55,25 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> CurrentUs
 CurrentUserDep = Annotated[CurrentUser, Depends(get_current_user)]
 
 
+async def get_read_db(db: DbDep) -> AsyncIterator[AsyncSession]:
+    """Session for read-only queries: a read replica when configured, else `db`."""
+    async with read_session(db) as session:
+        yield session
+
+
+async def get_user_read_db(user: CurrentUserDep, db: DbDep) -> AsyncIterator[AsyncSession]:
+    """Like get_read_db, but a user who just wrote reads their write from the primary."""
+    if recent_writes.is_recent(user.id):
+        yield db
+        return
+    async with read_session(db) as session:
+        yield session
+
+
+ReadDbDep = Annotated[AsyncSession, Depends(get_read_db)]
+UserReadDbDep = Annotated[AsyncSession, Depends(get_user_read_db)]
+
+
 def get_provider() -> PriceProvider:
     return get_price_provider()
 
@@ -58,15 +83,31 @@ def get_auth_service(db: DbDep) -> AuthService:
 
 
 def get_coin_service(
-    db: DbDep, provider: Annotated[PriceProvider, Depends(get_provider)]
+    db: DbDep, read_db: ReadDbDep, provider: Annotated[PriceProvider, Depends(get_provider)]
 ) -> CoinService:
-    return CoinService(db, CoinRepository(db), provider)
+    return build_coin_service(db, provider, read_db)
+
+
+def get_portfolio_service(db: DbDep, read_db: UserReadDbDep) -> PortfolioService:
+    return PortfolioService(
+        db,
+        PortfolioRepository(db),
+        CoinRepository(db),
+        PriceHistoryRepository(db),
+        read_portfolio=PortfolioRepository(read_db),
+    )
+
+
+def get_alert_service(db: DbDep) -> AlertService:
+    return AlertService(db, AlertRepository(db), CoinRepository(db))
 
 
-def get_portfolio_service(db: DbDep) -> PortfolioService:
-    return PortfolioService(db, PortfolioRepository(db), CoinRepository(db))
+def get_refresher() -> PriceRefresher:
+    return refresher
 
 
+AlertServiceDep = Annotated[AlertService, Depends(get_alert_service)]
 AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
 CoinServiceDep = Annotated[CoinService, Depends(get_coin_service)]
 PortfolioServiceDep = Annotated[PortfolioService, Depends(get_portfolio_service)]
+RefresherDep = Annotated[PriceRefresher, Depends(get_refresher)]
@@ -1,9 +1,11 @@
 """Domain exceptions. Services raise these; the FastAPI layer translates them to HTTP."""
+import math
 
 
 class DomainError(Exception):
     status_code: int = 400
     detail: str = "Domain error"
+    headers: dict[str, str] | None = None
 
     def __init__(self, detail: str | None = None) -> None:
         if detail is not None:
@@ -31,6 +33,16 @@ class CoinNotFound(DomainError):
     detail = "Coin not found"
 
 
+class InvalidCursor(DomainError):
+    status_code = 400
+    detail = "Invalid or mismatched pagination cursor"
+
+
+class InvalidTimeRange(DomainError):
+    status_code = 400
+    detail = "Invalid time range"
+
+
 class AlreadyInPortfolio(DomainError):
     status_code = 409
     detail = "Coin already in portfolio"
@@ -41,6 +53,25 @@ class NotInPortfolio(DomainError):
     detail = "Coin not in portfolio"
 
 
+class RateLimited(DomainError):
+    status_code = 429
+    detail = "Rate limit exceeded"
+
+    def __init__(self, rate: str, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded: {rate}")
+        self.headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+class ServiceBusy(DomainError):
+    status_code = 503
+    detail = "Server busy, try again shortly"
+
+
 class ProviderUnavailable(DomainError):
     status_code = 502
     detail = "Upstream price provider failed"
+
+
+class AlertNotFound(DomainError):
+    status_code = 404
+    detail = "Alert not found"
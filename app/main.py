@@ -1,11 +1,34 @@
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.config import settings
+from app.db import pool_monitor, read_replicas
 from app.exceptions import DomainError
-from app.rate_limit import limiter
-from app.routers import auth, coins, portfolio
+from app.metrics import CONTENT_TYPE, CallbackGauge, MetricsMiddleware, registry
+from app.providers.http import close_http_client, get_http_client
+from app.security import access_token_cache, password_hasher
+from app.routers import alerts, auth, coins, portfolio
+from app.services.refresher import refresher
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # One pooled HTTP client for the whole process; providers reuse its
+    # keep-alive connections instead of re-handshaking on every refresh.
+    get_http_client()
+    if settings.PRICE_REFRESH_ENABLED:
+        refresher.start()
+    try:
+        yield
+    finally:
+        await refresher.stop()
+        await close_http_client()
+        password_hasher.shutdown()
+        await read_replicas.dispose()
 
 
 app = FastAPI(
@@ -17,23 +40,24 @@ app = FastAPI(
         "Railway deploy config."
     ),
     version="3.0.0-tier3",
+    lifespan=lifespan,
 )
+app.add_middleware(MetricsMiddleware)
 
-# Rate limiting (slowapi)
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-
-
-@app.exception_handler(RateLimitExceeded)
-async def handle_rate_limit(_: Request, exc: RateLimitExceeded) -> JSONResponse:
-    return JSONResponse(
-        status_code=429, content={"detail": f"Rate limit exceeded: {exc.detail}"}
+registry.register(
+    CallbackGauge(
+        "db_pool_checked_out",
+        "Database connections currently checked out of the primary pool.",
+        lambda: pool_monitor.checked_out,
     )
+)
 
 
 @app.exception_handler(DomainError)
 async def handle_domain_error(_: Request, exc: DomainError) -> JSONResponse:
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers
+    )
 
 
 @app.get("/health", tags=["meta"])
@@ -41,6 +65,37 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["meta"], response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request, provider, upsert and pool metrics."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/health/password-hasher", tags=["meta"])
+async def password_hasher_health() -> dict:
+    """bcrypt pool occupancy, queue depth, rejections and latency percentiles."""
+    return asdict(password_hasher.stats())
+
+
+@app.get("/health/token-cache", tags=["meta"])
+async def token_cache_health() -> dict:
+    """Verified access-token cache size and hit/miss counters."""
+    return asdict(access_token_cache.stats())
+
+
+@app.get("/health/db-pool", tags=["meta"])
+async def db_pool_health() -> dict:
+    """Database connections checked out/idle, overflow in use, and checkout wait time."""
+    return asdict(pool_monitor.stats())
+
+
+@app.get("/health/read-replicas", tags=["meta"])
+async def read_replicas_health() -> list[dict]:
+    """Configured read replicas, whether each is in rotation, and times ejected."""
+    return [asdict(status) for status in read_replicas.status()]
+
+
 app.include_router(auth.router)
 app.include_router(coins.router)
 app.include_router(portfolio.router)
+app.include_router(alerts.router)
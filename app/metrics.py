@@ -0,0 +1,293 @@
+"""Prometheus metrics, rendered in the text exposition format at /metrics.
+
+Counters, gauges and histograms are plain Python numbers in dicts keyed by
+label values. Everything that updates them runs on the event loop thread,
+so they need no locks: recording a request is a couple of dict lookups, a
+bisect and a few integer increments (see benchmarks/metrics.py). That is
+also why this does not use prometheus_client, which takes a lock per update.
+
+Label values are kept low-cardinality: requests are labelled with the
+route's path template ("/coins/{coin_id}"), never the raw path, and
+anything that matched no route is "unmatched"; a method outside the
+standard HTTP ones is "other".
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+HTTP_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"}
+)
+
+Labels = tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, values: Labels, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{self._labels(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """A gauge read at scrape time, e.g. from a pool or a queue."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float | None]) -> None:
+        super().__init__(name, help)
+        self.read = read
+
+    def samples(self) -> Iterator[str]:
+        value = self.read()
+        if value is not None:
+            yield f"{self.name} {_number(value)}"
+
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # last slot: above the highest bound
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[Labels, _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = _Series(len(self.buckets))
+        # Counts are per bucket here and made cumulative when rendered.
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, series in self.series.items():
+            running = 0
+            for bound, count in zip((*self.buckets, float("inf")), series.counts):
+                running += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{self._labels(labels, le)} {running}"
+            yield f"{self.name}_sum{self._labels(labels)} {_number(series.sum)}"
+            yield f"{self.name}_count{self._labels(labels)} {running}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self.metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics(_Metric):
+    """The http_requests_* families, recorded into one table.
+
+    A request costs one lookup on (method, route, status) and one bucket
+    increment; the status counter and the per-route histogram are summed
+    out of that table at scrape time.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__("http_requests", "", ["method", "route", "status"])
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple[str, str, int], _Series] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = _Series(len(self.buckets))
+        series.counts[bisect_left(self.buckets, seconds)] += 1
+        series.sum += seconds
+
+    def render(self) -> Iterator[str]:
+        total = Counter(
+            "http_requests_total", "HTTP responses by route and status.", self.labelnames
+        )
+        duration = Histogram(
+            "http_request_duration_seconds",
+            "Time from request start to the end of the response body.",
+            self.labelnames[:2],
+            self.buckets,
+        )
+        for (method, route, status), series in self.series.items():
+            total.inc(method, route, str(status), amount=sum(series.counts))
+            merged = duration.series.get((method, route))
+            if merged is None:
+                merged = duration.series[(method, route)] = _Series(len(self.buckets))
+            merged.counts = [a + b for a, b in zip(merged.counts, series.counts)]
+            merged.sum += series.sum
+        in_flight = Gauge("http_requests_in_flight", "Requests (including open streams) being served.")
+        in_flight.set(value=self.in_flight)
+        for metric in (total, duration, in_flight):
+            yield from metric.render()
+
+
+registry = Registry()
+
+http_requests = registry.register(RequestMetrics())
+provider_fetch_duration = registry.register(
+    Histogram(
+        "provider_fetch_duration_seconds",
+        "Price provider page fetches that completed, including decoding.",
+        ["provider"],
+    )
+)
+provider_fetch_errors = registry.register(
+    Counter("provider_fetch_errors_total", "Failed price provider page fetches.", ["provider", "error"])
+)
+coin_upsert_duration = registry.register(
+    Histogram("coin_upsert_duration_seconds", "CoinRepository.upsert_many calls.")
+)
+coin_upsert_rows = registry.register(
+    Counter(
+        "coin_upsert_rows_total",
+        "Coins received by upsert_many, by what was written for them.",
+        ["result"],
+    )
+)
+db_pool_wait = registry.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time spent waiting to check a connection out of the pool (queue pools only).",
+        buckets=WAIT_BUCKETS,
+    )
+)
+db_pool_timeouts = registry.register(
+    Counter("db_pool_timeouts_total", "Pool checkouts that gave up waiting.")
+)
+
+
+@contextmanager
+def track_fetch(provider: str) -> Iterator[None]:
+    """Time one provider fetch; count it as an error if it raises.
+
+    Fetches cancelled from outside (e.g. the losing side of a hedge) are
+    neither timed nor counted.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        provider_fetch_errors.inc(provider, type(exc).__name__)
+        raise
+    else:
+        provider_fetch_duration.observe(time.perf_counter() - started, provider)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency, status and concurrency.
+
+    It runs outside the router, which fills in scope["route"] on the same
+    scope dict, so the route template is read once the response is done.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests.in_flight -= 1
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            http_requests.observe(method, route, status, elapsed)
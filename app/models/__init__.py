@@ -1,7 +1,19 @@
+from app.models.alert import PriceAlert
 from app.models.base import Base
+from app.models.candle import Candle
 from app.models.coin import Coin
 from app.models.portfolio import PortfolioItem
+from app.models.price_point import PricePoint
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 
-__all__ = ["Base", "User", "Coin", "PortfolioItem", "RefreshToken"]
+__all__ = [
+    "Base",
+    "User",
+    "Coin",
+    "Candle",
+    "PortfolioItem",
+    "PriceAlert",
+    "PricePoint",
+    "RefreshToken",
+]
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import Float, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class PriceAlert(Base):
+    """Notify `user_id` once `coin_id`'s price crosses `threshold`.
+
+    direction "above" fires on a move from below the threshold to at/over
+    it, "below" on a move from above to at/under it. One-shot: a fired
+    alert keeps its row with triggered_at set and is no longer evaluated.
+    """
+
+    __tablename__ = "price_alerts"
+    __table_args__ = (
+        Index("ix_price_alerts_user_id", "user_id", "id"),
+        Index("ix_price_alerts_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    coin_id: Mapped[int] = mapped_column(
+        ForeignKey("coins.id", ondelete="CASCADE"), nullable=False
+    )
+    direction: Mapped[str] = mapped_column(String(5), nullable=False)
+    threshold: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
+    triggered_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    triggered_price: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Candle(Base):
+    """Pre-aggregated OHLC bucket, maintained incrementally from price_points."""
+
+    __tablename__ = "candles"
+
+    coin_id: Mapped[int] = mapped_column(
+        ForeignKey("coins.id", ondelete="CASCADE"), primary_key=True
+    )
+    resolution: Mapped[int] = mapped_column(Integer, primary_key=True)  # seconds
+    bucket_start: Mapped[datetime] = mapped_column(primary_key=True)
+    open: Mapped[float] = mapped_column(Float, nullable=False)
+    high: Mapped[float] = mapped_column(Float, nullable=False)
+    low: Mapped[float] = mapped_column(Float, nullable=False)
+    close: Mapped[float] = mapped_column(Float, nullable=False)
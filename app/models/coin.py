@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Float, Integer, String
+from sqlalchemy import Float, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,6 +8,13 @@ from app.models.base import Base
 
 class Coin(Base):
     __tablename__ = "coins"
+    # Composite (sort key, id) indexes back the keyset pagination in
+    # CoinRepository.list_page; symbol's also serves the symbol filter.
+    __table_args__ = (
+        Index("ix_coins_rank_id", "market_cap_rank", "id"),
+        Index("ix_coins_price_id", "price_usd", "id"),
+        Index("ix_coins_symbol_id", "symbol", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     external_id: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, UniqueConstraint, func
+from sqlalchemy import Float, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -19,6 +19,11 @@ class PortfolioItem(Base):
     coin_id: Mapped[int] = mapped_column(
         ForeignKey("coins.id", ondelete="CASCADE"), nullable=False
     )
+    # Units held and total USD paid for them; 0/0 means "just watching".
+    quantity: Mapped[float] = mapped_column(Float, default=0.0, server_default="0", nullable=False)
+    cost_basis_usd: Mapped[float] = mapped_column(
+        Float, default=0.0, server_default="0", nullable=False
+    )
     added_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
 
     user: Mapped["User"] = relationship(back_populates="portfolio_items")
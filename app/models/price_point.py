@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class PricePoint(Base):
+    """One observed price per coin per provider update.
+
+    The composite primary key doubles as the (coin_id, ts) index that range
+    queries use, and makes re-appending an unchanged snapshot a no-op.
+    """
+
+    __tablename__ = "price_points"
+
+    coin_id: Mapped[int] = mapped_column(
+        ForeignKey("coins.id", ondelete="CASCADE"), primary_key=True
+    )
+    ts: Mapped[datetime] = mapped_column(primary_key=True)
+    price_usd: Mapped[float] = mapped_column(Float, nullable=False)
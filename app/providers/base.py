@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Protocol
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MarketCoin:
     external_id: str
     name: str
@@ -22,5 +22,8 @@ class PriceProvider(Protocol):
     """
 
     name: str
+    # Namespace of MarketCoin.external_id. Providers with the same scheme
+    # name every coin alike; CoinCap's "xrp" is CoinGecko's "ripple".
+    id_scheme: str
 
     async def fetch_market_coins(self) -> list[MarketCoin]: ...
@@ -1,9 +1,14 @@
 from datetime import datetime, timezone
+from typing import AsyncIterator
 
 import httpx
 
 from app.config import settings
+from app.metrics import track_fetch
 from app.providers.base import MarketCoin
+from app.providers.http import get_http_client
+from app.providers.paging import fetch_pages, host_budget, page_count
+from app.providers.streaming import iter_json_items
 
 
 def _parse(item: dict) -> MarketCoin:
@@ -30,17 +35,52 @@ class CoinCapProvider:
     """
 
     name = "coincap"
+    id_scheme = "coincap"
 
-    def __init__(self, api_key: str | None = None, url: str | None = None) -> None:
+    # /assets caps limit at 2000.
+    MAX_PAGE_SIZE = 2000
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        total: int | None = None,
+        page_size: int | None = None,
+        name: str | None = None,
+    ) -> None:
+        if name is not None:
+            self.name = name  # tells endpoints of one API apart, e.g. when hedging
         self.api_key = api_key or settings.COINCAP_API_KEY
         if not self.api_key:
             raise ValueError("CoinCapProvider requires COINCAP_API_KEY")
         self.url = url or settings.COINCAP_URL
+        self.client = client
+        self.total = total or settings.PROVIDER_MARKET_SIZE
+        self.page_size = min(page_size or settings.PROVIDER_PAGE_SIZE, self.MAX_PAGE_SIZE, self.total)
 
-    async def fetch_market_coins(self, limit: int = 100) -> list[MarketCoin]:
+    async def iter_page(self, page: int) -> AsyncIterator[MarketCoin]:
+        """Yield one page's coins as they are decoded off the response stream."""
+        offset = (page - 1) * self.page_size
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        params = {"limit": limit}
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(self.url, headers=headers, params=params)
+        params = {"limit": min(self.page_size, self.total - offset), "offset": offset}
+        client = self.client or get_http_client()
+        async with client.stream("GET", self.url, headers=headers, params=params) as response:
             response.raise_for_status()
-            return [_parse(item) for item in response.json().get("data", [])]
+            async for item in iter_json_items(response.aiter_bytes(), key="data"):
+                yield _parse(item)
+
+    async def fetch_page(self, page: int) -> list[MarketCoin]:
+        with track_fetch(self.name):
+            return [coin async for coin in self.iter_page(page)]
+
+    async def iter_market_batches(self) -> AsyncIterator[list[MarketCoin]]:
+        pages = page_count(self.total, self.page_size)
+        async for batch in fetch_pages(self.fetch_page, pages, budget=host_budget(self.url)):
+            yield batch
+
+    async def fetch_market_coins(self) -> list[MarketCoin]:
+        coins: list[MarketCoin] = []
+        async for batch in self.iter_market_batches():
+            coins.extend(batch)
+        return coins
@@ -1,15 +1,21 @@
 from datetime import datetime
+from typing import AsyncIterator
 
 import httpx
 
 from app.config import settings
+from app.metrics import track_fetch
 from app.providers.base import MarketCoin
+from app.providers.http import get_http_client
+from app.providers.paging import fetch_pages, host_budget, page_count
+from app.providers.streaming import iter_json_items
 
 
 def _parse(item: dict) -> MarketCoin:
     last_updated_raw = item.get("last_updated")
     last_updated = (
-        datetime.fromisoformat(last_updated_raw.replace("Z", "+00:00"))
+        # fromisoformat accepts the trailing "Z" since Python 3.11
+        datetime.fromisoformat(last_updated_raw)
         if last_updated_raw
         else datetime.utcnow()
     )
@@ -26,19 +32,62 @@ def _parse(item: dict) -> MarketCoin:
 
 class CoinGeckoProvider:
     name = "coingecko"
+    id_scheme = "coingecko"
 
-    def __init__(self, url: str | None = None) -> None:
+    # /coins/markets caps per_page at 250.
+    MAX_PAGE_SIZE = 250
+
+    def __init__(
+        self,
+        url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        total: int | None = None,
+        page_size: int | None = None,
+        name: str | None = None,
+    ) -> None:
+        if name is not None:
+            self.name = name  # tells endpoints of one API apart, e.g. when hedging
         self.url = url or settings.COINGECKO_URL
+        self.client = client
+        self.total = total or settings.PROVIDER_MARKET_SIZE
+        self.page_size = min(page_size or settings.PROVIDER_PAGE_SIZE, self.MAX_PAGE_SIZE, self.total)
+
+    async def iter_page(self, page: int) -> AsyncIterator[MarketCoin]:
+        """Yield one page's coins as they are decoded off the response stream.
 
-    async def fetch_market_coins(self, per_page: int = 100, page: int = 1) -> list[MarketCoin]:
+        /coins/markets pages by number, so the last page can't ask for fewer
+        rows without shifting its offset; it is cut at `total` instead (the
+        surplus is read but not parsed, so the connection stays reusable).
+        """
+        remaining = self.total - (page - 1) * self.page_size
+        if remaining <= 0:
+            return
         params = {
             "vs_currency": "usd",
             "order": "market_cap_desc",
-            "per_page": per_page,
+            "per_page": self.page_size,
             "page": page,
             "sparkline": "false",
         }
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(self.url, params=params)
+        client = self.client or get_http_client()
+        async with client.stream("GET", self.url, params=params) as response:
             response.raise_for_status()
-            return [_parse(item) for item in response.json()]
+            async for item in iter_json_items(response.aiter_bytes()):
+                if remaining > 0:
+                    remaining -= 1
+                    yield _parse(item)
+
+    async def fetch_page(self, page: int) -> list[MarketCoin]:
+        with track_fetch(self.name):
+            return [coin async for coin in self.iter_page(page)]
+
+    async def iter_market_batches(self) -> AsyncIterator[list[MarketCoin]]:
+        pages = page_count(self.total, self.page_size)
+        async for batch in fetch_pages(self.fetch_page, pages, budget=host_budget(self.url)):
+            yield batch
+
+    async def fetch_market_coins(self) -> list[MarketCoin]:
+        coins: list[MarketCoin] = []
+        async for batch in self.iter_market_batches():
+            coins.extend(batch)
+        return coins
@@ -1,15 +1,35 @@
+import httpx
+
 from app.config import settings
 from app.providers.base import PriceProvider
 from app.providers.coincap import CoinCapProvider
 from app.providers.coingecko import CoinGeckoProvider
+from app.providers.hedged import HedgedProvider
+from app.providers.http import get_http_client
 
 
-def get_price_provider() -> PriceProvider:
+def get_price_provider(client: httpx.AsyncClient | None = None) -> PriceProvider:
     """Pick a provider based on configuration.
 
-    If COINCAP_API_KEY is set we prefer CoinCap (paid, more reliable);
-    otherwise we use the keyless CoinGecko free tier.
+    If COINCAP_API_KEY is set we prefer CoinCap (paid, more reliable),
+    otherwise the keyless CoinGecko free tier. With PROVIDER_HEDGE_URLS the
+    chosen API is hedged across its own endpoint and those. Only endpoints of
+    one API are ever mixed, because the two name coins differently. Either
+    way the providers talk through the shared pooled client unless one is
+    passed in.
     """
-    if settings.COINCAP_API_KEY:
-        return CoinCapProvider()
-    return CoinGeckoProvider()
+    client = client or get_http_client()
+    provider_class = CoinCapProvider if settings.COINCAP_API_KEY else CoinGeckoProvider
+    if not (settings.PROVIDER_HEDGE_ENABLED and settings.PROVIDER_HEDGE_URLS):
+        return provider_class(client=client)
+    return HedgedProvider(
+        [
+            provider_class(client=client),
+            *(
+                provider_class(
+                    url=url, client=client, name=f"{provider_class.name}@{httpx.URL(url).host}"
+                )
+                for url in settings.PROVIDER_HEDGE_URLS
+            ),
+        ]
+    )
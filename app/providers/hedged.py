@@ -0,0 +1,278 @@
+"""Composite provider: hedged requests across several endpoints of one API.
+
+All providers must share an id scheme (PriceProvider.id_scheme): coins are
+upserted by external_id, and APIs that name the same coin differently would
+insert it twice on every failover and leave holdings, alerts and history on
+the other id. CoinCap and CoinGecko are therefore never hedged together.
+
+The preferred provider is asked first. If it hasn't answered by its own
+recent latency percentile (PROVIDER_HEDGE_PERCENTILE), the next one is
+asked too and whichever returns a good answer first wins; the loser is
+cancelled. A provider that fails outright hands over to the next one
+immediately. Only when every provider has failed does the refresh fail.
+
+When the providers page the market identically, the race is per page
+(iter_market_batches), so refreshes keep streaming page by page with
+bounded memory and a slow page on one upstream is served by the other.
+
+Latency and error outcomes are kept per provider name in a process-wide
+registry (`provider_stats`), so they survive the per-refresh provider
+instances built by get_price_provider(). Outcomes older than
+PROVIDER_STATS_MAX_AGE_SECONDS are forgotten: a provider demoted for its
+errors is rarely asked again, so without that its stale failures would keep
+it demoted for good. Once they age out it has no data, sorts first again and
+gets probed.
+
+Preference order is recomputed on every fetch: lowest recent error rate
+first (rates within PROVIDER_HEDGE_ERROR_TOLERANCE of each other count as
+equal, so one stray failure doesn't demote the primary), then lowest median
+latency, then configured order.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.providers.base import MarketCoin, PriceProvider
+from app.providers.paging import fetch_pages, host_budget, page_count
+
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[PriceProvider], Awaitable[list[MarketCoin]]]
+
+
+class ProviderStats:
+    """The last `window` outcomes for one provider, none older than `max_age` seconds."""
+
+    def __init__(self, window: int, max_age: float) -> None:
+        self.max_age = max_age
+        # (monotonic time, latency in seconds or None for a failure)
+        self.samples: deque[tuple[float, float | None]] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.requests += 1
+        self.samples.append((time.monotonic(), seconds if ok else None))
+        if not ok:
+            self.errors += 1
+
+    def _recent(self) -> deque[tuple[float, float | None]]:
+        cutoff = time.monotonic() - self.max_age
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return self.samples
+
+    @property
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, latency in samples if latency is None) / len(samples)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile of successful latencies, or None without data."""
+        ordered = sorted(latency for _, latency in self._recent() if latency is not None)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+@dataclass(frozen=True)
+class ProviderHealth:
+    name: str
+    requests: int
+    errors: int
+    error_rate: float
+    p50_ms: float | None
+    p95_ms: float | None
+
+
+class ProviderStatsRegistry:
+    def __init__(
+        self, window: int, max_age: float = settings.PROVIDER_STATS_MAX_AGE_SECONDS
+    ) -> None:
+        self.window = window
+        self.max_age = max_age
+        self._stats: dict[str, ProviderStats] = {}
+
+    def get(self, name: str) -> ProviderStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ProviderStats(self.window, self.max_age)
+        return stats
+
+    def snapshot(self) -> list[ProviderHealth]:
+        def ms(value: float | None) -> float | None:
+            return None if value is None else value * 1000
+
+        return [
+            ProviderHealth(
+                name=name,
+                requests=s.requests,
+                errors=s.errors,
+                error_rate=s.error_rate,
+                p50_ms=ms(s.percentile(50)),
+                p95_ms=ms(s.percentile(95)),
+            )
+            for name, s in self._stats.items()
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+provider_stats = ProviderStatsRegistry(settings.PROVIDER_STATS_WINDOW)
+
+
+class HedgedProvider:
+    """PriceProvider over several providers; `name` reports the last winner."""
+
+    def __init__(
+        self,
+        providers: list[PriceProvider],
+        *,
+        percentile: float = settings.PROVIDER_HEDGE_PERCENTILE,
+        initial_delay: float = settings.PROVIDER_HEDGE_INITIAL_DELAY_SECONDS,
+        min_delay: float = settings.PROVIDER_HEDGE_MIN_DELAY_SECONDS,
+        error_tolerance: float = settings.PROVIDER_HEDGE_ERROR_TOLERANCE,
+        stats: ProviderStatsRegistry = provider_stats,
+    ) -> None:
+        if not providers:
+            raise ValueError("HedgedProvider needs at least one provider")
+        schemes = {p.id_scheme for p in providers}
+        if len(schemes) > 1:
+            raise ValueError(f"Can't hedge providers with different coin ids: {sorted(schemes)}")
+        if len({p.name for p in providers}) < len(providers):
+            raise ValueError("Hedged providers need distinct names (their stats are kept by name)")
+        self.providers = providers
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.error_tolerance = error_tolerance
+        self.stats = stats
+        self.name = "+".join(p.name for p in providers)
+
+    def preference(self) -> list[PriceProvider]:
+        def key(item: tuple[int, PriceProvider]) -> tuple[float, float, int]:
+            position, provider = item
+            stats = self.stats.get(provider.name)
+            errors = stats.error_rate
+            if self.error_tolerance > 0:
+                # Bands of width `error_tolerance`: 0.03 and 0.08 tie at 0.1.
+                errors = math.floor(errors / self.error_tolerance)
+            median = stats.percentile(50)
+            return (errors, median if median is not None else 0.0, position)
+
+        return [p for _, p in sorted(enumerate(self.providers), key=key)]
+
+    def hedge_delay(self, provider: PriceProvider) -> float:
+        observed = self.stats.get(provider.name).percentile(self.percentile)
+        if observed is None:
+            return self.initial_delay
+        return max(self.min_delay, observed)
+
+    async def _timed(self, provider: PriceProvider, fetch: Fetch) -> list[MarketCoin]:
+        stats = self.stats.get(provider.name)
+        started = time.perf_counter()
+        try:
+            coins = await fetch(provider)
+        except asyncio.CancelledError:
+            raise  # lost the race; says nothing about the provider
+        except Exception:
+            stats.record(time.perf_counter() - started, ok=False)
+            raise
+        stats.record(time.perf_counter() - started, ok=True)
+        return coins
+
+    async def fetch_market_coins(self) -> list[MarketCoin]:
+        return await self._race(lambda provider: provider.fetch_market_coins())
+
+    def _pages(self) -> int | None:
+        """Pages per market fetch if every provider pages it the same way, else None."""
+        shapes = {(getattr(p, "total", None), getattr(p, "page_size", None)) for p in self.providers}
+        if len(shapes) != 1 or not all(hasattr(p, "fetch_page") for p in self.providers):
+            return None
+        total, page_size = shapes.pop()
+        if total is None or page_size is None:
+            return None
+        return page_count(total, page_size)
+
+    async def fetch_page(self, page: int) -> list[MarketCoin]:
+        """Hedge one page across the providers."""
+
+        async def one(provider: PriceProvider) -> list[MarketCoin]:
+            url = getattr(provider, "url", None)
+            if url is not None:
+                await host_budget(url).acquire()
+            return await provider.fetch_page(page)
+
+        return await self._race(one)
+
+    async def iter_market_batches(self) -> AsyncIterator[list[MarketCoin]]:
+        """Page by page, each page hedged on its own, when the providers line up.
+
+        Providers that page differently (size or market total) can't serve
+        each other's pages, so the whole market is raced in one go instead.
+        """
+        pages = self._pages()
+        if pages is None:
+            yield await self.fetch_market_coins()
+            return
+        async for batch in fetch_pages(self.fetch_page, pages):
+            yield batch
+
+    async def _race(self, fetch: Fetch) -> list[MarketCoin]:
+        queue = self.preference()
+        pending: dict[asyncio.Task, PriceProvider] = {}
+        errors: list[str] = []
+
+        def launch() -> PriceProvider:
+            provider = queue.pop(0)
+            pending[asyncio.create_task(self._timed(provider, fetch))] = provider
+            return provider
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay(latest) if queue else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slower than this provider usually is: hedge with the next one.
+                    latest = launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        self.name = provider.name
+                        return task.result()
+                    errors.append(f"{provider.name}: {task.exception()!r}")
+                if queue:
+                    # A failure hands over right away instead of waiting out the delay.
+                    latest = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Retrieve every loser's outcome; one that failed rather than
+                # being cancelled is worth a log line (its stats have it too).
+                outcomes = await asyncio.gather(*pending, return_exceptions=True)
+                for provider, outcome in zip(pending.values(), outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.warning(
+                            "Price provider %s failed after losing the race: %r",
+                            provider.name,
+                            outcome,
+                        )
+
+        raise httpx.HTTPError("All price providers failed: " + "; ".join(errors))
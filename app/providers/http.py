@@ -0,0 +1,43 @@
+"""Shared, pooled httpx client for the price providers.
+
+Opening a fresh AsyncClient per fetch pays DNS + TCP + TLS on every refresh
+and throws the keep-alive connection away afterwards. Instead the process
+keeps one long-lived client whose connection pool is reused across calls.
+
+The FastAPI lifespan (app/main.py) opens it on startup and closes it on
+shutdown. Outside the lifespan (scripts, tests using ASGITransport) it is
+created lazily on first use.
+"""
+import httpx
+
+from app.config import settings
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def build_http_client() -> httpx.AsyncClient:
+    # http2=True needs the optional `h2` package (pip install "httpx[http2]").
+    return httpx.AsyncClient(
+        timeout=settings.PROVIDER_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.PROVIDER_HTTP2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
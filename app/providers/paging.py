@@ -0,0 +1,120 @@
+"""Concurrent paged fetching for providers that cap the page size.
+
+`fetch_pages` runs one task per page behind a semaphore
+(PROVIDER_PAGE_CONCURRENCY) and a per-host token bucket
+(PROVIDER_HOST_RATE_PER_SECOND / PROVIDER_HOST_BURST), retries a failed page
+on its own, and yields each page's MarketCoins as soon as it lands so the
+caller can upsert while the rest are still in flight.
+
+Pages come back in completion order, not page order.
+"""
+import asyncio
+import math
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.providers.base import MarketCoin, PriceProvider
+
+
+class RateBudget:
+    """Token bucket shared by every request to one host."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_budgets: dict[str, RateBudget] = {}
+
+
+def host_budget(url: str) -> RateBudget:
+    host = httpx.URL(url).host
+    budget = _budgets.get(host)
+    if budget is None:
+        budget = _budgets[host] = RateBudget(
+            settings.PROVIDER_HOST_RATE_PER_SECOND, settings.PROVIDER_HOST_BURST
+        )
+    return budget
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, math.ceil(total / page_size))
+
+
+def _retryable(exc: httpx.HTTPError) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return True
+
+
+async def fetch_pages(
+    fetch_page: Callable[[int], Awaitable[list[MarketCoin]]],
+    pages: int,
+    *,
+    budget: RateBudget | None = None,
+    concurrency: int = settings.PROVIDER_PAGE_CONCURRENCY,
+    retries: int = settings.PROVIDER_PAGE_RETRIES,
+    backoff: float = settings.PROVIDER_PAGE_RETRY_BACKOFF_SECONDS,
+) -> AsyncIterator[list[MarketCoin]]:
+    """Yield the result of fetch_page(1..pages) as each completes.
+
+    A page that still fails after `retries` extra attempts raises its last
+    error; pages not yet finished are cancelled.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(page: int) -> list[MarketCoin]:
+        attempt = 0
+        while True:
+            async with semaphore:
+                if budget is not None:
+                    await budget.acquire()
+                try:
+                    return await fetch_page(page)
+                except httpx.HTTPError as exc:
+                    if attempt >= retries or not _retryable(exc):
+                        raise
+            # Back off outside the semaphore so other pages keep going.
+            await asyncio.sleep(backoff * 2**attempt)
+            attempt += 1
+
+    tasks = [asyncio.create_task(one(page)) for page in range(1, pages + 1)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            batch = await finished
+            if batch:
+                yield batch
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def market_batches(provider: PriceProvider) -> AsyncIterator[list[MarketCoin]]:
+    """Stream a provider's coins page by page when it supports it."""
+    iter_batches = getattr(provider, "iter_market_batches", None)
+    if iter_batches is None:
+        yield await provider.fetch_market_coins()
+        return
+    async for batch in iter_batches():
+        yield batch
@@ -0,0 +1,91 @@
+"""Incremental JSON item decoding for provider responses.
+
+Market endpoints return one big array of objects (CoinGecko at the top
+level, CoinCap under "data"). Decoding the whole body with response.json()
+holds the raw bytes, the decoded document and the parsed MarketCoins at the
+same time. `iter_json_items` instead decodes the byte stream as it arrives
+and yields one item object at a time, so only the unconsumed tail of the
+current chunk and the item being built are alive.
+
+Each item is decoded with JSONDecoder.raw_decode (the C scanner) straight
+out of the text buffer. An item cut off by a chunk boundary fails to decode
+and is retried once the next chunk is appended.
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_decoder = json.JSONDecoder()
+
+
+class JsonArrayItems:
+    """Feed bytes, get back the decoded elements of one JSON array.
+
+    With key=None the array is the document itself; with key="data" it is
+    the value of that key in the top-level object, e.g. {"data": [...]}.
+    An object without that key holds no items, like `.get(key, [])`.
+    """
+
+    def __init__(self, key: str | None = None) -> None:
+        self._key = key
+        self._start = re.compile(r"\[" if key is None else r'"%s"\s*:\s*\[' % re.escape(key))
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._in_array = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        if self.done:
+            return []
+        text = self._text + self._utf8.decode(chunk)
+        pos = 0
+        if not self._in_array:
+            match = self._start.search(text)
+            if match is None:
+                self._text = text
+                return []
+            self._in_array = True
+            pos = match.end()
+
+        items: list[Any] = []
+        while True:
+            pos = _SEPARATORS.match(text, pos).end()
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, pos = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                break  # incomplete item: wait for the next chunk
+            items.append(item)
+        self._text = "" if self.done else text[pos:]
+        return items
+
+    def close(self) -> None:
+        if self.done:
+            return
+        if self._key is not None and not self._in_array:
+            # The key never showed up, so the whole body is still buffered.
+            try:
+                document = json.loads(self._text + self._utf8.decode(b"", final=True))
+            except json.JSONDecodeError as exc:
+                raise ValueError("JSON stream is not a valid document") from exc
+            if isinstance(document, dict) and self._key not in document:
+                return
+        raise ValueError("JSON stream ended before the array was closed")
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes], key: str | None = None
+) -> AsyncIterator[Any]:
+    """Yield each element of the array as soon as it has fully arrived."""
+    items = JsonArrayItems(key)
+    async for chunk in chunks:
+        for item in items.feed(chunk):
+            yield item
+    items.close()
@@ -1,7 +1,166 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""Token-bucket rate limiting keyed on the caller's identity.
+
+Each (scope, identity) pair gets a bucket of `limit` tokens refilled over
+`period` seconds. Buckets are tracked with GCRA: a single "theoretical
+arrival time" per key, which is exactly a token bucket but needs one float
+of state instead of a count and a timestamp. A key whose TAT is in the past
+has a full bucket and carries no information, so it can be dropped at any
+time: that is what keeps the table bounded.
+
+Identity is the authenticated user id when the request carries a valid
+access token, otherwise the client address. Behind a proxy that means users
+no longer share one bucket per proxy IP.
+
+Storage is pluggable. `LocalBuckets` is an in-process table capped at
+RATE_LIMIT_MAX_KEYS: past it the least recently used key goes, whether or
+not its bucket has refilled yet (it almost always has; `evicted` counts the
+ones that had not). `RedisBuckets` runs the same algorithm in a Lua
+script on any Redis-protocol server so every worker shares one set of
+buckets; it needs the optional `redis` package.
+"""
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from fastapi.requests import HTTPConnection
 
 from app.config import settings
+from app.exceptions import RateLimited
+from app.security import access_token_cache
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional: only needed for RATE_LIMIT_STORAGE_URL=redis://
+    redis_asyncio = None
+
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parse e.g. "5/minute" into (5, 60.0)."""
+    count, _, unit = rate.partition("/")
+    unit = unit.strip().lower().rstrip("s")
+    if unit not in _PERIODS or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '5/minute'")
+    return int(count), float(_PERIODS[unit])
+
+
+class BucketStorage(Protocol):
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        """Take a token; return 0 if allowed, else seconds until one is available."""
+        ...
+
+
+class LocalBuckets:
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self.evicted = 0
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        return self.hit_now(key, limit, period, time.monotonic())
+
+    def hit_now(self, key: str, limit: int, period: float, now: float) -> float:
+        tat = max(self._tat.get(key, now), now) + period / limit
+        if tat - now > period:
+            return tat - now - period
+        self._tat[key] = tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_keys:
+            self._shrink(now)
+        return 0.0
+
+    def _shrink(self, now: float) -> None:
+        # Pure LRU: oldest-touched keys are the likeliest to have refilled.
+        # Hunting for expired keys first would cost a scan of the table per
+        # hit exactly when a flood of new keys keeps it full.
+        while len(self._tat) > self.max_keys:
+            _, tat = self._tat.popitem(last=False)
+            if tat > now:
+                self.evicted += 1  # still had debt: forgotten early
+
+    def clear(self) -> None:
+        self._tat.clear()
+        self.evicted = 0
+
+
+# KEYS[1] bucket; ARGV: limit, period seconds. Uses the server clock so all
+# workers agree on "now". Returns the wait in milliseconds (0 = allowed).
+_GCRA = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local period = tonumber(ARGV[2]) * 1000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+tat = tat + period / tonumber(ARGV[1])
+if tat - now > period then return math.ceil(tat - now - period) end
+redis.call('SET', KEYS[1], tat, 'PX', math.ceil(tat - now))
+return 0
+"""
+
+
+class RedisBuckets:
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        if redis_asyncio is None:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL=redis://... needs `pip install redis`")
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_GCRA)
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        wait_ms = await self._script(keys=[self.prefix + key], args=[limit, period])
+        return int(wait_ms) / 1000
+
+
+def build_storage(url: str) -> BucketStorage:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBuckets(url)
+    if url in ("", "memory://"):
+        return LocalBuckets(settings.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL {url!r}")
+
+
+def identity(connection: HTTPConnection) -> str:
+    authorization = connection.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = access_token_cache.decode(token).get("user_id")
+        except ValueError:
+            user_id = None
+        if user_id is not None:
+            return f"user:{user_id}"
+    client = connection.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+class RateLimiter:
+    def __init__(self, storage: BucketStorage, enabled: bool) -> None:
+        self.storage = storage
+        self.enabled = enabled
+
+    def limit(self, rate: str, bucket: str | None = None):
+        """Route dependency allowing `rate` requests per identity, e.g. "5/minute".
+
+        Routes given the same `bucket` name share buckets; by default each
+        route (by its path template) has its own.
+        """
+        count, period = parse_rate(rate)
+
+        async def check(connection: HTTPConnection) -> None:
+            if not self.enabled:
+                return
+            route = connection.scope.get("route")
+            name = bucket or getattr(route, "path", connection.scope["path"])
+            wait = await self.storage.hit(f"{name}|{identity(connection)}", count, period)
+            if wait > 0:
+                raise RateLimited(rate, wait)
+
+        return check
 
 
-limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
+limiter = RateLimiter(build_storage(settings.RATE_LIMIT_STORAGE_URL), settings.RATE_LIMIT_ENABLED)
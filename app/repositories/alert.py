@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Coin, PriceAlert
+
+
+# (id, coin_id, direction, threshold)
+AlertRow = tuple[int, int, str, float]
+
+# Keeps `id IN (...)` under SQLite's default 999 bound parameters.
+_ID_CHUNK = 900
+
+
+class AlertRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def create(
+        self, user_id: int, coin_id: int, direction: str, threshold: float
+    ) -> PriceAlert:
+        alert = PriceAlert(
+            user_id=user_id, coin_id=coin_id, direction=direction, threshold=threshold
+        )
+        self.db.add(alert)
+        await self.db.flush()
+        return alert
+
+    async def list_for_user(self, user_id: int) -> list[PriceAlert]:
+        stmt = select(PriceAlert).where(PriceAlert.user_id == user_id).order_by(PriceAlert.id)
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_for_user(self, user_id: int, alert_id: int) -> PriceAlert | None:
+        stmt = select(PriceAlert).where(
+            PriceAlert.id == alert_id, PriceAlert.user_id == user_id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def delete(self, user_id: int, alert_id: int) -> bool:
+        stmt = delete(PriceAlert).where(PriceAlert.id == alert_id, PriceAlert.user_id == user_id)
+        result = await self.db.execute(stmt)
+        return result.rowcount > 0
+
+    async def active_after(self, after_id: int, limit: int) -> list[AlertRow]:
+        """Untriggered alerts with id > after_id, in id order, for loading the index."""
+        stmt = (
+            select(PriceAlert.id, PriceAlert.coin_id, PriceAlert.direction, PriceAlert.threshold)
+            .where(PriceAlert.id > after_id, PriceAlert.triggered_at.is_(None))
+            .order_by(PriceAlert.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def newest_created_at(self) -> datetime | None:
+        return await self.db.scalar(select(func.max(PriceAlert.created_at)))
+
+    async def active_created_since(self, since: datetime | None) -> list[tuple]:
+        """Untriggered alerts created at or after `since` (all of them for None).
+
+        Returns (id, coin_id, direction, threshold, created_at) rows.
+        """
+        stmt = select(
+            PriceAlert.id,
+            PriceAlert.coin_id,
+            PriceAlert.direction,
+            PriceAlert.threshold,
+            PriceAlert.created_at,
+        ).where(PriceAlert.triggered_at.is_(None))
+        if since is not None:
+            stmt = stmt.where(PriceAlert.created_at >= since)
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def current_prices(self) -> list[tuple[int, float]]:
+        result = await self.db.execute(select(Coin.id, Coin.price_usd))
+        return [tuple(row) for row in result.all()]
+
+    async def mark_triggered(self, ids: list[int], at: datetime) -> list[tuple]:
+        """Stamp these alerts as triggered at the coin's current price.
+
+        Rows already triggered (or deleted) are skipped: the `triggered_at IS
+        NULL` guard makes the database the arbiter when several workers
+        evaluate the same crossing, so each alert is returned exactly once.
+        Returns (id, user_id, coin_id, direction, threshold, triggered_price)
+        for the rows this call triggered.
+        """
+        price_now = (
+            select(Coin.price_usd).where(Coin.id == PriceAlert.coin_id).scalar_subquery()
+        )
+        triggered: list[tuple] = []
+        for start in range(0, len(ids), _ID_CHUNK):
+            stmt = (
+                update(PriceAlert)
+                .where(
+                    PriceAlert.id.in_(ids[start : start + _ID_CHUNK]),
+                    PriceAlert.triggered_at.is_(None),
+                )
+                .values(triggered_at=at, triggered_price=price_now)
+                .returning(
+                    PriceAlert.id,
+                    PriceAlert.user_id,
+                    PriceAlert.coin_id,
+                    PriceAlert.direction,
+                    PriceAlert.threshold,
+                    PriceAlert.triggered_price,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            triggered.extend(tuple(row) for row in result.all())
+        return triggered
@@ -0,0 +1,88 @@
+"""Postgres COPY + merge for large upserts.
+
+A multi-row INSERT ... VALUES ... ON CONFLICT binds every value as a
+parameter: the statement has to be chunked under asyncpg's 32767-parameter
+cap, and each chunk is parsed and planned on its own. Above
+BULK_COPY_MIN_ROWS the repositories instead stream the rows with COPY
+(asyncpg's binary copy_records_to_table) into a temporary staging table and
+apply them with one INSERT ... SELECT ... ON CONFLICT.
+
+Everything runs on the session's own connection, inside its transaction, so
+the merge commits or rolls back with the rest of the unit of work. The
+staging table is ON COMMIT DROP and truncated before each use, so several
+merges in one transaction (e.g. paged refreshes) share it.
+
+Below the threshold, and on SQLite, statements are chunked by
+rows_per_statement to stay under the driver's bind-parameter cap.
+"""
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import Table, column, select, table, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+
+# Bound parameters allowed per statement. asyncpg caps at 32767; SQLite
+# builds older than 3.32 at 999, which we assume for anything else.
+_MAX_BIND_PARAMS = {"postgresql": 32767}
+_DEFAULT_MAX_BIND_PARAMS = 999
+
+
+def rows_per_statement(db: AsyncSession, columns: int) -> int:
+    """How many rows of `columns` bound values fit in one statement."""
+    dialect = db.bind.dialect.name if db.bind else ""
+    return max(1, _MAX_BIND_PARAMS.get(dialect, _DEFAULT_MAX_BIND_PARAMS) // columns)
+
+
+def use_copy(db: AsyncSession, rows: int) -> bool:
+    dialect = db.bind.dialect.name if db.bind else ""
+    return dialect == "postgresql" and 0 < settings.BULK_COPY_MIN_ROWS <= rows
+
+
+async def copy_merge(
+    db: AsyncSession,
+    target: Table,
+    rows: Sequence[dict[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    set_: Callable[[Any], dict[str, Any]],
+) -> None:
+    """Upsert `rows` into `target` via a COPY-filled staging table.
+
+    `set_` receives the statement's `excluded` namespace and returns the
+    ON CONFLICT DO UPDATE assignments, as with on_conflict_do_update. Rows
+    must be unique on `index_elements` (Postgres refuses to update one
+    target row twice in a statement).
+    """
+    if not rows:
+        return
+    columns = list(rows[0])
+    stage_name = f"_stage_{target.name}"
+    column_list = ", ".join(f'"{c}"' for c in columns)
+
+    # Going through the session first also opens its transaction, so the
+    # raw COPY below is part of it rather than autocommitted.
+    await db.execute(
+        text(
+            f'CREATE TEMP TABLE IF NOT EXISTS "{stage_name}" ON COMMIT DROP AS '
+            f'SELECT {column_list} FROM "{target.name}" WITH NO DATA'
+        )
+    )
+    await db.execute(text(f'TRUNCATE "{stage_name}"'))
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        stage_name,
+        records=[tuple(row[c] for c in columns) for row in rows],
+        columns=columns,
+    )
+
+    stage = table(stage_name, *(column(c) for c in columns))
+    stmt = postgresql_insert(target).from_select(
+        columns, select(*(stage.c[c] for c in columns))
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_(stmt.excluded))
+    await db.execute(stmt)
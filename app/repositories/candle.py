@@ -0,0 +1,138 @@
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Candle
+from app.repositories.bulk import copy_merge, rows_per_statement, use_copy
+from app.repositories.price_history import Point
+
+
+CandleKey = tuple[int, int, datetime]
+
+
+def bucket_start(ts: datetime, resolution: int) -> datetime:
+    epoch = int(ts.replace(tzinfo=timezone.utc).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % resolution, tz=timezone.utc).replace(
+        tzinfo=None
+    )
+
+
+def fold(points: Iterable[Point], resolutions: Iterable[int]) -> dict[CandleKey, list[float]]:
+    """Aggregate points into {(coin_id, resolution, bucket): [open, high, low, close]}.
+
+    Points must arrive in ts order per coin — open is the first price seen
+    for a bucket, close the last.
+    """
+    resolutions = tuple(resolutions)
+    candles: dict[CandleKey, list[float]] = {}
+    for coin_id, ts, price in points:
+        price = float(price)
+        for resolution in resolutions:
+            key = (coin_id, resolution, bucket_start(ts, resolution))
+            ohlc = candles.get(key)
+            if ohlc is None:
+                candles[key] = [price, price, price, price]
+            else:
+                if price > ohlc[1]:
+                    ohlc[1] = price
+                if price < ohlc[2]:
+                    ohlc[2] = price
+                ohlc[3] = price
+    return candles
+
+
+class CandleRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def _dialect(self) -> str:
+        return self.db.bind.dialect.name if self.db.bind else ""
+
+    async def apply(self, points: list[Point], resolutions: Iterable[int]) -> int:
+        """Merge new points into their candles; returns candle rows touched.
+
+        Existing buckets keep their open, widen high/low and take the new
+        close, so points must be newer than what the bucket already holds —
+        true for each refresh and for a backfill read in ts order.
+        """
+        folded = fold(sorted(points, key=lambda p: p[1]), resolutions)
+        rows = [
+            {
+                "coin_id": coin_id,
+                "resolution": resolution,
+                "bucket_start": start,
+                "open": o,
+                "high": h,
+                "low": low,
+                "close": c,
+            }
+            for (coin_id, resolution, start), (o, h, low, c) in folded.items()
+        ]
+        if self._dialect() == "postgresql":
+            insert, greatest, least = postgresql_insert, func.greatest, func.least
+        else:
+            # SQLite's multi-argument max()/min() are scalar, not aggregates.
+            insert, greatest, least = sqlite_insert, func.max, func.min
+
+        def updates(excluded: Any) -> dict[str, Any]:
+            return {
+                "high": greatest(Candle.high, excluded.high),
+                "low": least(Candle.low, excluded.low),
+                "close": excluded.close,
+            }
+
+        if use_copy(self.db, len(rows)):
+            await copy_merge(
+                self.db,
+                Candle.__table__,
+                rows,
+                index_elements=["coin_id", "resolution", "bucket_start"],
+                set_=updates,
+            )
+            return len(rows)
+
+        chunk = rows_per_statement(self.db, len(rows[0])) if rows else 1
+        for i in range(0, len(rows), chunk):
+            stmt = insert(Candle).values(rows[i : i + chunk])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Candle.coin_id, Candle.resolution, Candle.bucket_start],
+                set_=updates(stmt.excluded),
+            )
+            await self.db.execute(stmt)
+        return len(rows)
+
+    async def list_range(
+        self, coin_id: int, resolution: int, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float, float, float, float]]:
+        """(bucket_start, open, high, low, close) rows, oldest first."""
+        stmt = (
+            select(Candle.bucket_start, Candle.open, Candle.high, Candle.low, Candle.close)
+            .where(
+                Candle.coin_id == coin_id,
+                Candle.resolution == resolution,
+                Candle.bucket_start >= start,
+                Candle.bucket_start < end,
+            )
+            .order_by(Candle.bucket_start)
+        )
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def lock_for_rebuild(self) -> None:
+        """Hold off concurrent candle writers until this transaction ends.
+
+        Readers are not blocked. SQLite needs nothing here: its first write
+        takes the database write lock for the rest of the transaction.
+        """
+        if self._dialect() == "postgresql":
+            await self.db.execute(text(f'LOCK TABLE "{Candle.__tablename__}" IN EXCLUSIVE MODE'))
+
+    async def clear(self, coin_id: int | None = None) -> None:
+        stmt = delete(Candle)
+        if coin_id is not None:
+            stmt = stmt.where(Candle.coin_id == coin_id)
+        await self.db.execute(stmt)
@@ -1,69 +1,289 @@
-from sqlalchemy import nulls_last, select
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Mapping
+
+from sqlalchemy import ColumnElement, bindparam, nulls_last, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.metrics import coin_upsert_duration, coin_upsert_rows
 from app.models import Coin
 from app.providers.base import MarketCoin
+from app.repositories.bulk import copy_merge, rows_per_statement, use_copy
+from app.schemas.coin import CoinSort
+
+
+_ROW_COLUMNS = (
+    Coin.id,
+    Coin.external_id,
+    Coin.name,
+    Coin.symbol,
+    Coin.market_cap_rank,
+    Coin.price_usd,
+    Coin.image_url,
+    Coin.last_updated,
+)
+
+_UPSERT_COLUMNS = (
+    "external_id",
+    "name",
+    "symbol",
+    "market_cap_rank",
+    "price_usd",
+    "image_url",
+    "last_updated",
+)
+
+# (hash of the static metadata, price_usd, last_updated)
+Fingerprint = tuple[int, float, datetime]
+
+
+def _row(coin: MarketCoin) -> dict:
+    last_updated = coin.last_updated
+    if last_updated.tzinfo is not None:
+        last_updated = last_updated.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "external_id": coin.external_id,
+        "name": coin.name,
+        "symbol": coin.symbol,
+        "market_cap_rank": coin.market_cap_rank,
+        "price_usd": coin.price_usd,
+        "image_url": coin.image_url,
+        "last_updated": last_updated,
+    }
+
+
+def _fingerprint(row: Mapping[str, Any]) -> Fingerprint:
+    metadata = hash((row["name"], row["symbol"], row["market_cap_rank"], row["image_url"]))
+    return metadata, row["price_usd"], row["last_updated"]
+
+
+def _coin_updates(excluded: Any) -> dict[str, Any]:
+    return {name: excluded[name] for name in _UPSERT_COLUMNS if name != "external_id"}
+
+
+@dataclass(frozen=True)
+class UpsertResult:
+    received: int
+    inserted: int = 0
+    metadata_updated: int = 0
+    price_updated: int = 0
+    changed_external_ids: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.metadata_updated + self.price_updated
+
+
+# sort name -> (column, descending). Ties always break on id in the same direction.
+_SORTS = {
+    "rank": (Coin.market_cap_rank, False),
+    "price": (Coin.price_usd, False),
+    "-price": (Coin.price_usd, True),
+    "symbol": (Coin.symbol, False),
+}
 
 
 class CoinRepository:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
+        # Fingerprints read or written in this session's transaction.
+        self._seen: dict[str, Fingerprint] = {}
 
     async def list_all(self) -> list[Coin]:
         stmt = select(Coin).order_by(nulls_last(Coin.market_cap_rank.asc()))
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def list_all_rows(self) -> list[dict]:
+        """Same ordering as list_all, as plain dicts shaped like CoinResponse.
+
+        Skips ORM identity-map bookkeeping; used to build the cached payload.
+        """
+        stmt = select(*_ROW_COLUMNS).order_by(nulls_last(Coin.market_cap_rank.asc()))
+        result = await self.db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    async def list_page(
+        self,
+        *,
+        sort: CoinSort = "rank",
+        after: tuple[Any, int] | None = None,
+        limit: int | None = None,
+        symbol: str | None = None,
+        min_rank: int | None = None,
+        max_rank: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> list[dict]:
+        """Keyset page over (sort column, id), starting strictly after `after`.
+
+        Every query is a range scan on one of the (column, id) indexes, so
+        cost tracks the page size rather than the table size. Unranked coins
+        (NULL rank) come last; they are read as a second id-ordered range
+        instead of relying on NULLS LAST, which SQLite can't serve from an index.
+        """
+        filters: list[ColumnElement[bool]] = []
+        if symbol is not None:
+            filters.append(Coin.symbol == symbol.upper())
+        if min_rank is not None:
+            filters.append(Coin.market_cap_rank >= min_rank)
+        if max_rank is not None:
+            filters.append(Coin.market_cap_rank <= max_rank)
+        if min_price is not None:
+            filters.append(Coin.price_usd >= min_price)
+        if max_price is not None:
+            filters.append(Coin.price_usd <= max_price)
+
+        column, descending = _SORTS[sort]
+        if column is not Coin.market_cap_rank:
+            return await self._range(filters, column, descending, after, limit)
+
+        rows: list[dict] = []
+        if after is None or after[0] is not None:
+            rows = await self._range(
+                [*filters, column.is_not(None)], column, False, after, limit
+            )
+        if limit is None or len(rows) < limit:
+            unranked_after = (None, after[1]) if after and after[0] is None else None
+            rows += await self._range(
+                [*filters, column.is_(None)],
+                None,
+                False,
+                unranked_after,
+                None if limit is None else limit - len(rows),
+            )
+        return rows
+
+    async def _range(
+        self,
+        filters: list[ColumnElement[bool]],
+        column,
+        descending: bool,
+        after: tuple[Any, int] | None,
+        limit: int | None,
+    ) -> list[dict]:
+        keys = [Coin.id] if column is None else [column, Coin.id]
+        stmt = select(*_ROW_COLUMNS).where(*filters)
+        if after is not None:
+            bound = tuple_(*keys) if column is not None else Coin.id
+            start = tuple_(*after) if column is not None else after[1]
+            stmt = stmt.where(bound < start if descending else bound > start)
+        stmt = stmt.order_by(*(k.desc() if descending else k.asc() for k in keys))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
     async def get(self, coin_id: int) -> Coin | None:
         return await self.db.get(Coin, coin_id)
 
-    async def upsert_many(self, coins: list[MarketCoin]) -> int:
-        if not coins:
-            return 0
-
-        rows = [
-            {
-                "external_id": c.external_id,
-                "name": c.name,
-                "symbol": c.symbol,
-                "market_cap_rank": c.market_cap_rank,
-                "price_usd": c.price_usd,
-                "image_url": c.image_url,
-                "last_updated": c.last_updated,
-            }
-            for c in coins
-        ]
-
-        dialect = self.db.bind.dialect.name if self.db.bind else ""
-        if dialect == "postgresql":
-            stmt = postgresql_insert(Coin).values(rows)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[Coin.external_id],
-                set_={
-                    "name": stmt.excluded.name,
-                    "symbol": stmt.excluded.symbol,
-                    "market_cap_rank": stmt.excluded.market_cap_rank,
-                    "price_usd": stmt.excluded.price_usd,
-                    "image_url": stmt.excluded.image_url,
-                    "last_updated": stmt.excluded.last_updated,
-                },
+    async def existing_ids(self, coin_ids: list[int]) -> set[int]:
+        result = await self.db.execute(select(Coin.id).where(Coin.id.in_(coin_ids)))
+        return set(result.scalars().all())
+
+    async def upsert_many(self, coins: list[MarketCoin]) -> UpsertResult:
+        """Write only what differs from what the table holds for each coin.
+
+        New coins and coins whose metadata (name, symbol, rank, image)
+        changed get a full-row upsert; coins where only the price moved get
+        a narrow UPDATE of price_usd/last_updated; the rest are skipped.
+        The baseline is read from the table in this transaction (one SELECT
+        per batch), never from a process-wide cache: other workers refresh
+        too, and skipping a write on a stale baseline would lose it.
+        """
+        started = time.perf_counter()
+        rows = {c.external_id: _row(c) for c in coins}
+        unknown = [eid for eid in rows if eid not in self._seen]
+        loaded = await self._load_fingerprints(unknown) if unknown else {}
+        self._seen.update(loaded)
+
+        full_rows: list[dict] = []
+        price_rows: list[dict] = []
+        inserted = 0
+        for eid, row in rows.items():
+            new = _fingerprint(row)
+            old = self._seen.get(eid)
+            if old == new:
+                continue
+            if old is None or old[0] != new[0]:
+                inserted += old is None
+                full_rows.append(row)
+            else:
+                price_rows.append(row)
+            self._seen[eid] = new
+
+        await self._upsert_rows(full_rows)
+        await self._update_prices(price_rows)
+        result = UpsertResult(
+            received=len(coins),
+            inserted=inserted,
+            metadata_updated=len(full_rows) - inserted,
+            price_updated=len(price_rows),
+            changed_external_ids=[r["external_id"] for r in full_rows + price_rows],
+        )
+        coin_upsert_duration.observe(time.perf_counter() - started)
+        coin_upsert_rows.inc("inserted", amount=result.inserted)
+        coin_upsert_rows.inc("metadata_updated", amount=result.metadata_updated)
+        coin_upsert_rows.inc("price_updated", amount=result.price_updated)
+        coin_upsert_rows.inc("unchanged", amount=result.received - result.changed)
+        return result
+
+    def _chunk_rows(self, columns: int) -> int:
+        return rows_per_statement(self.db, columns)
+
+    def _dialect(self) -> str:
+        return self.db.bind.dialect.name if self.db.bind else ""
+
+    async def _load_fingerprints(self, external_ids: list[str]) -> dict[str, Fingerprint]:
+        loaded: dict[str, Fingerprint] = {}
+        chunk = self._chunk_rows(1)
+        for i in range(0, len(external_ids), chunk):
+            stmt = select(*(getattr(Coin, name) for name in _UPSERT_COLUMNS)).where(
+                Coin.external_id.in_(external_ids[i : i + chunk])
+            )
+            result = await self.db.execute(stmt)
+            for row in result.mappings():
+                loaded[row["external_id"]] = _fingerprint(row)
+        return loaded
+
+    async def _upsert_rows(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        if use_copy(self.db, len(rows)):
+            await copy_merge(
+                self.db, Coin.__table__, rows, index_elements=["external_id"], set_=_coin_updates
             )
-        else:
-            # SQLite path (also covers aiosqlite)
-            stmt = sqlite_insert(Coin).values(rows)
+            return
+        insert = postgresql_insert if self._dialect() == "postgresql" else sqlite_insert
+        chunk = self._chunk_rows(len(_UPSERT_COLUMNS))
+        for i in range(0, len(rows), chunk):
+            stmt = insert(Coin).values(rows[i : i + chunk])
             stmt = stmt.on_conflict_do_update(
-                index_elements=[Coin.external_id],
-                set_={
-                    "name": stmt.excluded.name,
-                    "symbol": stmt.excluded.symbol,
-                    "market_cap_rank": stmt.excluded.market_cap_rank,
-                    "price_usd": stmt.excluded.price_usd,
-                    "image_url": stmt.excluded.image_url,
-                    "last_updated": stmt.excluded.last_updated,
-                },
+                index_elements=[Coin.external_id], set_=_coin_updates(stmt.excluded)
             )
+            await self.db.execute(stmt)
 
-        await self.db.execute(stmt)
-        return len(rows)
+    async def _update_prices(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        # executemany: one parameter set per row, so no bind-limit chunking.
+        coins = Coin.__table__
+        stmt = (
+            update(coins)
+            .where(coins.c.external_id == bindparam("b_external_id"))
+            .values(price_usd=bindparam("b_price_usd"), last_updated=bindparam("b_last_updated"))
+        )
+        await self.db.execute(
+            stmt,
+            [
+                {
+                    "b_external_id": r["external_id"],
+                    "b_price_usd": r["price_usd"],
+                    "b_last_updated": r["last_updated"],
+                }
+                for r in rows
+            ],
+        )
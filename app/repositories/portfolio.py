@@ -1,8 +1,10 @@
-from sqlalchemy import delete, select
+from sqlalchemy import Row, delete, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import PortfolioItem
+from app.models import Coin, PortfolioItem
 
 
 class PortfolioRepository:
@@ -28,11 +30,99 @@ class PortfolioRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def add(self, user_id: int, coin_id: int) -> PortfolioItem:
-        item = PortfolioItem(user_id=user_id, coin_id=coin_id)
-        self.db.add(item)
-        await self.db.flush()
-        return item
+    async def holdings_with_prices(self, user_id: int) -> list[tuple]:
+        """(coin_id, external_id, symbol, price_usd, quantity, cost_basis_usd) per holding.
+
+        One joined query returning plain tuples — no ORM objects per item.
+        """
+        stmt = (
+            select(
+                Coin.id,
+                Coin.external_id,
+                Coin.symbol,
+                Coin.price_usd,
+                PortfolioItem.quantity,
+                PortfolioItem.cost_basis_usd,
+            )
+            .join(Coin, Coin.id == PortfolioItem.coin_id)
+            .where(PortfolioItem.user_id == user_id)
+            .order_by(Coin.id)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    def _insert(self):
+        dialect = self.db.bind.dialect.name if self.db.bind else ""
+        return postgresql_insert if dialect == "postgresql" else sqlite_insert
+
+    async def add(
+        self,
+        user_id: int,
+        coin_id: int,
+        quantity: float = 0.0,
+        cost_basis_usd: float = 0.0,
+    ) -> Row | None:
+        """Insert the holding and return it with its coin's columns, in one statement.
+
+        INSERT ... SELECT FROM coins WHERE id = :coin_id ON CONFLICT DO
+        NOTHING RETURNING: nothing comes back when the coin doesn't exist or
+        is already held, and the caller tells those apart only then. The coin
+        columns ride along as scalar subqueries in RETURNING, since RETURNING
+        can only name the inserted table.
+        """
+        source = select(
+            literal(user_id), Coin.id, literal(quantity), literal(cost_basis_usd)
+        ).where(Coin.id == coin_id)
+        coin_columns = [
+            select(column).where(Coin.id == coin_id).scalar_subquery().label(column.key)
+            for column in Coin.__table__.columns
+        ]
+        stmt = (
+            self._insert()(PortfolioItem)
+            .from_select(["user_id", "coin_id", "quantity", "cost_basis_usd"], source)
+            .on_conflict_do_nothing(index_elements=["user_id", "coin_id"])
+            .returning(
+                PortfolioItem.quantity,
+                PortfolioItem.cost_basis_usd,
+                PortfolioItem.added_at,
+                *coin_columns,
+            )
+        )
+        result = await self.db.execute(stmt)
+        return result.one_or_none()
+
+    async def add_many(self, user_id: int, coin_ids: list[int]) -> set[int]:
+        """Watch every existing, not-yet-held coin of `coin_ids`; return the ids added."""
+        source = select(literal(user_id), Coin.id).where(Coin.id.in_(coin_ids))
+        stmt = (
+            self._insert()(PortfolioItem)
+            .from_select(["user_id", "coin_id"], source)
+            .on_conflict_do_nothing(index_elements=["user_id", "coin_id"])
+            .returning(PortfolioItem.coin_id)
+        )
+        result = await self.db.execute(stmt)
+        return set(result.scalars().all())
+
+    async def remove_many(self, user_id: int, coin_ids: list[int]) -> set[int]:
+        """Delete these holdings; return the coin ids that were held."""
+        stmt = (
+            delete(PortfolioItem)
+            .where(PortfolioItem.user_id == user_id, PortfolioItem.coin_id.in_(coin_ids))
+            .returning(PortfolioItem.coin_id)
+        )
+        result = await self.db.execute(stmt)
+        return set(result.scalars().all())
+
+    async def set_holding(
+        self, user_id: int, coin_id: int, quantity: float, cost_basis_usd: float
+    ) -> bool:
+        stmt = (
+            update(PortfolioItem)
+            .where(PortfolioItem.user_id == user_id, PortfolioItem.coin_id == coin_id)
+            .values(quantity=quantity, cost_basis_usd=cost_basis_usd)
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount > 0
 
     async def remove(self, user_id: int, coin_id: int) -> bool:
         stmt = delete(PortfolioItem).where(
@@ -0,0 +1,142 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, Integer, cast, extract, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Coin, PricePoint
+from app.repositories.bulk import rows_per_statement
+
+
+# (coin_id, ts, price_usd)
+Point = tuple[int, datetime, float]
+
+
+class PriceHistoryRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def _dialect(self) -> str:
+        return self.db.bind.dialect.name if self.db.bind else ""
+
+    async def append_from_coins(self, external_ids: list[str], ts: datetime) -> list[Point]:
+        """Record the current price of these coins as points at `ts`.
+
+        A single INSERT ... SELECT from `coins`, meant to run in the same
+        transaction as CoinRepository.upsert_many with every coin it received.
+        Points are stamped with the refresh time `ts`, not the provider's
+        last_updated: providers don't always move that timestamp when the
+        price moves (CoinCap without `time` reports the epoch), and a move
+        must still be recorded. Returns one point per coin, which is what
+        candles, alerts and the stream are fed from.
+        """
+        if not external_ids:
+            return []
+        insert = postgresql_insert if self._dialect() == "postgresql" else sqlite_insert
+        points: list[Point] = []
+        chunk = max(1, rows_per_statement(self.db, 1) - 1)  # ts is one more parameter
+        for i in range(0, len(external_ids), chunk):
+            source = select(Coin.id, literal(ts, DateTime()), Coin.price_usd).where(
+                Coin.external_id.in_(external_ids[i : i + chunk])
+            )
+            stmt = insert(PricePoint).from_select(["coin_id", "ts", "price_usd"], source)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PricePoint.coin_id, PricePoint.ts],
+                set_={"price_usd": stmt.excluded.price_usd},
+            ).returning(PricePoint.coin_id, PricePoint.ts, PricePoint.price_usd)
+            result = await self.db.execute(stmt)
+            points.extend(tuple(row) for row in result.all())
+        return points
+
+    async def points_after(
+        self, after: tuple[int, datetime] | None, limit: int, coin_id: int | None = None
+    ) -> list[Point]:
+        """Keyset walk over price_points in primary-key order, for backfills."""
+        stmt = select(PricePoint.coin_id, PricePoint.ts, PricePoint.price_usd)
+        if coin_id is not None:
+            stmt = stmt.where(PricePoint.coin_id == coin_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(PricePoint.coin_id, PricePoint.ts) > tuple_(*after))
+        stmt = stmt.order_by(PricePoint.coin_id, PricePoint.ts).limit(limit)
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def points_in_range(
+        self, coin_id: int, start: datetime, end: datetime
+    ) -> list[Point]:
+        stmt = (
+            select(PricePoint.coin_id, PricePoint.ts, PricePoint.price_usd)
+            .where(PricePoint.coin_id == coin_id, PricePoint.ts >= start, PricePoint.ts < end)
+            .order_by(PricePoint.ts)
+        )
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    def _epoch_seconds(self):
+        if self._dialect() == "postgresql":
+            return cast(func.floor(extract("epoch", PricePoint.ts)), BigInteger)
+        return cast(func.strftime("%s", PricePoint.ts), Integer)
+
+    async def downsample(
+        self, coin_id: int, start: datetime, end: datetime, step_seconds: int
+    ) -> list[tuple[datetime, float]]:
+        """Average price per `step_seconds` bucket in [start, end), computed in SQL."""
+        bucket = (self._epoch_seconds() // step_seconds).label("bucket")
+        stmt = (
+            select(bucket, func.avg(PricePoint.price_usd))
+            .where(
+                PricePoint.coin_id == coin_id,
+                PricePoint.ts >= start,
+                PricePoint.ts < end,
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        result = await self.db.execute(stmt)
+        return [
+            (
+                datetime.fromtimestamp(b * step_seconds, tz=timezone.utc).replace(tzinfo=None),
+                float(avg),
+            )
+            for b, avg in result.all()
+        ]
+
+    async def last_prices_at(self, coin_ids: list[int], at: datetime) -> list[tuple[int, float]]:
+        """Each coin's latest price at or before `at`, for carrying into a range."""
+        if not coin_ids:
+            return []
+        latest = (
+            select(PricePoint.coin_id, func.max(PricePoint.ts).label("ts"))
+            .where(PricePoint.coin_id.in_(coin_ids), PricePoint.ts <= at)
+            .group_by(PricePoint.coin_id)
+            .subquery()
+        )
+        stmt = select(PricePoint.coin_id, PricePoint.price_usd).join(
+            latest, (PricePoint.coin_id == latest.c.coin_id) & (PricePoint.ts == latest.c.ts)
+        )
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def downsample_many(
+        self, coin_ids: list[int], start: datetime, end: datetime, step_seconds: int
+    ) -> list[tuple[int, int, float]]:
+        """Average price per (coin, bucket) for several coins in one range query.
+
+        Buckets are returned as epoch // step_seconds so callers can index
+        straight into an aligned array.
+        """
+        if not coin_ids:
+            return []
+        bucket = (self._epoch_seconds() // step_seconds).label("bucket")
+        stmt = (
+            select(PricePoint.coin_id, bucket, func.avg(PricePoint.price_usd))
+            .where(
+                PricePoint.coin_id.in_(coin_ids),
+                PricePoint.ts >= start,
+                PricePoint.ts < end,
+            )
+            .group_by(PricePoint.coin_id, bucket)
+        )
+        result = await self.db.execute(stmt)
+        return [(coin_id, int(b), float(avg)) for coin_id, b, avg in result.all()]
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import RefreshToken
+from app.models import RefreshToken, User
 
 
 class RefreshTokenRepository:
@@ -30,6 +30,34 @@ class RefreshTokenRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def consume(self, token_hash: str) -> tuple[int, str] | None:
+        """Revoke an active token and return its owner's (id, email), atomically.
+
+        One conditional UPDATE ... RETURNING: of any number of concurrent
+        calls with the same token, exactly one matches the `revoked_at IS
+        NULL` row and gets the user back; the rest get None. The email comes
+        from a correlated subquery rather than UPDATE ... FROM, because SQLite
+        can't return columns of a FROM table.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        email = select(User.email).where(User.id == RefreshToken.user_id).scalar_subquery()
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, email.label("email"))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        row = result.one_or_none()
+        if row is None or row.email is None:
+            return None
+        return row.user_id, row.email
+
     async def revoke(self, token_id: int) -> None:
         await self.db.execute(
             update(RefreshToken)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from app.deps import AlertServiceDep, CurrentUserDep
+from app.rate_limit import limiter
+from app.schemas.alert import AlertCreateRequest, AlertResponse
+
+
+router = APIRouter(
+    prefix="/alerts",
+    tags=["alerts"],
+    dependencies=[Depends(limiter.limit("60/minute", bucket="alerts"))],
+)
+
+
+@router.get("", response_model=list[AlertResponse])
+async def list_alerts(user: CurrentUserDep, service: AlertServiceDep) -> list[AlertResponse]:
+    alerts = await service.list_for_user(user.id)
+    return [AlertResponse.model_validate(alert) for alert in alerts]
+
+
+@router.post("", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
+async def create_alert(
+    payload: AlertCreateRequest, user: CurrentUserDep, service: AlertServiceDep
+) -> AlertResponse:
+    """One-shot alert, fired by the first refresh whose price move crosses `threshold`."""
+    alert = await service.create(user.id, payload.coin_id, payload.direction, payload.threshold)
+    return AlertResponse.model_validate(alert)
+
+
+@router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert(
+    alert_id: int, user: CurrentUserDep, service: AlertServiceDep
+) -> Response:
+    await service.delete(user.id, alert_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Response, status
+from fastapi import APIRouter, Depends, Response, status
 
 from app.deps import AuthServiceDep
 from app.rate_limit import limiter
@@ -18,7 +18,7 @@ def _to_token_response(pair) -> TokenResponse:
     return TokenResponse(
         access_token=pair.access_token,
         refresh_token=pair.refresh_token,
-        email=pair.user.email,
+        email=pair.email,
     )
 
 
@@ -26,29 +26,29 @@ def _to_token_response(pair) -> TokenResponse:
     "/register",
     response_model=TokenResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limiter.limit("3/minute"))],
 )
-@limiter.limit("3/minute")
-async def register(
-    request: Request, payload: RegisterRequest, auth: AuthServiceDep
-) -> TokenResponse:
+async def register(payload: RegisterRequest, auth: AuthServiceDep) -> TokenResponse:
     pair = await auth.register(payload.email, payload.password)
     return _to_token_response(pair)
 
 
-@router.post("/login", response_model=TokenResponse)
-@limiter.limit("5/minute")
-async def login(
-    request: Request, payload: LoginRequest, auth: AuthServiceDep
-) -> TokenResponse:
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(limiter.limit("5/minute"))],
+)
+async def login(payload: LoginRequest, auth: AuthServiceDep) -> TokenResponse:
     pair = await auth.authenticate(payload.email, payload.password)
     return _to_token_response(pair)
 
 
-@router.post("/refresh", response_model=TokenResponse)
-@limiter.limit("10/minute")
-async def refresh(
-    request: Request, payload: RefreshRequest, auth: AuthServiceDep
-) -> TokenResponse:
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(limiter.limit("10/minute"))],
+)
+async def refresh(payload: RefreshRequest, auth: AuthServiceDep) -> TokenResponse:
     pair = await auth.refresh(payload.refresh_token)
     return _to_token_response(pair)
 
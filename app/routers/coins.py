@@ -1,23 +1,187 @@
-from fastapi import APIRouter, status
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+from typing import Annotated, AsyncIterator
 
-from app.deps import CoinServiceDep
-from app.schemas.coin import CoinRefreshResponse, CoinResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from app.broadcast import PriceUpdate, price_broadcaster
+from app.cache import dump_json
+from app.config import settings
+from app.deps import CoinServiceDep, RefresherDep
+from app.providers.hedged import provider_stats
+from app.rate_limit import limiter
+from app.schemas.coin import (
+    CoinCandlesResponse,
+    CoinHistoryResponse,
+    CoinListParams,
+    CoinRefreshStatusResponse,
+    CoinResponse,
+)
+from app.services.candles import RESOLUTIONS
+from app.services.coin import refresh_flight
+from app.services.refresher import PriceRefresher
 
 
 router = APIRouter(prefix="/coins", tags=["coins"])
 
 
+def _status_response(refresher: PriceRefresher) -> CoinRefreshStatusResponse:
+    return CoinRefreshStatusResponse(
+        **asdict(refresher.status),
+        executed_refreshes=refresh_flight.executed,
+        coalesced_refreshes=refresh_flight.coalesced,
+        throttled_refreshes=refresh_flight.throttled,
+        providers=[asdict(health) for health in provider_stats.snapshot()],
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison and may list several tags or "*".
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("", response_model=list[CoinResponse])
-async def list_coins(service: CoinServiceDep) -> list[CoinResponse]:
-    coins = await service.list_coins()
-    return [CoinResponse.model_validate(c, from_attributes=True) for c in coins]
+async def list_coins(
+    service: CoinServiceDep,
+    params: Annotated[CoinListParams, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    # response_model documents the contract; bodies are encoded straight from
+    # column rows, so FastAPI's validation/encoding pass is skipped.
+    if params.model_dump(exclude_defaults=True):
+        rows, next_cursor = await service.list_coins_page(params)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=dump_json(rows), media_type="application/json", headers=headers)
+
+    snapshot = await service.list_coins()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+def _encode_updates(updates: list[PriceUpdate], dropped: int) -> bytes:
+    return dump_json({"dropped": dropped, "prices": [u.as_dict() for u in updates]})
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_prices_sse(
+    coin_ids: Annotated[list[int] | None, Query(description="Only these coins")] = None,
+) -> StreamingResponse:
+    """Server-Sent Events: a `prices` event after each refresh that moved a subscribed coin.
+
+    `dropped` counts updates lost because the client fell more than
+    STREAM_QUEUE_SIZE updates behind.
+    """
+
+    async def events() -> AsyncIterator[bytes]:
+        subscription = price_broadcaster.subscribe(coin_ids)
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    updates, dropped = await asyncio.wait_for(
+                        subscription.next_batch(), settings.STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield b"event: prices\ndata: " + _encode_updates(updates, dropped) + b"\n\n"
+        finally:
+            price_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_prices_ws(
+    websocket: WebSocket,
+    coin_ids: Annotated[list[int] | None, Query()] = None,
+) -> None:
+    """Same payload as the SSE stream, one text frame per refresh."""
+    await websocket.accept()
+    subscription = price_broadcaster.subscribe(coin_ids)
+
+    async def push() -> None:
+        while True:
+            updates, dropped = await subscription.next_batch()
+            await websocket.send_text(_encode_updates(updates, dropped).decode())
+
+    async def until_disconnect() -> None:
+        # Client frames are ignored; reading is how a close is noticed.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(push()), asyncio.create_task(until_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        price_broadcaster.unsubscribe(subscription)
+
+
+@router.get("/{coin_id}/history", response_model=CoinHistoryResponse)
+async def coin_history(
+    coin_id: int,
+    service: CoinServiceDep,
+    start: Annotated[datetime | None, Query(alias="from")] = None,
+    end: Annotated[datetime | None, Query(alias="to")] = None,
+    step: Annotated[
+        str | None, Query(pattern=r"^[1-9][0-9]*[smhd]$", description="e.g. 5m, 1h, 1d")
+    ] = None,
+) -> CoinHistoryResponse:
+    """Server-side downsampled price history: one average per `step` bucket."""
+    return await service.price_history(coin_id, start, end, step)
+
+
+@router.get("/{coin_id}/candles", response_model=CoinCandlesResponse)
+async def coin_candles(
+    coin_id: int,
+    service: CoinServiceDep,
+    resolution: Annotated[str, Query(description=f"One of {', '.join(RESOLUTIONS)}")] = "1h",
+    start: Annotated[datetime | None, Query(alias="from")] = None,
+    end: Annotated[datetime | None, Query(alias="to")] = None,
+) -> CoinCandlesResponse:
+    """OHLC candles, read from the pre-aggregated rollups only."""
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"resolution must be one of {', '.join(RESOLUTIONS)}",
+        )
+    return await service.candles_for(coin_id, resolution, start, end)
 
 
 @router.post(
     "/refresh",
-    response_model=CoinRefreshResponse,
+    response_model=CoinRefreshStatusResponse,
     status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(limiter.limit("6/minute"))],
 )
-async def refresh_coins(service: CoinServiceDep) -> CoinRefreshResponse:
-    count, source = await service.refresh_from_provider()
-    return CoinRefreshResponse(refreshed_count=count, source=source)
+async def refresh_coins(refresher: RefresherDep) -> CoinRefreshStatusResponse:
+    # Only wakes the background refresher; the upstream fetch and upsert
+    # happen off the request path.
+    refresher.nudge()
+    return _status_response(refresher)
+
+
+@router.get("/refresh/status", response_model=CoinRefreshStatusResponse)
+async def refresh_status(refresher: RefresherDep) -> CoinRefreshStatusResponse:
+    return _status_response(refresher)
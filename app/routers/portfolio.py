@@ -1,16 +1,35 @@
-from fastapi import APIRouter, Response, status
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Response, status
 
 from app.deps import CurrentUserDep, PortfolioServiceDep
+from app.rate_limit import limiter
 from app.schemas.coin import CoinResponse
-from app.schemas.portfolio import PortfolioAddRequest, PortfolioItemResponse
+from app.schemas.portfolio import (
+    PortfolioAddRequest,
+    PortfolioBatchRequest,
+    PortfolioBatchResponse,
+    PortfolioHoldingUpdate,
+    PortfolioItemResponse,
+    PortfolioPerformanceResponse,
+    PortfolioValuationResponse,
+)
 
 
-router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+# One per-user budget across every portfolio route.
+router = APIRouter(
+    prefix="/portfolio",
+    tags=["portfolio"],
+    dependencies=[Depends(limiter.limit("120/minute", bucket="portfolio"))],
+)
 
 
 def _to_response(item) -> PortfolioItemResponse:
     return PortfolioItemResponse(
         coin=CoinResponse.model_validate(item.coin, from_attributes=True),
+        quantity=item.quantity,
+        cost_basis_usd=item.cost_basis_usd,
         added_at=item.added_at,
     )
 
@@ -33,7 +52,60 @@ async def add_to_portfolio(
     user: CurrentUserDep,
     service: PortfolioServiceDep,
 ) -> PortfolioItemResponse:
-    item = await service.add(user.id, payload.coin_id)
+    return await service.add(user.id, payload.coin_id, payload.quantity, payload.cost_basis_usd)
+
+
+# Registered before the /{coin_id} routes, which would otherwise claim "batch".
+@router.post("/batch", response_model=PortfolioBatchResponse)
+async def add_many_to_portfolio(
+    payload: PortfolioBatchRequest,
+    user: CurrentUserDep,
+    service: PortfolioServiceDep,
+) -> PortfolioBatchResponse:
+    """Watch up to 500 coins in one statement; each id reports its own outcome."""
+    return await service.add_many(user.id, payload.coin_ids)
+
+
+@router.delete("/batch", response_model=PortfolioBatchResponse)
+async def remove_many_from_portfolio(
+    payload: PortfolioBatchRequest,
+    user: CurrentUserDep,
+    service: PortfolioServiceDep,
+) -> PortfolioBatchResponse:
+    return await service.remove_many(user.id, payload.coin_ids)
+
+
+@router.get("/valuation", response_model=PortfolioValuationResponse)
+async def portfolio_valuation(
+    user: CurrentUserDep, service: PortfolioServiceDep
+) -> PortfolioValuationResponse:
+    return await service.valuation(user.id)
+
+
+@router.get("/performance", response_model=PortfolioPerformanceResponse)
+async def portfolio_performance(
+    user: CurrentUserDep,
+    service: PortfolioServiceDep,
+    start: Annotated[datetime | None, Query(alias="from")] = None,
+    end: Annotated[datetime | None, Query(alias="to")] = None,
+    step: Annotated[
+        str | None, Query(pattern=r"^[1-9][0-9]*[smhd]$", description="e.g. 5m, 1h, 1d")
+    ] = None,
+) -> PortfolioPerformanceResponse:
+    """Portfolio value per `step` bucket, using current holdings throughout."""
+    return await service.performance(user.id, start, end, step)
+
+
+@router.patch("/{coin_id}", response_model=PortfolioItemResponse)
+async def update_holding(
+    coin_id: int,
+    payload: PortfolioHoldingUpdate,
+    user: CurrentUserDep,
+    service: PortfolioServiceDep,
+) -> PortfolioItemResponse:
+    item = await service.set_holding(
+        user.id, coin_id, payload.quantity, payload.cost_basis_usd
+    )
     return _to_response(item)
 
 
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AlertCreateRequest(BaseModel):
+    coin_id: int = Field(gt=0)
+    direction: Literal["above", "below"] = Field(
+        description="Fire when the price rises to/through (above) or falls to/through (below) the threshold"
+    )
+    threshold: float = Field(gt=0, description="Price in USD")
+
+
+class AlertResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    coin_id: int
+    direction: Literal["above", "below"]
+    threshold: float
+    created_at: datetime
+    triggered_at: datetime | None
+    triggered_price: float | None
@@ -1,8 +1,25 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
 
+CoinSort = Literal["rank", "price", "-price", "symbol"]
+
+
+class CoinListParams(BaseModel):
+    """Query string for GET /coins. With none of these set the full cached list is served."""
+
+    limit: int | None = Field(None, ge=1, le=500, description="Page size; enables paging")
+    cursor: str | None = Field(None, description="X-Next-Cursor value from the previous page")
+    sort: CoinSort = "rank"
+    symbol: str | None = Field(None, min_length=1, max_length=16)
+    min_rank: int | None = Field(None, ge=1)
+    max_rank: int | None = Field(None, ge=1)
+    min_price: float | None = Field(None, ge=0)
+    max_price: float | None = Field(None, ge=0)
+
+
 class CoinResponse(BaseModel):
     id: int
     external_id: str = Field(description="Provider's slug, e.g. 'bitcoin'")
@@ -14,6 +31,57 @@ class CoinResponse(BaseModel):
     last_updated: datetime
 
 
-class CoinRefreshResponse(BaseModel):
-    refreshed_count: int
-    source: str
+class ProviderHealthResponse(BaseModel):
+    name: str
+    requests: int
+    errors: int
+    error_rate: float = Field(description="Share of failures over the recent window")
+    p50_ms: float | None
+    p95_ms: float | None
+
+
+class CoinRefreshStatusResponse(BaseModel):
+    running: bool = Field(description="Whether the background refresher loop is active")
+    source: str | None
+    last_success_at: datetime | None
+    last_duration_ms: float | None
+    last_refreshed_count: int | None = Field(description="Coins received from the provider")
+    last_changed_count: int | None = Field(description="Coins whose row actually changed")
+    last_error: str | None
+    consecutive_failures: int
+    next_run_at: datetime | None
+    executed_refreshes: int = Field(description="Refreshes that actually hit the provider")
+    coalesced_refreshes: int = Field(description="Callers that joined an in-flight refresh")
+    throttled_refreshes: int = Field(
+        description="Callers served the last result inside the minimum interval"
+    )
+    providers: list[ProviderHealthResponse] = Field(
+        default_factory=list, description="Per-upstream latency and errors (hedged mode)"
+    )
+
+
+class PricePointResponse(BaseModel):
+    ts: datetime = Field(description="Bucket start (UTC)")
+    price_usd: float = Field(description="Average price within the bucket")
+
+
+class CoinHistoryResponse(BaseModel):
+    coin_id: int
+    start: datetime
+    end: datetime
+    step_seconds: int
+    points: list[PricePointResponse]
+
+
+class CandleResponse(BaseModel):
+    ts: datetime = Field(description="Bucket start (UTC)")
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+class CoinCandlesResponse(BaseModel):
+    coin_id: int
+    resolution: str
+    candles: list[CandleResponse]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -7,8 +8,63 @@ from app.schemas.coin import CoinResponse
 
 class PortfolioAddRequest(BaseModel):
     coin_id: int = Field(gt=0)
+    quantity: float = Field(0.0, ge=0)
+    cost_basis_usd: float = Field(0.0, ge=0, description="Total USD paid for `quantity`")
+
+
+class PortfolioBatchRequest(BaseModel):
+    coin_ids: list[Annotated[int, Field(gt=0)]] = Field(min_length=1, max_length=500)
+
+
+class PortfolioBatchResult(BaseModel):
+    coin_id: int
+    status: Literal["added", "removed", "already_in_portfolio", "not_in_portfolio", "coin_not_found"]
+
+
+class PortfolioBatchResponse(BaseModel):
+    results: list[PortfolioBatchResult]
+
+
+class PortfolioHoldingUpdate(BaseModel):
+    quantity: float = Field(ge=0)
+    cost_basis_usd: float = Field(ge=0, description="Total USD paid for `quantity`")
 
 
 class PortfolioItemResponse(BaseModel):
     coin: CoinResponse
+    quantity: float
+    cost_basis_usd: float
     added_at: datetime
+
+
+class PositionValuation(BaseModel):
+    coin_id: int
+    external_id: str
+    symbol: str
+    quantity: float
+    price_usd: float
+    value_usd: float
+    cost_basis_usd: float
+    unrealized_pnl_usd: float
+    allocation: float = Field(description="Share of total portfolio value, 0..1")
+
+
+class PortfolioValuationResponse(BaseModel):
+    total_value_usd: float
+    total_cost_basis_usd: float
+    unrealized_pnl_usd: float
+    positions: list[PositionValuation]
+
+
+class PerformancePoint(BaseModel):
+    ts: datetime
+    value_usd: float
+    unrealized_pnl_usd: float
+
+
+class PortfolioPerformanceResponse(BaseModel):
+    start: datetime
+    end: datetime
+    step_seconds: int
+    total_cost_basis_usd: float
+    points: list[PerformancePoint]
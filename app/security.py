@@ -1,11 +1,19 @@
+import asyncio
 import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.exceptions import ServiceBusy
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -21,6 +29,131 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+# bcrypt is deliberately slow (~200ms per call) and would block the event
+# loop, stalling every other request on the worker. Request handlers go
+# through `password_hasher` instead, which runs it on a small dedicated
+# thread pool (bcrypt releases the GIL while hashing). Admission is bounded:
+# at most `workers + queue_size` calls are in the pool, a call that can't
+# even queue is refused, and one still queued after `timeout` seconds is
+# withdrawn — both as ServiceBusy (503) rather than letting a login storm
+# pile up behind the pool.
+
+T = TypeVar("T")
+
+
+def _percentile(values: deque[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    workers: int
+    queue_size: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    timed_out: int
+    hash_p50_ms: float | None
+    hash_p95_ms: float | None
+    wait_p95_ms: float | None
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_size: int, timeout: float, window: int = 1024) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._hash_seconds: deque[float] = deque(maxlen=window)
+        self._wait_seconds: deque[float] = deque(maxlen=window)
+
+    async def hash(self, plain: str) -> str:
+        return await self.run(hash_password, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self.run(verify_password, plain, hashed)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise ServiceBusy()
+            self._pending += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        # The slot is held until the job itself is done (or withdrawn), not
+        # until this coroutine returns: a caller cancelled mid-hash leaves
+        # the thread busy and must not free room for another job.
+        future.add_done_callback(self._release)
+        result = asyncio.wrap_future(future)
+        done, _ = await asyncio.wait({result}, timeout=self.timeout)
+        # Still queued: withdraw it. Already hashing: let it finish.
+        if not done and future.cancel():
+            self.timed_out += 1
+            raise ServiceBusy()
+        return await result
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _timed(self, submitted: float, fn: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_seconds.append(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._hash_seconds.append(time.perf_counter() - started)
+
+    def stats(self) -> PasswordHasherStats:
+        def ms(value: float | None) -> float | None:
+            return None if value is None else value * 1000
+
+        with self._lock:
+            running = self._running
+            hashes, waits = deque(self._hash_seconds), deque(self._wait_seconds)
+        return PasswordHasherStats(
+            workers=self.workers,
+            queue_size=self.queue_size,
+            running=running,
+            queued=max(0, self._pending - running),
+            completed=self.completed,
+            rejected=self.rejected,
+            timed_out=self.timed_out,
+            hash_p50_ms=ms(_percentile(hashes, 50)),
+            hash_p95_ms=ms(_percentile(hashes, 95)),
+            wait_p95_ms=ms(_percentile(waits, 95)),
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+
+
 # --- Access tokens (JWT, stateless) --------------------------------------
 
 def create_access_token(*, user_id: int, email: str) -> str:
@@ -40,6 +173,69 @@ def decode_access_token(token: str) -> dict:
         raise ValueError("Invalid or expired token") from exc
 
 
+@dataclass(frozen=True)
+class TokenCacheStats:
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+
+
+class AccessTokenCache:
+    """LRU of verified access-token claims, keyed by the token's SHA-256.
+
+    An access token is stateless: once its signature checks out, it stays
+    valid until `exp`. Clients send the same token on every request, so the
+    claims are kept until then and later requests skip the HMAC check and
+    JSON parse. Only successfully verified tokens are cached; at most
+    `max_entries` of them (the digest keeps each key at 32 bytes whatever
+    the token's size).
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    def decode(self, token: str) -> dict:
+        """Same contract as decode_access_token: claims, or ValueError."""
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, claims = entry
+            if time.time() < expires:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+
+        self.misses += 1
+        claims = decode_access_token(token)
+        expires = claims.get("exp")
+        if self.max_entries > 0 and isinstance(expires, (int, float)):
+            self._entries[key] = (float(expires), claims)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return claims
+
+    def stats(self) -> TokenCacheStats:
+        return TokenCacheStats(
+            entries=len(self._entries),
+            max_entries=self.max_entries,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+access_token_cache = AccessTokenCache(settings.ACCESS_TOKEN_CACHE_MAX_ENTRIES)
+
+
 # --- Refresh tokens (opaque, server-side state) --------------------------
 #
 # Refresh tokens are random strings, not JWTs. The server stores a hash of
@@ -0,0 +1,36 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.alerts import alert_index
+from app.exceptions import AlertNotFound, CoinNotFound
+from app.models import PriceAlert
+from app.repositories.alert import AlertRepository
+from app.repositories.coin import CoinRepository
+
+
+class AlertService:
+    def __init__(self, db: AsyncSession, alerts: AlertRepository, coins: CoinRepository) -> None:
+        self.db = db
+        self.alerts = alerts
+        self.coins = coins
+
+    async def create(
+        self, user_id: int, coin_id: int, direction: str, threshold: float
+    ) -> PriceAlert:
+        # The refresher's index picks new alerts up on its next sync.
+        if await self.coins.get(coin_id) is None:
+            raise CoinNotFound()
+        alert = await self.alerts.create(user_id, coin_id, direction, threshold)
+        await self.db.commit()
+        await self.db.refresh(alert)
+        return alert
+
+    async def list_for_user(self, user_id: int) -> list[PriceAlert]:
+        return await self.alerts.list_for_user(user_id)
+
+    async def delete(self, user_id: int, alert_id: int) -> None:
+        alert = await self.alerts.get_for_user(user_id, alert_id)
+        if alert is None:
+            raise AlertNotFound()
+        await self.alerts.delete(user_id, alert_id)
+        await self.db.commit()
+        alert_index.discard(alert.id, alert.coin_id, alert.direction, alert.threshold)
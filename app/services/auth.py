@@ -8,16 +8,16 @@ from app.exceptions import (
     InvalidCredentials,
     InvalidRefreshToken,
 )
-from app.models import RefreshToken, User
+from app.models import RefreshToken
 from app.repositories.refresh_token import RefreshTokenRepository
 from app.repositories.user import UserRepository
 from app.security import (
+    PasswordHasher,
     create_access_token,
     generate_refresh_token,
-    hash_password,
     hash_refresh_token,
+    password_hasher,
     refresh_token_expires_at,
-    verify_password,
 )
 
 
@@ -25,7 +25,8 @@ from app.security import (
 class TokenPair:
     access_token: str
     refresh_token: str
-    user: User
+    user_id: int
+    email: str
 
 
 class AuthService:
@@ -34,48 +35,44 @@ class AuthService:
         db: AsyncSession,
         users: UserRepository,
         refresh_tokens: RefreshTokenRepository,
+        hasher: PasswordHasher = password_hasher,
     ) -> None:
         self.db = db
         self.users = users
         self.refresh_tokens = refresh_tokens
+        self.hasher = hasher
 
     async def register(self, email: str, password: str) -> TokenPair:
         if await self.users.get_by_email(email) is not None:
             raise EmailAlreadyRegistered()
+        password_hash = await self.hasher.hash(password)
         try:
-            user = await self.users.create(
-                email=email, password_hash=hash_password(password)
-            )
+            user = await self.users.create(email=email, password_hash=password_hash)
             await self.db.flush()
         except IntegrityError:
             await self.db.rollback()
             raise EmailAlreadyRegistered()
 
-        pair = await self._issue_pair(user)
+        pair = await self._issue_pair(user.id, user.email)
         await self.db.commit()
         return pair
 
     async def authenticate(self, email: str, password: str) -> TokenPair:
         user = await self.users.get_by_email(email)
-        if user is None or not verify_password(password, user.password_hash):
+        if user is None or not await self.hasher.verify(password, user.password_hash):
             raise InvalidCredentials()
-        pair = await self._issue_pair(user)
+        pair = await self._issue_pair(user.id, user.email)
         await self.db.commit()
         return pair
 
     async def refresh(self, refresh_token: str) -> TokenPair:
-        token_hash = hash_refresh_token(refresh_token)
-        existing = await self.refresh_tokens.get_active_by_hash(token_hash)
-        if existing is None:
-            raise InvalidRefreshToken()
-
-        user = await self.users.get(existing.user_id)
-        if user is None:
+        # Rotation: revoking the old token and reading its user is one
+        # conditional UPDATE, so a token can only ever be exchanged once.
+        owner = await self.refresh_tokens.consume(hash_refresh_token(refresh_token))
+        if owner is None:
+            await self.db.rollback()
             raise InvalidRefreshToken()
-
-        # Rotation: revoke the old token, issue a fresh pair.
-        await self.refresh_tokens.revoke(existing.id)
-        pair = await self._issue_pair(user)
+        pair = await self._issue_pair(*owner)
         await self.db.commit()
         return pair
 
@@ -87,12 +84,12 @@ class AuthService:
             await self.refresh_tokens.revoke(existing.id)
             await self.db.commit()
 
-    async def _issue_pair(self, user: User) -> TokenPair:
-        access = create_access_token(user_id=user.id, email=user.email)
+    async def _issue_pair(self, user_id: int, email: str) -> TokenPair:
+        access = create_access_token(user_id=user_id, email=email)
         refresh = generate_refresh_token()
         await self.refresh_tokens.create(
-            user_id=user.id,
+            user_id=user_id,
             token_hash=hash_refresh_token(refresh),
             expires_at=refresh_token_expires_at(),
         )
-        return TokenPair(access_token=access, refresh_token=refresh, user=user)
+        return TokenPair(access_token=access, refresh_token=refresh, user_id=user_id, email=email)
@@ -0,0 +1,56 @@
+"""OHLC candle rollups.
+
+Candles are maintained incrementally: every refresh folds just its newly
+inserted price points into the buckets of each resolution (see
+CoinService._refresh). `backfill` rebuilds them from raw history, e.g.
+after adding a resolution or importing old points.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories.candle import CandleRepository
+from app.repositories.price_history import PriceHistoryRepository
+
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_step(step: str) -> int:
+    """'30s' / '5m' / '1h' / '1d' -> seconds."""
+    return int(step[:-1]) * _UNITS[step[-1]]
+
+
+# name -> seconds, e.g. {"1m": 60, "1h": 3600, "1d": 86400}
+RESOLUTIONS: dict[str, int] = {name: parse_step(name) for name in settings.CANDLE_RESOLUTIONS}
+
+
+async def backfill(
+    db: AsyncSession, *, coin_id: int | None = None, chunk_size: int = 10_000
+) -> tuple[int, int]:
+    """Rebuild candles from price_points; returns (points read, candle upserts).
+
+    Reads history in primary-key order with a keyset cursor, so memory stays
+    bounded, but clears and rebuilds in one transaction: readers keep seeing
+    the old candles until the new ones commit, and concurrent refreshes
+    wait to write theirs rather than open a bucket the rebuild is about to
+    reach. A crash rolls everything back and can simply be re-run.
+    """
+    history = PriceHistoryRepository(db)
+    candles = CandleRepository(db)
+    points_read = upserts = 0
+    after = None
+    try:
+        await candles.lock_for_rebuild()
+        await candles.clear(coin_id)
+        while True:
+            points = await history.points_after(after, chunk_size, coin_id=coin_id)
+            if not points:
+                break
+            upserts += await candles.apply(points, RESOLUTIONS.values())
+            points_read += len(points)
+            after = (points[-1][0], points[-1][1])
+    except BaseException:
+        await db.rollback()
+        raise
+    await db.commit()
+    return points_read, upserts
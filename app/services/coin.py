@@ -1,29 +1,320 @@
+import asyncio
+import base64
+import binascii
+import json
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, NamedTuple
+
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.exceptions import ProviderUnavailable
-from app.models import Coin
+from app.alerts import TriggeredAlert, alert_deliveries, alert_index
+from app.broadcast import price_broadcaster
+from app.cache import CoinListSnapshot, coin_list_cache, performance_cache
+from app.config import settings
+from app.exceptions import CoinNotFound, InvalidCursor, InvalidTimeRange, ProviderUnavailable
 from app.providers.base import PriceProvider
+from app.providers.paging import market_batches
+from app.repositories.alert import AlertRepository
+from app.repositories.candle import CandleRepository
 from app.repositories.coin import CoinRepository
+from app.repositories.price_history import PriceHistoryRepository
+from app.schemas.coin import (
+    CandleResponse,
+    CoinCandlesResponse,
+    CoinHistoryResponse,
+    CoinListParams,
+    CoinSort,
+    PricePointResponse,
+)
+from app.services.candles import RESOLUTIONS, parse_step
+
+
+class RefreshResult(NamedTuple):
+    received: int
+    changed: int
+    source: str
+    # False when the caller got another run's result (shared or replayed).
+    ran: bool = True
+
+
+class RefreshCoalescer:
+    """Single-flight gate around a refresh.
+
+    Concurrent callers share the one in-flight fetch + upsert and all get its
+    result. After a successful run, callers within `min_interval` seconds get
+    that result back instead of hitting the upstream again. Process-local:
+    each worker coalesces its own callers.
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self.reset()
+
+    def reset(self) -> None:
+        self.executed = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self._inflight: asyncio.Task[RefreshResult] | None = None
+        self._last_result: RefreshResult | None = None
+        self._last_finished = 0.0
+
+    async def run(self, refresh: Callable[[], Awaitable[RefreshResult]]) -> RefreshResult:
+        if self._inflight is not None:
+            self.coalesced += 1
+            # shield: a follower giving up must not cancel the shared run.
+            return (await asyncio.shield(self._inflight))._replace(ran=False)
+        if (
+            self._last_result is not None
+            and time.monotonic() - self._last_finished < self.min_interval
+        ):
+            self.throttled += 1
+            return self._last_result._replace(ran=False)
+
+        self.executed += 1
+        task = self._inflight = asyncio.ensure_future(refresh())
+        task.add_done_callback(self._finished)
+        try:
+            # shield: the leader giving up must not cancel its followers' run
+            # either; cancel() is the way to stop it.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                # The run is using the leader's session: let it finish before
+                # the leader unwinds and closes it.
+                await asyncio.wait({task})
+            raise
+
+    def cancel(self) -> None:
+        """Cancel the in-flight run (e.g. on shutdown); all its callers see it."""
+        if self._inflight is not None:
+            self._inflight.cancel()
+
+    def _finished(self, task: asyncio.Task[RefreshResult]) -> None:
+        self._inflight = None
+        if not task.cancelled() and task.exception() is None:
+            self._last_result = task.result()
+            self._last_finished = time.monotonic()
+
+
+refresh_flight = RefreshCoalescer(settings.PRICE_REFRESH_MIN_INTERVAL_SECONDS)
+
+
+# sort name -> row field carried in the cursor
+_CURSOR_FIELDS = {
+    "rank": "market_cap_rank",
+    "price": "price_usd",
+    "-price": "price_usd",
+    "symbol": "symbol",
+}
+
+
+def _encode_cursor(sort: CoinSort, row: dict) -> str:
+    raw = json.dumps([sort, row[_CURSOR_FIELDS[sort]], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: CoinSort) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor()
+    if cursor_sort != sort or not isinstance(last_id, int):
+        raise InvalidCursor()
+    return value, last_id
+
+
+_DEFAULT_HISTORY_WINDOW = timedelta(days=1)
+_DEFAULT_HISTORY_POINTS = 200
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def resolve_range(
+    start: datetime | None, end: datetime | None, step: str | None
+) -> tuple[datetime, datetime, int]:
+    """Fill defaults and enforce HISTORY_MAX_POINTS.
+
+    Without `from` the window is the last 24h (shortened if `step` is too
+    fine to cover it); without `step` it is split into ~200 buckets.
+    """
+    end = _naive_utc(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+    step_seconds = parse_step(step) if step else None
+    if start is not None:
+        start = _naive_utc(start)
+    elif step_seconds is not None:
+        start = end - min(
+            _DEFAULT_HISTORY_WINDOW, timedelta(seconds=step_seconds * settings.HISTORY_MAX_POINTS)
+        )
+    else:
+        start = end - _DEFAULT_HISTORY_WINDOW
+    if start >= end:
+        raise InvalidTimeRange("'from' must be before 'to'")
+    span = (end - start).total_seconds()
+    if step_seconds is None:
+        step_seconds = max(60, math.ceil(span / _DEFAULT_HISTORY_POINTS))
+    if span / step_seconds > settings.HISTORY_MAX_POINTS:
+        raise InvalidTimeRange(
+            f"Range/step would return more than {settings.HISTORY_MAX_POINTS} points"
+        )
+    return start, end, step_seconds
 
 
 class CoinService:
     def __init__(
-        self, db: AsyncSession, coins: CoinRepository, provider: PriceProvider
+        self,
+        db: AsyncSession,
+        coins: CoinRepository,
+        history: PriceHistoryRepository,
+        candles: CandleRepository,
+        alerts: AlertRepository,
+        provider: PriceProvider,
+        read_coins: CoinRepository | None = None,
     ) -> None:
         self.db = db
         self.coins = coins
+        self.history = history
+        self.candles = candles
+        self.alerts = alerts
         self.provider = provider
+        # Paged listing reads may go to a replica; everything else (including
+        # the cached full listing) uses `coins`.
+        self.read_coins = read_coins or coins
 
-    async def list_coins(self) -> list[Coin]:
-        return await self.coins.list_all()
+    async def list_coins(self) -> CoinListSnapshot:
+        snapshot = coin_list_cache.get()
+        if snapshot is None:
+            version = coin_list_cache.version
+            # From the primary: the snapshot outlives this request, and one
+            # built from a lagging replica would serve stale prices until the
+            # next refresh invalidated it. It is one read per refresh.
+            rows = await self.coins.list_all_rows()
+            snapshot = coin_list_cache.store(version, rows)
+        return snapshot
 
-    async def refresh_from_provider(self) -> tuple[int, str]:
+    async def list_coins_page(self, params: CoinListParams) -> tuple[list[dict], str | None]:
+        """Filtered/sorted listing; returns the rows and the cursor for the next page."""
+        after = _decode_cursor(params.cursor, params.sort) if params.cursor else None
+        rows = await self.read_coins.list_page(
+            sort=params.sort,
+            after=after,
+            # One extra row tells us whether there is a next page.
+            limit=None if params.limit is None else params.limit + 1,
+            symbol=params.symbol,
+            min_rank=params.min_rank,
+            max_rank=params.max_rank,
+            min_price=params.min_price,
+            max_price=params.max_price,
+        )
+        if params.limit is None or len(rows) <= params.limit:
+            return rows, None
+        rows = rows[: params.limit]
+        return rows, _encode_cursor(params.sort, rows[-1])
+
+    async def price_history(
+        self,
+        coin_id: int,
+        start: datetime | None,
+        end: datetime | None,
+        step: str | None,
+    ) -> CoinHistoryResponse:
+        start, end, step_seconds = resolve_range(start, end, step)
+        if await self.coins.get(coin_id) is None:
+            raise CoinNotFound()
+        buckets = await self.history.downsample(coin_id, start, end, step_seconds)
+        return CoinHistoryResponse(
+            coin_id=coin_id,
+            start=start,
+            end=end,
+            step_seconds=step_seconds,
+            points=[PricePointResponse(ts=ts, price_usd=price) for ts, price in buckets],
+        )
+
+    async def candles_for(
+        self,
+        coin_id: int,
+        resolution: str,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> CoinCandlesResponse:
+        start, end, seconds = resolve_range(start, end, resolution)
+        if await self.coins.get(coin_id) is None:
+            raise CoinNotFound()
+        rows = await self.candles.list_range(coin_id, seconds, start, end)
+        return CoinCandlesResponse(
+            coin_id=coin_id,
+            resolution=resolution,
+            candles=[
+                CandleResponse(ts=ts, open=o, high=h, low=low, close=c)
+                for ts, o, h, low, c in rows
+            ],
+        )
+
+    async def refresh_from_provider(self) -> RefreshResult:
+        return await refresh_flight.run(self._refresh)
+
+    async def _refresh(self) -> RefreshResult:
+        # Before the upsert, so the index's baseline prices are the old ones.
+        await alert_index.sync(self.alerts)
+
+        # Pages are upserted as they arrive; the commit below still makes the
+        # whole refresh atomic.
+        received_ids: list[str] = []
+        changed = 0
         try:
-            market_coins = await self.provider.fetch_market_coins()
+            async for batch in market_batches(self.provider):
+                result = await self.coins.upsert_many(batch)
+                received_ids.extend(coin.external_id for coin in batch)
+                changed += len(result.changed_external_ids)
         except httpx.HTTPError as exc:
+            await self.db.rollback()
             raise ProviderUnavailable(f"Upstream price provider failed: {exc}")
 
-        count = await self.coins.upsert_many(market_coins)
-        await self.db.commit()
-        return count, self.provider.name
+        # Same transaction: history never holds a price the coins table didn't.
+        # A point for every coin received, changed or not: history, candles
+        # and portfolio series all read it as one sample per refresh.
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        points = await self.history.append_from_coins(received_ids, now)
+        await self.candles.apply(points, RESOLUTIONS.values())
+        crossed = alert_index.evaluate(points)
+        try:
+            triggered = await self.alerts.mark_triggered(crossed, now) if crossed else []
+            await self.db.commit()
+        except BaseException:
+            # evaluate() already dropped the crossed alerts and moved the
+            # baseline prices; reload the index rather than trust it.
+            alert_index.invalidate()
+            raise
+        if changed:
+            coin_list_cache.invalidate()
+        if points:
+            performance_cache.invalidate()
+        # Unchanged prices are filtered out by the broadcaster and the index.
+        price_broadcaster.publish(points)
+        alert_deliveries.publish([TriggeredAlert(*row, triggered_at=now) for row in triggered])
+        return RefreshResult(len(received_ids), changed, self.provider.name)
+
+
+def build_coin_service(
+    db: AsyncSession, provider: PriceProvider, read_db: AsyncSession | None = None
+) -> CoinService:
+    """Wire a CoinService and its repositories onto one session.
+
+    `read_db`, when given, serves the coin listings only.
+    """
+    return CoinService(
+        db,
+        CoinRepository(db),
+        PriceHistoryRepository(db),
+        CandleRepository(db),
+        AlertRepository(db),
+        provider,
+        read_coins=CoinRepository(read_db) if read_db is not None else None,
+    )
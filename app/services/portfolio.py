@@ -1,10 +1,26 @@
-from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import performance_cache
+from app.db import recent_writes
 from app.exceptions import AlreadyInPortfolio, CoinNotFound, NotInPortfolio
 from app.models import PortfolioItem
 from app.repositories.coin import CoinRepository
 from app.repositories.portfolio import PortfolioRepository
+from app.repositories.price_history import PriceHistoryRepository
+from app.schemas.coin import CoinResponse
+from app.schemas.portfolio import (
+    PerformancePoint,
+    PortfolioBatchResponse,
+    PortfolioBatchResult,
+    PortfolioItemResponse,
+    PortfolioPerformanceResponse,
+    PortfolioValuationResponse,
+    PositionValuation,
+)
+from app.services.coin import resolve_range
 
 
 class PortfolioService:
@@ -13,29 +29,79 @@ class PortfolioService:
         db: AsyncSession,
         portfolio: PortfolioRepository,
         coins: CoinRepository,
+        history: PriceHistoryRepository,
+        read_portfolio: PortfolioRepository | None = None,
     ) -> None:
         self.db = db
         self.portfolio = portfolio
         self.coins = coins
+        self.history = history
+        # Listing reads may go to a replica; everything else uses `portfolio`.
+        self.read_portfolio = read_portfolio or portfolio
 
     async def list_for_user(self, user_id: int) -> list[PortfolioItem]:
-        return await self.portfolio.list_for_user(user_id)
+        return await self.read_portfolio.list_for_user(user_id)
 
-    async def add(self, user_id: int, coin_id: int) -> PortfolioItem:
-        if await self.coins.get(coin_id) is None:
-            raise CoinNotFound()
-        if await self.portfolio.get(user_id, coin_id) is not None:
-            raise AlreadyInPortfolio()
-        try:
-            await self.portfolio.add(user_id, coin_id)
-            await self.db.commit()
-        except IntegrityError:
+    async def add(
+        self,
+        user_id: int,
+        coin_id: int,
+        quantity: float = 0.0,
+        cost_basis_usd: float = 0.0,
+    ) -> PortfolioItemResponse:
+        row = await self.portfolio.add(user_id, coin_id, quantity, cost_basis_usd)
+        if row is None:
             await self.db.rollback()
+            if await self.coins.get(coin_id) is None:
+                raise CoinNotFound()
             raise AlreadyInPortfolio()
+        await self.db.commit()
+        self._changed(user_id)
+        return PortfolioItemResponse(
+            coin=CoinResponse.model_validate(row, from_attributes=True),
+            quantity=row.quantity,
+            cost_basis_usd=row.cost_basis_usd,
+            added_at=row.added_at,
+        )
 
-        item = await self.portfolio.get(user_id, coin_id)
-        assert item is not None
-        return item
+    async def add_many(self, user_id: int, coin_ids: list[int]) -> PortfolioBatchResponse:
+        """Watch many coins with one INSERT; per-id outcome in request order."""
+        coin_ids = list(dict.fromkeys(coin_ids))
+        added = await self.portfolio.add_many(user_id, coin_ids)
+        await self.db.commit()
+        if added:
+            self._changed(user_id)
+        # Only ids that weren't added need telling apart: held already, or no such coin.
+        rest = [coin_id for coin_id in coin_ids if coin_id not in added]
+        existing = await self.coins.existing_ids(rest) if rest else set()
+
+        def outcome(coin_id: int) -> str:
+            if coin_id in added:
+                return "added"
+            return "already_in_portfolio" if coin_id in existing else "coin_not_found"
+
+        return PortfolioBatchResponse(
+            results=[
+                PortfolioBatchResult(coin_id=coin_id, status=outcome(coin_id))
+                for coin_id in coin_ids
+            ]
+        )
+
+    async def remove_many(self, user_id: int, coin_ids: list[int]) -> PortfolioBatchResponse:
+        coin_ids = list(dict.fromkeys(coin_ids))
+        removed = await self.portfolio.remove_many(user_id, coin_ids)
+        await self.db.commit()
+        if removed:
+            self._changed(user_id)
+        return PortfolioBatchResponse(
+            results=[
+                PortfolioBatchResult(
+                    coin_id=coin_id,
+                    status="removed" if coin_id in removed else "not_in_portfolio",
+                )
+                for coin_id in coin_ids
+            ]
+        )
 
     async def remove(self, user_id: int, coin_id: int) -> None:
         deleted = await self.portfolio.remove(user_id, coin_id)
@@ -43,3 +109,149 @@ class PortfolioService:
             await self.db.rollback()
             raise NotInPortfolio()
         await self.db.commit()
+        self._changed(user_id)
+
+    async def set_holding(
+        self, user_id: int, coin_id: int, quantity: float, cost_basis_usd: float
+    ) -> PortfolioItem:
+        if not await self.portfolio.set_holding(user_id, coin_id, quantity, cost_basis_usd):
+            await self.db.rollback()
+            raise NotInPortfolio()
+        await self.db.commit()
+        self._changed(user_id)
+        item = await self.portfolio.get(user_id, coin_id)
+        assert item is not None
+        return item
+
+    def _changed(self, user_id: int) -> None:
+        performance_cache.invalidate_user(user_id)
+        recent_writes.mark(user_id)
+
+    async def valuation(self, user_id: int) -> PortfolioValuationResponse:
+        """Value every holding at the latest price in one vectorized pass."""
+        rows = await self.portfolio.holdings_with_prices(user_id)
+        if not rows:
+            return PortfolioValuationResponse(
+                total_value_usd=0.0, total_cost_basis_usd=0.0, unrealized_pnl_usd=0.0, positions=[]
+            )
+
+        coin_ids, external_ids, symbols, prices, quantities, costs = zip(*rows)
+        price = np.asarray(prices, dtype=np.float64)
+        quantity = np.asarray(quantities, dtype=np.float64)
+        cost = np.asarray(costs, dtype=np.float64)
+
+        value = quantity * price
+        pnl = value - cost
+        total = float(value.sum())
+        allocation = value / total if total > 0 else np.zeros_like(value)
+
+        positions = [
+            PositionValuation(
+                coin_id=cid,
+                external_id=ext,
+                symbol=sym,
+                quantity=q,
+                price_usd=p,
+                value_usd=v,
+                cost_basis_usd=c,
+                unrealized_pnl_usd=u,
+                allocation=a,
+            )
+            for cid, ext, sym, q, p, v, c, u, a in zip(
+                coin_ids,
+                external_ids,
+                symbols,
+                quantity.tolist(),
+                price.tolist(),
+                value.tolist(),
+                cost.tolist(),
+                pnl.tolist(),
+                allocation.tolist(),
+            )
+        ]
+        return PortfolioValuationResponse(
+            total_value_usd=total,
+            total_cost_basis_usd=float(cost.sum()),
+            unrealized_pnl_usd=float(pnl.sum()),
+            positions=positions,
+        )
+
+    async def performance(
+        self,
+        user_id: int,
+        start: datetime | None,
+        end: datetime | None,
+        step: str | None,
+    ) -> PortfolioPerformanceResponse:
+        """Portfolio value per `step` bucket, cached until the next refresh.
+
+        Current holdings are applied to the whole range. Only ranges with an
+        explicit end are cached: one ending "now" moves on every call.
+        """
+        key = (start, end, step)
+        cacheable = end is not None
+        if cacheable:
+            cached = performance_cache.get(user_id, key)
+            if cached is not None:
+                return cached
+        token = performance_cache.token(user_id)
+
+        start, end, step_seconds = resolve_range(start, end, step)
+        items = await self.portfolio.list_for_user(user_id)
+        response = await self._performance_series(items, start, end, step_seconds)
+        if cacheable:
+            performance_cache.store(user_id, key, token, response)
+        return response
+
+    async def _performance_series(
+        self, items: list[PortfolioItem], start: datetime, end: datetime, step_seconds: int
+    ) -> PortfolioPerformanceResponse:
+        cost = float(sum(item.cost_basis_usd for item in items))
+        first = int(start.replace(tzinfo=timezone.utc).timestamp()) // step_seconds
+        last = -(-int(end.replace(tzinfo=timezone.utc).timestamp()) // step_seconds)
+        empty = PortfolioPerformanceResponse(
+            start=start, end=end, step_seconds=step_seconds, total_cost_basis_usd=cost, points=[]
+        )
+        if not items or last <= first:
+            return empty
+
+        # coins x buckets, NaN where a coin has no point in that bucket.
+        row_of = {item.coin_id: i for i, item in enumerate(items)}
+        rows = await self.history.downsample_many(list(row_of), start, end, step_seconds)
+        # The price each coin entered the range with, so a coin that did not
+        # move lately is valued from the first bucket rather than at 0.
+        carried = await self.history.last_prices_at(list(row_of), start)
+        if not rows and not carried:
+            return empty
+        matrix = np.full((len(items), last - first), np.nan)
+        if carried:
+            carried_ids, carried_prices = zip(*carried)
+            matrix[[row_of[c] for c in carried_ids], 0] = carried_prices
+        if rows:
+            # Points inside the first bucket win over the carried-in price.
+            coin_ids, buckets, prices = zip(*rows)
+            matrix[[row_of[c] for c in coin_ids], np.asarray(buckets) - first] = prices
+
+        # Forward-fill each coin's last known price along the time axis.
+        columns = np.arange(matrix.shape[1])
+        filled_at = np.maximum.accumulate(np.where(np.isnan(matrix), 0, columns), axis=1)
+        matrix = matrix[np.arange(matrix.shape[0])[:, None], filled_at]
+
+        quantity = np.asarray([item.quantity for item in items], dtype=np.float64)
+        values = quantity @ np.nan_to_num(matrix)
+        # Start the series at the first bucket any held coin has a price for.
+        begin = int(np.argmax(~np.isnan(matrix).all(axis=0)))
+        return PortfolioPerformanceResponse(
+            start=start,
+            end=end,
+            step_seconds=step_seconds,
+            total_cost_basis_usd=cost,
+            points=[
+                PerformancePoint(
+                    ts=datetime.fromtimestamp(b * step_seconds, tz=timezone.utc).replace(tzinfo=None),
+                    value_usd=v,
+                    unrealized_pnl_usd=v - cost,
+                )
+                for b, v in zip(range(first + begin, last), values[begin:].tolist())
+            ],
+        )
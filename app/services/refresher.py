@@ -0,0 +1,141 @@
+"""In-process price refresher.
+
+Started from the app lifespan, it calls CoinService.refresh_from_provider on
+a fixed interval (with jitter so several workers don't stampede the upstream
+in lockstep) and backs off exponentially while the provider is failing.
+POST /coins/refresh only nudges it, so no request waits on the upstream
+round trip or the upsert.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db import SessionLocal
+from app.exceptions import ProviderUnavailable
+from app.providers import get_price_provider
+from app.providers.base import PriceProvider
+from app.services.coin import build_coin_service, refresh_flight
+
+
+@dataclass
+class RefreshStatus:
+    running: bool = False
+    source: str | None = None
+    last_success_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_refreshed_count: int | None = None
+    last_changed_count: int | None = None
+    last_error: str | None = None
+    consecutive_failures: int = 0
+    next_run_at: datetime | None = None
+
+
+class PriceRefresher:
+    def __init__(
+        self,
+        *,
+        interval: float = settings.PRICE_REFRESH_INTERVAL_SECONDS,
+        jitter: float = settings.PRICE_REFRESH_JITTER,
+        backoff_base: float = settings.PRICE_REFRESH_BACKOFF_BASE_SECONDS,
+        backoff_max: float = settings.PRICE_REFRESH_BACKOFF_MAX_SECONDS,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        provider_factory: Callable[[], PriceProvider] = get_price_provider,
+    ) -> None:
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session_factory = session_factory
+        self.provider_factory = provider_factory
+        self.status = RefreshStatus()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._oneshot: asyncio.Task | None = None
+
+    # --- lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            self.status.running = True
+
+    async def stop(self) -> None:
+        # The loop only waits on the shared run; that run is what to cancel.
+        refresh_flight.cancel()
+        for task in (self._task, self._oneshot):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._oneshot = None
+        self.status.running = False
+        self.status.next_run_at = None
+
+    def nudge(self) -> None:
+        """Ask for a refresh as soon as possible without waiting for it.
+
+        With the scheduler running this just wakes the loop; otherwise (e.g.
+        PRICE_REFRESH_ENABLED=false) a single background run is spawned unless
+        one is already in flight.
+        """
+        if self._task is not None and not self._task.done():
+            self._wakeup.set()
+        elif self._oneshot is None or self._oneshot.done():
+            self._oneshot = asyncio.create_task(self.run_once())
+
+    # --- work ------------------------------------------------------------
+
+    async def run_once(self) -> float:
+        """Refresh once, record the outcome and return seconds until the next run."""
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                service = build_coin_service(db, self.provider_factory())
+                result = await service.refresh_from_provider()
+        except ProviderUnavailable as exc:
+            return self._record_failure(exc.detail)
+        except Exception as exc:  # keep the loop alive on DB hiccups too
+            return self._record_failure(f"{type(exc).__name__}: {exc}")
+        if not result.ran:
+            # Another caller's refresh (or a replay of it): nothing new to record.
+            return self._jittered(self.interval)
+
+        self.status.source = result.source
+        self.status.last_success_at = datetime.now(timezone.utc)
+        self.status.last_duration_ms = (time.perf_counter() - started) * 1000
+        self.status.last_refreshed_count = result.received
+        self.status.last_changed_count = result.changed
+        self.status.last_error = None
+        self.status.consecutive_failures = 0
+        return self._jittered(self.interval)
+
+    def _record_failure(self, error: str) -> float:
+        self.status.last_error = error
+        self.status.consecutive_failures += 1
+        delay = self.backoff_base * 2 ** (self.status.consecutive_failures - 1)
+        return self._jittered(min(delay, self.backoff_max))
+
+    def _jittered(self, delay: float) -> float:
+        spread = delay * self.jitter
+        return max(0.0, delay + random.uniform(-spread, spread))
+
+    async def _loop(self) -> None:
+        while True:
+            delay = await self.run_once()
+            self.status.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+refresher = PriceRefresher()
@@ -0,0 +1,92 @@
+"""Price alert evaluation: bisect index vs scanning every alert.
+
+Arms --alerts alerts spread over --coins coins (thresholds within ±20% of
+each coin's price, half "above", half "below"), then applies --refreshes
+refreshes that each move every coin by up to ±--move percent. Reports the
+index's memory and load time and, per refresh, the time to find the
+crossed alerts with AlertIndex.evaluate versus a scan over all alerts.
+Both must find the same alerts.
+
+    python -m benchmarks.alerts --alerts 1000000 --coins 5000 --move 1
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.alerts import AlertIndex
+
+
+def _scan(alerts: list[tuple], fired: set[int], old: dict, new: dict) -> list[int]:
+    crossed = []
+    for alert_id, coin_id, direction, threshold in alerts:
+        if alert_id in fired:
+            continue
+        before, after = old[coin_id], new[coin_id]
+        if direction == "above":
+            hit = before < threshold <= after
+        else:
+            hit = after <= threshold < before
+        if hit:
+            crossed.append(alert_id)
+    return crossed
+
+
+def main(n_alerts: int, coins: int, move: float, refreshes: int) -> None:
+    rng = random.Random(7)
+    prices = {c: rng.uniform(0.01, 60000) for c in range(coins)}
+    alerts = [
+        (
+            i,
+            (coin := rng.randrange(coins)),
+            "above" if i % 2 else "below",
+            prices[coin] * rng.uniform(0.8, 1.2),
+        )
+        for i in range(1, n_alerts + 1)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    traced = AlertIndex()
+    traced.add(alerts)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del traced
+
+    index = AlertIndex()
+    start = time.perf_counter()
+    index.set_prices(prices.items())
+    index.add(alerts)
+    load = time.perf_counter() - start
+    print(f"{len(index)} alerts over {coins} coins: load {load:.2f}s, "
+          f"index {held / 2**20:.1f} MiB ({held / n_alerts:.1f} B/alert)")
+
+    ts = datetime(2026, 1, 1)
+    fired: set[int] = set()
+    print(f"{'refresh':>7} {'crossed':>8} {'index ms':>9} {'scan ms':>9}")
+    for r in range(1, refreshes + 1):
+        new = {c: p * (1 + rng.uniform(-move, move) / 100) for c, p in prices.items()}
+        points = [(c, ts, p) for c, p in new.items()]
+
+        start = time.perf_counter()
+        expected = _scan(alerts, fired, prices, new)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        crossed = index.evaluate(points)
+        indexed = time.perf_counter() - start
+
+        assert sorted(crossed) == sorted(expected)
+        fired.update(crossed)
+        prices = new
+        print(f"{r:>7} {len(crossed):>8} {indexed * 1000:>9.2f} {scan * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=1_000_000)
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--move", type=float, default=1.0, help="max price move per refresh, %%")
+    parser.add_argument("--refreshes", type=int, default=5)
+    args = parser.parse_args()
+    main(args.alerts, args.coins, args.move, args.refreshes)
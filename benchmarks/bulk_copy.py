@@ -0,0 +1,63 @@
+"""Postgres coin upsert: chunked INSERT ... VALUES vs COPY + single merge.
+
+Needs a scratch Postgres database; its coins table is dropped and recreated.
+Each size is timed twice per path: a cold insert into an empty table and a
+full update of the same rows.
+
+    python -m benchmarks.bulk_copy --database-url postgresql+asyncpg://localhost/bench \
+        --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import _normalize_database_url, settings
+from app.models import Base, Coin
+from app.repositories.coin import CoinRepository
+
+
+def _rows(n: int, price: float) -> list[dict]:
+    now = datetime(2026, 1, 1)
+    return [
+        {"external_id": f"coin-{i}", "name": f"Coin {i}", "symbol": f"C{i}",
+         "market_cap_rank": i + 1, "price_usd": price + i, "image_url": None, "last_updated": now}
+        for i in range(n)
+    ]
+
+
+async def _timed(sessions, rows: list[dict]) -> float:
+    async with sessions() as db:
+        start = time.perf_counter()
+        await CoinRepository(db)._upsert_rows(rows)
+        await db.commit()
+        return time.perf_counter() - start
+
+
+async def main(url: str, sizes: list[int]) -> None:
+    engine = create_async_engine(_normalize_database_url(url))
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("this benchmark needs a Postgres --database-url")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    print(f"{'rows':>7} {'path':>7} {'insert s':>9} {'update s':>9}")
+    for n in sizes:
+        for label, threshold in (("values", 0), ("copy", 1)):
+            settings.BULK_COPY_MIN_ROWS = threshold
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda c: Coin.__table__.drop(c, checkfirst=True))
+                await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[Coin.__table__]))
+            inserted = await _timed(sessions, _rows(n, 1.0))
+            updated = await _timed(sessions, _rows(n, 2.0))
+            print(f"{n:>7} {label:>7} {inserted:>9.3f} {updated:>9.3f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.sizes))
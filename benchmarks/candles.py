@@ -0,0 +1,85 @@
+"""Candle reads: pre-aggregated rollups vs aggregating raw points per request.
+
+Seeds a throwaway SQLite DB with one coin at one point per minute for
+--days days, builds the rollups with the backfill, then times fetching the
+whole range at each resolution both ways.
+
+    python -m benchmarks.candles --days 30
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base, Coin, PricePoint
+from app.repositories.candle import CandleRepository, fold
+from app.repositories.price_history import PriceHistoryRepository
+from app.services import candles
+
+
+START = datetime(2026, 1, 1)
+
+
+async def _seed(db, days: int) -> int:
+    db.add(Coin(id=1, external_id="bitcoin", name="Bitcoin", symbol="BTC",
+                market_cap_rank=1, price_usd=1.0, last_updated=START))
+    await db.flush()
+    minutes = days * 24 * 60
+    batch = 20_000
+    for offset in range(0, minutes, batch):
+        rows = [
+            {"coin_id": 1, "ts": START + timedelta(minutes=i), "price_usd": 50000 + (i * 7919) % 997}
+            for i in range(offset, min(offset + batch, minutes))
+        ]
+        await db.execute(insert(PricePoint), rows)
+    await db.commit()
+    return minutes
+
+
+async def _time(fn, repeats: int) -> float:
+    await fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        await fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+async def main(days: int, repeats: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            points = await _seed(db, days)
+            started = time.perf_counter()
+            await candles.backfill(db)
+            print(f"{points} points, backfill {time.perf_counter() - started:.2f}s")
+
+            end = START + timedelta(days=days)
+            history, rollups = PriceHistoryRepository(db), CandleRepository(db)
+            print(f"{'res':>4} {'candles':>8} {'rollup ms':>10} {'on-the-fly ms':>14}")
+            for name, seconds in candles.RESOLUTIONS.items():
+                async def pre():
+                    return await rollups.list_range(1, seconds, START, end)
+
+                async def raw():
+                    return fold(await history.points_in_range(1, START, end), [seconds])
+
+                count = len(await pre())
+                assert count == len(await raw())
+                print(f"{name:>4} {count:>8} {await _time(pre, repeats):>10.2f} "
+                      f"{await _time(raw, repeats):>14.2f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.repeats))
@@ -0,0 +1,77 @@
+"""GET /coins: response_model encoding vs the pre-serialized snapshot body.
+
+Both routes serve an already-cached list, so this isolates the per-request
+serialization cost. Requests go through the full ASGI stack in-process.
+
+    python -m benchmarks.coin_list --sizes 100 1000 10000 --requests 300
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi import FastAPI, Response
+from httpx import ASGITransport, AsyncClient
+
+from app.cache import dump_json
+from app.schemas.coin import CoinResponse
+
+
+def _rows(n: int) -> list[dict]:
+    now = datetime(2026, 5, 4, 12, 0, 0, 123456)
+    return [
+        {
+            "id": i + 1,
+            "external_id": f"coin-{i}",
+            "name": f"Coin {i}",
+            "symbol": f"C{i}",
+            "market_cap_rank": i + 1,
+            "price_usd": 1.0 + i / 7,
+            "image_url": f"https://example.com/{i}.png",
+            "last_updated": now,
+        }
+        for i in range(n)
+    ]
+
+
+def _app(rows: list[dict]) -> FastAPI:
+    models = [CoinResponse.model_validate(r) for r in rows]
+    body = dump_json(rows)
+    app = FastAPI()
+
+    @app.get("/models", response_model=list[CoinResponse])
+    async def via_models() -> list[CoinResponse]:
+        return models
+
+    @app.get("/bytes", response_model=list[CoinResponse])
+    async def via_bytes() -> Response:
+        return Response(content=body, media_type="application/json")
+
+    return app
+
+
+async def _rps(client: AsyncClient, path: str, requests: int) -> float:
+    await client.get(path)  # warm up
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def main(sizes: list[int], requests: int) -> None:
+    print(f"{'coins':>7} {'models req/s':>13} {'bytes req/s':>12} {'speedup':>8}")
+    for n in sizes:
+        app = _app(_rows(n))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://b") as c:
+            slow = await _rps(c, "/models", requests)
+            fast = await _rps(c, "/bytes", requests)
+        print(f"{n:>7} {slow:>13.1f} {fast:>12.1f} {fast / slow:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.requests))
@@ -0,0 +1,81 @@
+"""Keyset page latency on GET /coins queries as the coins table grows.
+
+Seeds a throwaway SQLite DB (or the DB given by --url) with N coins and times
+CoinRepository.list_page for the first page and for a page deep into the
+table. With the (column, id) indexes both should stay flat as N grows.
+
+    python -m benchmarks.coin_pages --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base, Coin
+from app.repositories.coin import CoinRepository
+
+
+async def _seed(url: str, n: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime(2026, 5, 4, 12, 0)
+        rows = [
+            {
+                "external_id": f"coin-{i}",
+                "name": f"Coin {i}",
+                "symbol": f"C{i % 5000}",
+                # every tenth coin is unranked
+                "market_cap_rank": None if i % 10 == 9 else i + 1,
+                "price_usd": (i * 7919 % 100000) / 100,
+                "image_url": None,
+                "last_updated": now,
+            }
+            for i in range(n)
+        ]
+        for start in range(0, n, 5000):
+            await conn.execute(insert(Coin), rows[start : start + 5000])
+    await engine.dispose()
+
+
+async def _time(repo: CoinRepository, repeats: int, **kwargs) -> float:
+    await repo.list_page(**kwargs)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        await repo.list_page(**kwargs)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+async def main(sizes: list[int], url: str | None, repeats: int) -> None:
+    print(f"{'coins':>7} {'rank p1':>9} {'rank deep':>10} {'-price deep':>12} {'filtered':>9}  (ms)")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_url = url or f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+            await _seed(db_url, n)
+            engine = create_async_engine(db_url)
+            async with async_sessionmaker(engine)() as db:
+                repo = CoinRepository(db)
+                mid = n // 2
+                timings = (
+                    await _time(repo, repeats, limit=51),
+                    await _time(repo, repeats, limit=51, after=(mid, mid)),
+                    await _time(repo, repeats, sort="-price", limit=51, after=(500.0, mid)),
+                    await _time(repo, repeats, limit=51, min_price=10, max_price=20),
+                )
+            await engine.dispose()
+        print(f"{n:>7} " + " ".join(f"{t:>9.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--url", help="async SQLAlchemy URL; default is a temp SQLite file")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.url, args.repeats))
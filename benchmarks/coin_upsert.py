@@ -0,0 +1,149 @@
+"""Refresh write volume: rewrite-everything upsert vs change-detecting upsert.
+
+Simulates --refreshes refreshes of --coins coins where --moved of them get a
+new price each time and metadata never changes. Reports rows written, WAL
+growth and time per refresh for both strategies.
+
+SQLite (default) measures the -wal file with auto-checkpointing off; pass
+--database-url postgresql+asyncpg://... to measure pg_current_wal_lsn() on a
+scratch database instead (its coins table is dropped and recreated).
+
+    python -m benchmarks.coin_upsert --coins 5000 --moved 0.1 --refreshes 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import event, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base, Coin
+from app.providers.base import MarketCoin
+from app.repositories.coin import CoinRepository
+
+
+START = datetime(2026, 1, 1)
+
+
+async def _rewrite_all(db, coins: list[MarketCoin]) -> int:
+    """The previous upsert_many: every column of every coin, every time."""
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    rows = [
+        {"external_id": c.external_id, "name": c.name, "symbol": c.symbol,
+         "market_cap_rank": c.market_cap_rank, "price_usd": c.price_usd,
+         "image_url": c.image_url, "last_updated": c.last_updated}
+        for c in coins
+    ]
+    for i in range(0, len(rows), 4000):  # unchunked it overflows SQLite's 32766 params
+        stmt = insert(Coin).values(rows[i:i + 4000])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Coin.external_id],
+            set_={k: stmt.excluded[k] for k in rows[0] if k != "external_id"},
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+async def _change_detecting(db, coins: list[MarketCoin]) -> int:
+    repo = CoinRepository(db)
+    result = await repo.upsert_many(coins)
+    await db.commit()
+    return result.changed
+
+
+def _snapshots(n: int, moved: float, refreshes: int) -> list[list[MarketCoin]]:
+    rng = random.Random(7)
+    prices = [1.0 + i for i in range(n)]
+    stamps = [START] * n
+    out = []
+    for r in range(refreshes + 1):
+        if r:
+            for i in rng.sample(range(n), int(n * moved)):
+                prices[i] *= 1 + rng.uniform(-0.01, 0.01)
+                stamps[i] = START + timedelta(minutes=r)
+        out.append([
+            MarketCoin(f"coin-{i}", f"Coin {i}", f"C{i}", i + 1, prices[i],
+                       f"https://example.com/{i}.png", stamps[i])
+            for i in range(n)
+        ])
+    return out
+
+
+class _WalMeter:
+    def __init__(self, engine, wal_path: Path | None) -> None:
+        self.engine = engine
+        self.wal_path = wal_path
+
+    async def position(self) -> int:
+        if self.wal_path is not None:
+            return self.wal_path.stat().st_size if self.wal_path.exists() else 0
+        async with self.engine.connect() as conn:
+            lsn = await conn.scalar(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"))
+            return int(lsn)
+
+
+async def _run(url: str, wal_path: Path | None, snapshots, upsert) -> tuple[int, int, float]:
+    engine = create_async_engine(url)
+    if wal_path is not None:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _no_checkpoints(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA wal_autocheckpoint=0")
+            cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Coin.__table__.drop(c, checkfirst=True))
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[Coin.__table__]))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    # aiosqlite uses NullPool; keeping one connection open stops the last
+    # close from checkpointing and deleting the -wal file.
+    async with engine.connect() as keeper, sessions() as db:
+        await keeper.exec_driver_sql("SELECT 1")
+        await upsert(db, snapshots[0])
+        await db.commit()
+
+        meter = _WalMeter(engine, wal_path)
+        wal_before = await meter.position()
+        written = 0
+        start = time.perf_counter()
+        for snapshot in snapshots[1:]:
+            written += await upsert(db, snapshot)
+            await db.commit()
+        elapsed = (time.perf_counter() - start) / (len(snapshots) - 1)
+        wal = await meter.position() - wal_before
+    await engine.dispose()
+    return written, wal, elapsed
+
+
+async def main(url: str | None, coins: int, moved: float, refreshes: int) -> None:
+    snapshots = _snapshots(coins, moved, refreshes)
+    with tempfile.TemporaryDirectory() as tmp:
+        wal_path = None
+        if url is None:
+            db_file = Path(tmp) / "bench.db"
+            url, wal_path = f"sqlite+aiosqlite:///{db_file}", Path(f"{db_file}-wal")
+        print(f"{coins} coins, {moved:.0%} moved per refresh, {refreshes} refreshes")
+        print(f"{'strategy':>16} {'rows written':>13} {'WAL KiB':>9} {'ms/refresh':>11}")
+        for label, upsert in (("rewrite all", _rewrite_all), ("change-detecting", _change_detecting)):
+            if wal_path is not None and wal_path.exists():
+                os.remove(wal_path)
+            written, wal, elapsed = await _run(url, wal_path, snapshots, upsert)
+            print(f"{label:>16} {written:>13} {wal / 1024:>9.0f} {elapsed * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--moved", type=float, default=0.1)
+    parser.add_argument("--refreshes", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.coins, args.moved, args.refreshes))
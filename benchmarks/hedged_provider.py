@@ -0,0 +1,66 @@
+"""Refresh tail latency: one provider vs the hedged composite.
+
+Simulated upstreams answer in ~50 ms but stall for --stall seconds on a
+--stall-rate fraction of calls (rate limiting, slow TLS, GC pauses). The
+backup is a little slower on average but independent.
+
+    python -m benchmarks.hedged_provider --fetches 400 --stall-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from app.providers.base import MarketCoin
+from app.providers.hedged import HedgedProvider, ProviderStatsRegistry
+
+
+class _Simulated:
+    def __init__(self, name: str, mean: float, stall: float, stall_rate: float) -> None:
+        self.name = name
+        self.mean = mean
+        self.stall = stall
+        self.stall_rate = stall_rate
+
+    async def fetch_market_coins(self) -> list[MarketCoin]:
+        delay = random.expovariate(1 / self.mean)
+        if random.random() < self.stall_rate:
+            delay += self.stall
+        await asyncio.sleep(delay)
+        return [MarketCoin("bitcoin", "Bitcoin", "BTC", 1, 1.0, None, datetime(2026, 1, 1))]
+
+
+def _pct(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1000
+
+
+async def _run(provider, fetches: int) -> list[float]:
+    samples = []
+    for _ in range(fetches):
+        start = time.perf_counter()
+        await provider.fetch_market_coins()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(fetches: int, stall: float, stall_rate: float) -> None:
+    primary = _Simulated("primary", 0.05, stall, stall_rate)
+    backup = _Simulated("backup", 0.08, stall, stall_rate)
+    hedged = HedgedProvider([primary, backup], stats=ProviderStatsRegistry(100))
+
+    print(f"{'provider':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, provider in (("single", primary), ("hedged", hedged)):
+        samples = await _run(provider, fetches)
+        print(f"{label:>8} {_pct(samples, 50):>8.1f} {_pct(samples, 95):>8.1f} "
+              f"{_pct(samples, 99):>8.1f} {max(samples) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fetches", type=int, default=400)
+    parser.add_argument("--stall", type=float, default=2.0)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.fetches, args.stall, args.stall_rate))
@@ -0,0 +1,64 @@
+"""Instrumentation cost: metric updates and MetricsMiddleware per request.
+
+Times the raw Histogram.observe / Counter.inc calls, then calls a trivial
+ASGI app directly (no HTTP client, so the difference is not lost in noise)
+with and without MetricsMiddleware in front of it.
+
+    python -m benchmarks.metrics --calls 1000000 --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.metrics import Counter, Histogram, MetricsMiddleware
+
+
+class _Route:
+    path = "/coins/{coin_id}/history"
+
+
+async def _endpoint(scope, receive, send) -> None:
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(_: dict) -> None:
+    pass
+
+
+async def _per_request_us(app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/coins/1/history"}, _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main(calls: int, requests: int) -> None:
+    histogram = Histogram("bench_seconds", "Bench.", ["method", "route"])
+    counter = Counter("bench_total", "Bench.", ["method", "route", "status"])
+    for label, update in [
+        ("Histogram.observe", lambda: histogram.observe(0.012, "GET", "/coins")),
+        ("Counter.inc", lambda: counter.inc("GET", "/coins", "200")),
+    ]:
+        start = time.perf_counter()
+        for _ in range(calls):
+            update()
+        print(f"{label:>18}: {(time.perf_counter() - start) / calls * 1e6:5.2f} us/call")
+
+    bare = asyncio.run(_per_request_us(_endpoint, requests))
+    wrapped = asyncio.run(_per_request_us(MetricsMiddleware(_endpoint), requests))
+    print(f"{'bare ASGI app':>18}: {bare:5.2f} us/request")
+    print(f"{'with middleware':>18}: {wrapped:5.2f} us/request ({wrapped - bare:+.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.calls, args.requests)
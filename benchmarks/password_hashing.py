@@ -0,0 +1,69 @@
+"""Login storm: event-loop stall with inline bcrypt vs the hasher pool.
+
+Runs --logins concurrent password verifications while a probe coroutine
+stands in for /coins and /portfolio traffic: it wakes every 10ms and
+records how late it was. Inline verification blocks the loop for each
+bcrypt call; the pool keeps the loop free and bounds the work in flight.
+
+    python -m benchmarks.password_hashing --logins 20 --workers 2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.exceptions import ServiceBusy
+from app.security import PasswordHasher, hash_password, verify_password
+
+
+async def _inline(plain: str, hashed: str) -> bool:
+    return verify_password(plain, hashed)
+
+
+async def _storm(verify, logins: int, hashed: str) -> tuple[list[float], float, int]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def probe() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    async def login() -> bool:
+        try:
+            return await verify("hunter22", hashed)
+        except ServiceBusy:
+            return False
+
+    probing = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probing
+    return lags, elapsed, results.count(False)
+
+
+async def main(logins: int, workers: int, queue_size: int) -> None:
+    hashed = hash_password("hunter22")
+    hasher = PasswordHasher(workers, queue_size, timeout=30)
+    print(f"{'mode':>7} {'probe p50 ms':>13} {'probe p99 ms':>13} {'max ms':>8} "
+          f"{'logins/s':>9} {'503s':>5}")
+    for mode, verify in [("inline", _inline), ("pool", hasher.verify)]:
+        lags, elapsed, refused = await _storm(verify, logins, hashed)
+        lags_ms = sorted(lag * 1000 for lag in lags)
+        p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+        print(f"{mode:>7} {statistics.median(lags_ms):>13.1f} {p99:>13.1f} "
+              f"{lags_ms[-1]:>8.1f} {(logins - refused) / elapsed:>9.1f} {refused:>5}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.queue_size))
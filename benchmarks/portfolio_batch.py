@@ -0,0 +1,99 @@
+"""Importing a watchlist: per-coin adds (old and new) vs POST /portfolio/batch.
+
+Seeds a throwaway SQLite DB with --coins coins and imports all of them
+into one user's portfolio three ways, counting the SQL statements sent and
+the wall time:
+
+  legacy  the previous PortfolioService.add per coin (coin lookup, holding
+          lookup, INSERT, commit, selectinload re-fetch)
+  single  the current PortfolioService.add per coin (one INSERT ... RETURNING)
+  batch   PortfolioService.add_many for the whole list (one INSERT ... SELECT)
+
+    python -m benchmarks.portfolio_batch --coins 300
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.models import Base, Coin, PortfolioItem, User
+from app.repositories.coin import CoinRepository
+from app.repositories.portfolio import PortfolioRepository
+from app.repositories.price_history import PriceHistoryRepository
+from app.services.portfolio import PortfolioService
+
+
+NOW = datetime(2026, 1, 1)
+
+
+async def _legacy_add(db, user_id: int, coin_id: int) -> PortfolioItem:
+    assert await db.get(Coin, coin_id) is not None
+    held = select(PortfolioItem).where(
+        PortfolioItem.user_id == user_id, PortfolioItem.coin_id == coin_id
+    )
+    assert (await db.execute(held)).scalar_one_or_none() is None
+    db.add(PortfolioItem(user_id=user_id, coin_id=coin_id))
+    await db.flush()
+    await db.commit()
+    result = await db.execute(held.options(selectinload(PortfolioItem.coin)))
+    return result.scalar_one()
+
+
+async def main(coins: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        statements = 0
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _count(*_) -> None:
+            nonlocal statements
+            statements += 1
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            db.add(User(id=1, email="bench@example.com", password_hash="x"))
+            await db.execute(insert(Coin), [
+                {"id": i, "external_id": f"coin-{i}", "name": f"Coin {i}", "symbol": f"C{i}",
+                 "market_cap_rank": i, "price_usd": 1.0 + i / 7, "last_updated": NOW}
+                for i in range(1, coins + 1)
+            ])
+            await db.commit()
+
+        ids = list(range(1, coins + 1))
+        print(f"{'mode':>7} {'statements':>11} {'ms':>9}")
+        for mode in ("legacy", "single", "batch"):
+            async with sessions() as db:
+                await db.execute(delete(PortfolioItem))
+                await db.commit()
+            async with sessions() as db:
+                service = PortfolioService(
+                    db, PortfolioRepository(db), CoinRepository(db), PriceHistoryRepository(db)
+                )
+                statements = 0
+                start = time.perf_counter()
+                if mode == "legacy":
+                    for coin_id in ids:
+                        await _legacy_add(db, 1, coin_id)
+                elif mode == "single":
+                    for coin_id in ids:
+                        await service.add(1, coin_id)
+                else:
+                    await service.add_many(1, ids)
+                elapsed = time.perf_counter() - start
+            print(f"{mode:>7} {statements:>11} {elapsed * 1000:>9.1f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.coins))
@@ -0,0 +1,96 @@
+"""Portfolio valuation: per-item ORM traversal vs one joined query + NumPy.
+
+Seeds a throwaway SQLite DB with one user holding --positions coins, then
+times valuing the whole portfolio both ways.
+
+    python -m benchmarks.portfolio_valuation --positions 100 500 2000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base, Coin, PortfolioItem, User
+from app.repositories.coin import CoinRepository
+from app.repositories.portfolio import PortfolioRepository
+from app.repositories.price_history import PriceHistoryRepository
+from app.services.portfolio import PortfolioService
+
+
+NOW = datetime(2026, 1, 1)
+
+
+async def _seed(db, positions: int) -> None:
+    await db.execute(delete(PortfolioItem))
+    await db.execute(delete(Coin))
+    await db.execute(insert(Coin), [
+        {"id": i, "external_id": f"coin-{i}", "name": f"Coin {i}", "symbol": f"C{i}",
+         "market_cap_rank": i, "price_usd": 1.0 + i / 7, "last_updated": NOW}
+        for i in range(1, positions + 1)
+    ])
+    await db.execute(insert(PortfolioItem), [
+        {"user_id": 1, "coin_id": i, "quantity": i / 3, "cost_basis_usd": i * 1.5}
+        for i in range(1, positions + 1)
+    ])
+    await db.commit()
+
+
+async def _orm_valuation(repo: PortfolioRepository, user_id: int) -> float:
+    items = await repo.list_for_user(user_id)
+    values = [item.quantity * item.coin.price_usd for item in items]
+    total = sum(values)
+    for item, value in zip(items, values):
+        _ = (value / total, value - item.cost_basis_usd)
+    return total
+
+
+async def _time(fn, repeats: int) -> float:
+    await fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        await fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+async def main(sizes: list[int], repeats: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            db.add(User(id=1, email="bench@example.com", password_hash="x"))
+            await db.commit()
+
+        print(f"{'positions':>9} {'orm ms':>8} {'numpy ms':>9} {'speedup':>8}")
+        for n in sizes:
+            async with sessions() as db:
+                await _seed(db, n)
+            async with sessions() as db:
+                repo = PortfolioRepository(db)
+                service = PortfolioService(db, repo, CoinRepository(db), PriceHistoryRepository(db))
+
+                async def orm():
+                    db.expunge_all()
+                    return await _orm_valuation(repo, 1)
+
+                async def vectorized():
+                    return await service.valuation(1)
+
+                slow = await _time(orm, repeats)
+                fast = await _time(vectorized, repeats)
+            print(f"{n:>9} {slow:>8.2f} {fast:>9.2f} {slow / fast:>7.1f}x")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.positions, args.repeats))
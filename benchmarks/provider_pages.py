@@ -0,0 +1,66 @@
+"""Paged market fetch: wall clock vs page concurrency.
+
+A stub upstream answers every page after --rtt seconds. Fetching --coins
+coins in pages of 250 should take roughly rtt * pages / concurrency, as
+long as the per-host budget (--rate requests/s, 0 = off) allows it.
+
+    python -m benchmarks.provider_pages --coins 5000 --rtt 0.2
+"""
+import argparse
+import asyncio
+import math
+import time
+
+import httpx
+
+from app.providers.coingecko import CoinGeckoProvider
+from app.providers.paging import RateBudget, fetch_pages
+
+ITEM = {
+    "name": "Coin",
+    "symbol": "c",
+    "market_cap_rank": 1,
+    "current_price": 1.0,
+    "image": None,
+    "last_updated": "2026-05-04T12:00:00.000Z",
+}
+
+
+def _handler(rtt: float):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rtt)
+        page, size = int(request.url.params["page"]), int(request.url.params["per_page"])
+        first = (page - 1) * size
+        return httpx.Response(200, json=[{**ITEM, "id": f"c{i}"} for i in range(first, first + size)])
+
+    return handler
+
+
+async def main(coins: int, rtt: float, rate: float, concurrency: list[int]) -> None:
+    transport = httpx.MockTransport(_handler(rtt))
+    async with httpx.AsyncClient(transport=transport) as client:
+        provider = CoinGeckoProvider(url="http://stub/markets", client=client, total=coins)
+        pages = math.ceil(coins / provider.page_size)
+        print(f"{coins} coins, {pages} pages, rtt {rtt * 1000:.0f} ms")
+        print(f"{'concurrency':>11} {'wall s':>7} {'ideal s':>8} {'first batch s':>14}")
+        for n in concurrency:
+            start = time.perf_counter()
+            first = None
+            received = 0
+            budget = RateBudget(rate, n)
+            async for batch in fetch_pages(provider.fetch_page, pages, budget=budget, concurrency=n):
+                first = first or time.perf_counter() - start
+                received += len(batch)
+            wall = time.perf_counter() - start
+            assert received == pages * provider.page_size
+            print(f"{n:>11} {wall:>7.2f} {rtt * math.ceil(pages / n):>8.2f} {first:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--rtt", type=float, default=0.2)
+    parser.add_argument("--rate", type=float, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    asyncio.run(main(args.coins, args.rtt, args.rate, args.concurrency))
@@ -0,0 +1,108 @@
+"""Provider response parsing: whole-body json + dict dataclass vs streaming + slots.
+
+Builds a CoinGecko-shaped body of --items coins and parses it both ways,
+reporting throughput and tracemalloc peak. The streamed path is fed in
+--chunk-size pieces like response.aiter_bytes() would deliver it.
+
+    python -m benchmarks.provider_parse --items 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.providers.coingecko import _parse
+from app.providers.streaming import iter_json_items
+
+
+@dataclass(frozen=True)
+class _DictMarketCoin:
+    """MarketCoin as it was before slots=True."""
+
+    external_id: str
+    name: str
+    symbol: str
+    market_cap_rank: int | None
+    price_usd: float
+    image_url: str | None
+    last_updated: datetime
+
+
+def _legacy_parse(item: dict) -> _DictMarketCoin:
+    # Same field mapping as coingecko._parse, into the pre-slots dataclass.
+    return _DictMarketCoin(
+        external_id=item["id"],
+        name=item["name"],
+        symbol=item["symbol"].upper(),
+        market_cap_rank=item.get("market_cap_rank"),
+        price_usd=float(item["current_price"]),
+        image_url=item.get("image"),
+        last_updated=datetime.fromisoformat(item["last_updated"].replace("Z", "+00:00")),
+    )
+
+
+def _body(items: int) -> bytes:
+    return json.dumps([
+        {
+            "id": f"coin-{i}",
+            "symbol": f"c{i}",
+            "name": f"Coin number {i}",
+            "image": f"https://assets.example.com/coins/images/{i}/large/coin.png",
+            "current_price": 1.0 + i / 7,
+            "market_cap": 1_000_000_000 - i,
+            "market_cap_rank": i + 1,
+            "total_volume": 12345678.9,
+            "price_change_percentage_24h": -1.234,
+            "last_updated": "2026-05-04T12:00:00.000Z",
+        }
+        for i in range(items)
+    ]).encode()
+
+
+def old_path(body: bytes) -> list:
+    return [_legacy_parse(item) for item in json.loads(body)]
+
+
+async def new_path(body: bytes, chunk_size: int) -> list:
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    return [_parse(item) async for item in iter_json_items(chunks())]
+
+
+def _measure(fn, repeats: int) -> tuple[float, float]:
+    fn()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats, peak
+
+
+def main(items: int, chunk_size: int, repeats: int) -> None:
+    body = _body(items)
+    print(f"{items} items, body {len(body) / 1024:.0f} KiB, chunks of {chunk_size} B")
+    print(f"{'path':>9} {'ms':>8} {'items/s':>10} {'peak KiB':>9}")
+    runs = {
+        "old": lambda: old_path(body),
+        "streamed": lambda: asyncio.run(new_path(body, chunk_size)),
+    }
+    for label, fn in runs.items():
+        seconds, peak = _measure(fn, repeats)
+        print(f"{label:>9} {seconds * 1000:>8.1f} {items / seconds:>10.0f} {peak / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.items, args.chunk_size, args.repeats)
@@ -0,0 +1,118 @@
+"""Per-call AsyncClient vs the shared pooled client, against a local stub.
+
+Starts a tiny keep-alive HTTP/1.1 server on 127.0.0.1 that serves a
+CoinGecko-shaped payload, then runs N refreshes through CoinGeckoProvider
+both ways and reports mean/p95 latency and how many TCP connections the
+server had to accept.
+
+    python -m benchmarks.provider_pool --refreshes 200 --coins 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from app.providers.coingecko import CoinGeckoProvider
+from app.providers.http import build_http_client
+
+
+def _payload(n: int) -> bytes:
+    items = [
+        {
+            "id": f"coin-{i}",
+            "name": f"Coin {i}",
+            "symbol": f"c{i}",
+            "market_cap_rank": i + 1,
+            "current_price": 1.0 + i,
+            "image": None,
+            "last_updated": "2026-05-04T12:00:00.000Z",
+        }
+        for i in range(n)
+    ]
+    return json.dumps(items).encode()
+
+
+class StubServer:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.connections = 0
+        self.server: asyncio.Server | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        head = (
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: " + str(len(self.body)).encode() + b"\r\n\r\n"
+        )
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                writer.write(head + self.body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/coins/markets"
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _per_call(url: str, refreshes: int) -> list[float]:
+    timings = []
+    for _ in range(refreshes):
+        start = time.perf_counter()
+        # Baseline: what the providers did before — a fresh client per fetch.
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            await CoinGeckoProvider(url=url, client=client).fetch_market_coins()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _pooled(url: str, refreshes: int) -> list[float]:
+    timings = []
+    async with build_http_client() as client:
+        provider = CoinGeckoProvider(url=url, client=client)
+        for _ in range(refreshes):
+            start = time.perf_counter()
+            await provider.fetch_market_coins()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: list[float], connections: int) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<10} mean={statistics.mean(timings) * 1000:7.3f}ms "
+        f"p95={p95 * 1000:7.3f}ms connections={connections}"
+    )
+
+
+async def main(refreshes: int, coins: int) -> None:
+    for label, run in (("per-call", _per_call), ("pooled", _pooled)):
+        stub = StubServer(_payload(coins))
+        url = await stub.start()
+        timings = await run(url, refreshes)
+        await stub.stop()
+        _report(label, timings, stub.connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--coins", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.refreshes, args.coins))
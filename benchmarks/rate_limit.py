@@ -0,0 +1,95 @@
+"""Rate limiter overhead per request and memory at many distinct keys.
+
+Spreads hits over --keys distinct identities (round-robin, so every key
+stays live) and reports microseconds per hit and the memory held once every
+key has a bucket, for app.rate_limit.LocalBuckets and, when the `limits`
+package is importable, the fixed-window MemoryStorage slowapi used before.
+Also runs one limited route through the full ASGI stack with the limiter
+on and off.
+
+    python -m benchmarks.rate_limit --keys 100000 --hits 500000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.rate_limit import LocalBuckets, RateLimiter
+
+try:
+    from limits import parse as limits_parse
+    from limits.storage import MemoryStorage
+    from limits.strategies import FixedWindowRateLimiter
+except ImportError:  # optional: only for the comparison row
+    limits_parse = None
+
+
+def _local(max_keys: int):
+    buckets = LocalBuckets(max_keys)
+    return buckets, lambda key: buckets.hit_now(key, 1000, 60, time.monotonic())
+
+
+def _limits(_: int):
+    storage = MemoryStorage()
+    strategy = FixedWindowRateLimiter(storage)
+    rate = limits_parse("1000/minute")
+    return storage, lambda key: strategy.hit(rate, key)
+
+
+def _measure(label: str, build, keys: list[str], hits: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    holder, hit = build(len(keys))
+    for key in keys:
+        hit(key)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(hits):
+        hit(keys[i % len(keys)])
+    per_hit = (time.perf_counter() - start) / hits * 1e6
+    print(f"{label:>20}: {per_hit:6.2f} us/hit  {memory / 2**20:6.1f} MiB for {len(keys)} keys")
+    del holder
+
+
+async def _route_rps(enabled: bool, requests: int) -> float:
+    limiter = RateLimiter(LocalBuckets(100_000), enabled)
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(limiter.limit("1000000/minute"))])
+    async def limited() -> dict:
+        return {}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://b") as client:
+        await client.get("/limited")
+        start = time.perf_counter()
+        for _ in range(requests):
+            (await client.get("/limited")).raise_for_status()
+        return requests / (time.perf_counter() - start)
+
+
+def main(key_count: int, hits: int, requests: int) -> None:
+    keys = [f"/auth/login|user:{i}" for i in range(key_count)]
+    _measure("LocalBuckets", _local, keys, hits)
+    if limits_parse is not None:
+        _measure("limits MemoryStorage", _limits, keys, hits)
+    else:
+        print("limits not installed; skipping the MemoryStorage comparison")
+
+    for enabled in (False, True):
+        rps = asyncio.run(_route_rps(enabled, requests))
+        print(f"route, limiter {'on ' if enabled else 'off'}: {rps:7.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--hits", type=int, default=500_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    main(args.keys, args.hits, args.requests)
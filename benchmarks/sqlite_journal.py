@@ -0,0 +1,104 @@
+"""SQLite under concurrent reads and refresh writes: rollback journal vs WAL.
+
+A writer rewrites every coin's price in one transaction in a loop, page by
+page with a short pause between pages (like a refresh upserting pages as
+they download), while --readers tasks keep reading the first page of coins. Each mode runs
+for --seconds and reports read latency and "database is locked" errors.
+Every connection gets the same pragmas the app sets, except journal_mode.
+
+    python -m benchmarks.sqlite_journal --coins 5000 --readers 8 --seconds 5
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event, exc, insert, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models import Base, Coin
+
+
+async def _run(path: Path, mode: str, coins: int, readers: int, seconds: float) -> None:
+    page_size = 250
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _pragmas(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={mode}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Coin), [
+            {"external_id": f"c{i}", "name": f"Coin {i}", "symbol": f"C{i}",
+             "market_cap_rank": i, "price_usd": 1.0, "last_updated": datetime(2026, 1, 1)}
+            for i in range(coins)
+        ])
+
+    deadline = time.perf_counter() + seconds
+    latencies: list[float] = []
+    errors = 0
+    writes = 0
+
+    async def reader() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    (await conn.execute(select(Coin.id, Coin.price_usd).limit(100))).all()
+            except exc.OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async def writer() -> None:
+        nonlocal errors, writes
+        price = 1.0
+        while time.perf_counter() < deadline:
+            price += 1
+            try:
+                async with engine.begin() as conn:
+                    # Refreshes upsert pages as they arrive: the write
+                    # transaction stays open while the next page downloads.
+                    for page in range(0, coins, page_size):
+                        await conn.execute(
+                            update(Coin)
+                            .where(Coin.id > page, Coin.id <= page + page_size)
+                            .values(price_usd=price)
+                        )
+                        await asyncio.sleep(0.01)
+                writes += 1
+            except exc.OperationalError:
+                errors += 1
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    await engine.dispose()
+    ms = sorted(lat * 1000 for lat in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{mode:>8} {len(ms):>7} {statistics.median(ms):>8.1f} {p99:>8.1f} "
+          f"{writes:>7} {errors:>7}")
+
+
+async def main(coins: int, readers: int, seconds: float) -> None:
+    print(f"{'journal':>8} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} {'writes':>7} {'locked':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("DELETE", "WAL"):
+            await _run(Path(tmp) / f"{mode}.db", mode, coins, readers, seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.coins, args.readers, args.seconds))
@@ -0,0 +1,55 @@
+"""Price stream fan-out: memory per idle subscriber and publish cost.
+
+Registers --subscribers subscriptions (half unfiltered, half filtered to 5
+coins), measures the memory they hold while idle, then times publishing a
+refresh that moves --changes of --coins coins. (Subscriptions hold an
+asyncio.Event, so this runs inside an event loop.)
+
+    python -m benchmarks.stream_fanout --subscribers 1000 10000 --changes 500
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.broadcast import PriceBroadcaster
+
+
+def _one(n: int, coins: int, changes: int) -> tuple[float, float]:
+    rng = random.Random(n)
+    broadcaster = PriceBroadcaster(queue_size=256)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subs = [
+        broadcaster.subscribe(None if i % 2 else rng.sample(range(coins), 5))
+        for i in range(n)
+    ]
+    idle = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+
+    ts = datetime(2026, 1, 1)
+    points = [(c, ts, rng.random()) for c in rng.sample(range(coins), changes)]
+    start = time.perf_counter()
+    broadcaster.publish(points)
+    publish = time.perf_counter() - start
+    for sub in subs:
+        broadcaster.unsubscribe(sub)
+    return idle, publish
+
+
+async def main(sizes: list[int], coins: int, changes: int) -> None:
+    print(f"{'subscribers':>11} {'bytes/idle sub':>15} {'publish ms':>11}")
+    for n in sizes:
+        idle, publish = _one(n, coins, changes)
+        print(f"{n:>11} {idle:>15.0f} {publish * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.coins, args.changes))
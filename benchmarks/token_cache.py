@@ -0,0 +1,71 @@
+"""Authenticated request overhead: verifying the JWT every time vs the cache.
+
+Times decode_access_token against a warm AccessTokenCache lookup, then
+serves a trivial authenticated route through the full ASGI stack two ways:
+the previous sync dependency that verified the token on every request
+(run in the threadpool), and app.deps.get_current_user.
+
+    python -m benchmarks.token_cache --calls 20000 --requests 3000
+"""
+import argparse
+import asyncio
+import time
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.deps import CurrentUser, CurrentUserDep, oauth2_scheme
+from app.security import AccessTokenCache, create_access_token, decode_access_token
+
+
+def _legacy_user(token: Annotated[str, Depends(oauth2_scheme)]) -> CurrentUser:
+    payload = decode_access_token(token)
+    return CurrentUser(id=payload["user_id"], email=payload["sub"])
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy(user: Annotated[CurrentUser, Depends(_legacy_user)]) -> dict:
+        return {"id": user.id}
+
+    @app.get("/cached")
+    async def cached(user: CurrentUserDep) -> dict:
+        return {"id": user.id}
+
+    return app
+
+
+async def _rps(client: AsyncClient, path: str, headers: dict, requests: int) -> float:
+    await client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        (await client.get(path, headers=headers)).raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def main(calls: int, requests: int) -> None:
+    token = create_access_token(user_id=1, email="bench@example.com")
+    cache = AccessTokenCache(max_entries=10000)
+
+    for label, decode in [("jwt.decode", decode_access_token), ("cache hit", cache.decode)]:
+        decode(token)
+        start = time.perf_counter()
+        for _ in range(calls):
+            decode(token)
+        print(f"{label:>11}: {(time.perf_counter() - start) / calls * 1e6:7.1f} us/call")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://b") as client:
+        for path in ("/legacy", "/cached"):
+            print(f"{path:>11}: {await _rps(client, path, headers, requests):7.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.requests))
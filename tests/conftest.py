@@ -24,13 +24,25 @@ def _isolated_db(tmp_path_factory):
 async def client(_isolated_db):
     from httpx import ASGITransport, AsyncClient
 
-    from app.db import engine
+    from app.db import engine, recent_writes
     from app.main import app
+    from app.alerts import alert_deliveries, alert_index
+    from app.broadcast import price_broadcaster
+    from app.cache import coin_list_cache, performance_cache
     from app.models import Base
+    from app.services.coin import refresh_flight
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    # Process-local state must not leak between tests that rebuild the DB.
+    refresh_flight.reset()
+    coin_list_cache.invalidate()
+    performance_cache.invalidate()
+    price_broadcaster.reset()
+    alert_index.invalidate()
+    alert_deliveries.reset()
+    recent_writes.clear()
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
@@ -70,3 +82,43 @@ async def seed_coin():
             return coin.id
 
     return _seed
+
+
+@pytest.fixture()
+def fake_provider():
+    """Build an in-memory PriceProvider serving MarketCoins (or raising)."""
+    from app.providers.base import MarketCoin
+
+    class FakeProvider:
+        name = "fake"
+
+        def __init__(self, prices: dict[str, float], error: Exception | None = None) -> None:
+            self.prices = prices
+            self.error = error
+            self.calls = 0
+            self.last_updated: datetime | None = None  # None: stamp every fetch with now
+
+        async def fetch_market_coins(self) -> list[MarketCoin]:
+            self.calls += 1
+            if self.error is not None:
+                raise self.error
+            now = self.last_updated or datetime.now(timezone.utc).replace(tzinfo=None)
+            return [
+                MarketCoin(
+                    external_id=external_id,
+                    name=external_id.title(),
+                    symbol=external_id[:3].upper(),
+                    market_cap_rank=rank,
+                    price_usd=price,
+                    image_url=None,
+                    last_updated=now,
+                )
+                for rank, (external_id, price) in enumerate(self.prices.items(), start=1)
+            ]
+
+    def _build(
+        prices: dict[str, float] | None = None, error: Exception | None = None
+    ) -> FakeProvider:
+        return FakeProvider(prices or {"bitcoin": 50000.0}, error)
+
+    return _build
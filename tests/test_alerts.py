@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import pytest_asyncio
+
+TS = datetime(2026, 5, 4, 12, 0)
+
+
+@pytest_asyncio.fixture()
+async def auth_headers(client, random_credentials):
+    response = await client.post(
+        "/auth/register",
+        json={
+            "email": random_credentials["email"],
+            "password": random_credentials["password"],
+            "password_confirmation": random_credentials["password"],
+        },
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_index_returns_only_crossed_thresholds():
+    from app.alerts import AlertIndex
+
+    index = AlertIndex()
+    index.set_prices([(1, 100.0)])
+    index.add(
+        [
+            (1, 1, "above", 105.0),
+            (2, 1, "above", 110.0),
+            (3, 1, "above", 120.0),
+            (4, 1, "below", 95.0),
+            (5, 1, "below", 90.0),
+            (6, 2, "above", 1.0),
+        ]
+    )
+
+    assert index.evaluate([(1, TS, 110.0)]) == [1, 2]  # threshold == new price fires
+    assert index.evaluate([(1, TS, 110.0)]) == []
+    assert index.evaluate([(1, TS, 95.0)]) == [4]
+    assert index.evaluate([(1, TS, 200.0)]) == [3]  # fired alerts are gone
+    assert index.evaluate([(1, TS, 50.0)]) == [5]
+    assert index.evaluate([(2, TS, 5.0)]) == []  # no baseline price yet
+    assert len(index) == 1
+
+
+async def test_index_sync_picks_up_alerts_committed_out_of_id_order(client, seed_coin):
+    from datetime import timedelta
+
+    from sqlalchemy import select
+
+    from app.alerts import AlertIndex
+    from app.db import SessionLocal
+    from app.models import PriceAlert, User
+    from app.repositories.alert import AlertRepository
+
+    coin_id = await seed_coin()
+    async with SessionLocal() as db:
+        user = User(email="late-commit@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        db.add(PriceAlert(id=50, user_id=user.id, coin_id=coin_id, direction="above", threshold=1.0))
+        await db.commit()
+        created = await db.scalar(select(PriceAlert.created_at).where(PriceAlert.id == 50))
+
+        index = AlertIndex()
+        await index.sync(AlertRepository(db))
+        assert len(index) == 1
+
+        # A lower id whose transaction committed after the sync, as on Postgres.
+        db.add(PriceAlert(
+            id=40, user_id=user.id, coin_id=coin_id, direction="below", threshold=1.0,
+            created_at=created - timedelta(seconds=5),
+        ))
+        await db.commit()
+        await index.sync(AlertRepository(db))
+        await index.sync(AlertRepository(db))
+        assert len(index) == 2
+
+
+async def test_alert_crud(client, auth_headers, seed_coin):
+    coin_id = await seed_coin()
+    created = await client.post(
+        "/alerts",
+        json={"coin_id": coin_id, "direction": "above", "threshold": 60000},
+        headers=auth_headers,
+    )
+    assert created.status_code == 201
+    alert = created.json()
+    assert alert["triggered_at"] is None
+
+    listing = await client.get("/alerts", headers=auth_headers)
+    assert [a["id"] for a in listing.json()] == [alert["id"]]
+
+    assert (await client.delete(f"/alerts/{alert['id']}", headers=auth_headers)).status_code == 204
+    assert (await client.delete(f"/alerts/{alert['id']}", headers=auth_headers)).status_code == 404
+    assert (await client.get("/alerts", headers=auth_headers)).json() == []
+
+
+async def test_alert_validation(client, auth_headers):
+    missing = await client.post(
+        "/alerts", json={"coin_id": 9999, "direction": "above", "threshold": 1}, headers=auth_headers
+    )
+    assert missing.status_code == 404
+    bad = await client.post(
+        "/alerts", json={"coin_id": 1, "direction": "sideways", "threshold": 1}, headers=auth_headers
+    )
+    assert bad.status_code == 422
+    assert (await client.get("/alerts")).status_code == 401
+
+
+async def test_refresh_triggers_crossed_alerts_once(client, auth_headers, fake_provider):
+    from app.alerts import alert_deliveries
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0})
+
+    async def refresh(price: float) -> None:
+        provider.prices["bitcoin"] = price
+        refresh_flight.reset()
+        async with SessionLocal() as db:
+            await build_coin_service(db, provider).refresh_from_provider()
+
+    await refresh(50000.0)
+    coin_id = (await client.get("/coins")).json()[0]["id"]
+    ids = {}
+    for direction, threshold in [("above", 55000), ("above", 70000), ("below", 45000)]:
+        response = await client.post(
+            "/alerts",
+            json={"coin_id": coin_id, "direction": direction, "threshold": threshold},
+            headers=auth_headers,
+        )
+        ids[(direction, threshold)] = response.json()["id"]
+
+    await refresh(56000.0)
+    await refresh(54000.0)
+    await refresh(56000.0)  # crossing 55000 again: already fired
+
+    delivered = await alert_deliveries.next_batch()
+    assert [(a.id, a.price_usd) for a in delivered] == [(ids[("above", 55000)], 56000.0)]
+    alerts = {a["id"]: a for a in (await client.get("/alerts", headers=auth_headers)).json()}
+    assert alerts[ids[("above", 55000)]]["triggered_price"] == 56000.0
+    assert alerts[ids[("above", 70000)]]["triggered_at"] is None
+    assert alerts[ids[("below", 45000)]]["triggered_at"] is None
+    assert len(alert_deliveries) == 0
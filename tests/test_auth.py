@@ -101,6 +101,33 @@ async def test_refresh_rotates_token(client, random_credentials):
     assert reuse.status_code == 401
 
 
+async def test_concurrent_refreshes_with_one_token_succeed_once(client, random_credentials):
+    import asyncio
+
+    register = await client.post(
+        "/auth/register",
+        json={
+            "email": random_credentials["email"],
+            "password": random_credentials["password"],
+            "password_confirmation": random_credentials["password"],
+        },
+    )
+    token = register.json()["refresh_token"]
+
+    responses = await asyncio.gather(
+        *(client.post("/auth/refresh", json={"refresh_token": token}) for _ in range(50))
+    )
+
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200] + [401] * 49
+    winner = next(r for r in responses if r.status_code == 200).json()
+    assert winner["email"] == random_credentials["email"]
+    follow_up = await client.post(
+        "/auth/refresh", json={"refresh_token": winner["refresh_token"]}
+    )
+    assert follow_up.status_code == 200
+
+
 async def test_refresh_with_invalid_token_returns_401(client):
     response = await client.post(
         "/auth/refresh", json={"refresh_token": "garbage"}
@@ -124,3 +151,120 @@ async def test_logout_revokes_refresh_token(client, random_credentials):
 
     after = await client.post("/auth/refresh", json={"refresh_token": refresh})
     assert after.status_code == 401
+
+
+async def test_password_hasher_refuses_when_saturated():
+    import asyncio
+    import threading
+
+    import pytest
+
+    from app.exceptions import ServiceBusy
+    from app.security import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, queue_size=1, timeout=0.05)
+    release = threading.Event()
+    try:
+        busy = asyncio.ensure_future(hasher.run(release.wait))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(hasher.run(lambda: "late"))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceBusy):  # worker and queue slot both taken
+            await hasher.run(lambda: "refused")
+        with pytest.raises(ServiceBusy):  # never reached a worker in time
+            await queued
+
+        stats = hasher.stats()
+        assert (stats.running, stats.rejected, stats.timed_out) == (1, 1, 1)
+        release.set()
+        assert await busy is True
+        assert await hasher.verify("x", await hasher.hash("x"))
+        assert hasher.stats().completed == 3
+
+        # A caller cancelled mid-hash keeps its slot until the thread is done.
+        release.clear()
+        abandoned = asyncio.ensure_future(hasher.run(release.wait))
+        await asyncio.sleep(0.01)
+        abandoned.cancel()
+        await asyncio.sleep(0)
+        assert hasher.stats().running == 1
+        queued = asyncio.ensure_future(hasher.run(lambda: "queued"))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceBusy):
+            await hasher.run(lambda: "refused")
+        release.set()
+        assert await queued == "queued"
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+async def test_login_returns_503_when_hasher_is_busy(client, random_credentials):
+    import asyncio
+    import threading
+
+    from app.deps import DbDep, get_auth_service
+    from app.main import app
+    from app.repositories.refresh_token import RefreshTokenRepository
+    from app.repositories.user import UserRepository
+    from app.security import PasswordHasher
+    from app.services.auth import AuthService
+
+    await client.post(
+        "/auth/register",
+        json={
+            "email": random_credentials["email"],
+            "password": random_credentials["password"],
+            "password_confirmation": random_credentials["password"],
+        },
+    )
+    full = PasswordHasher(workers=1, queue_size=0, timeout=1)
+    release = threading.Event()
+    busy = asyncio.ensure_future(full.run(release.wait))  # the only slot is taken
+    await asyncio.sleep(0.01)
+
+    def busy_auth_service(db: DbDep) -> AuthService:
+        return AuthService(db, UserRepository(db), RefreshTokenRepository(db), full)
+
+    app.dependency_overrides[get_auth_service] = busy_auth_service
+    try:
+        response = await client.post("/auth/login", json=random_credentials)
+    finally:
+        del app.dependency_overrides[get_auth_service]
+        release.set()
+        await busy
+        full.shutdown()
+    assert response.status_code == 503
+
+    stats = (await client.get("/health/password-hasher")).json()
+    assert {"queued", "running", "rejected", "hash_p95_ms"} <= set(stats)
+
+
+def test_access_token_cache_hits_until_expiry_and_evicts():
+    import time
+
+    import pytest
+
+    from app.security import AccessTokenCache, create_access_token
+
+    cache = AccessTokenCache(max_entries=2)
+    first = create_access_token(user_id=1, email="a@example.com")
+    assert cache.decode(first)["user_id"] == 1
+    assert cache.decode(first)["user_id"] == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    with pytest.raises(ValueError):
+        cache.decode("not-a-token")
+    assert cache.stats().entries == 1  # failures are not cached
+
+    # An entry past its exp is dropped and the token verified again.
+    key = next(iter(cache._entries))
+    cache._entries[key] = (time.time() - 1, {})
+    assert cache.decode(first)["user_id"] == 1
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    for user_id in (3, 4):
+        cache.decode(create_access_token(user_id=user_id, email=f"{user_id}@example.com"))
+    assert cache.stats().entries == 2
+    cache.decode(first)
+    assert cache.misses == 6  # evicted as least recently used
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+
+BASE = datetime(2026, 5, 4, 12, 0)
+
+
+async def _candles(db, coin_id: int, resolution: int) -> list[tuple]:
+    from app.repositories.candle import CandleRepository
+
+    return await CandleRepository(db).list_range(
+        coin_id, resolution, BASE - timedelta(days=2), BASE + timedelta(days=2)
+    )
+
+
+async def test_incremental_apply_merges_buckets(client, seed_coin):
+    from app.db import SessionLocal
+    from app.repositories.candle import CandleRepository
+
+    coin_id = await seed_coin()
+    async with SessionLocal() as db:
+        repo = CandleRepository(db)
+        resolutions = [60, 3600]
+        await repo.apply(
+            [(coin_id, BASE, 100.0), (coin_id, BASE + timedelta(seconds=30), 90.0)], resolutions
+        )
+        await repo.apply([(coin_id, BASE + timedelta(seconds=50), 120.0)], resolutions)
+        await repo.apply([(coin_id, BASE + timedelta(minutes=1), 110.0)], resolutions)
+        await db.commit()
+
+        assert await _candles(db, coin_id, 60) == [
+            (BASE, 100.0, 120.0, 90.0, 120.0),
+            (BASE + timedelta(minutes=1), 110.0, 110.0, 110.0, 110.0),
+        ]
+        assert await _candles(db, coin_id, 3600) == [(BASE, 100.0, 120.0, 90.0, 110.0)]
+
+
+async def test_backfill_matches_on_the_fly_fold(client, seed_coin):
+    from app.db import SessionLocal
+    from app.models import PricePoint
+    from app.repositories.candle import fold
+    from app.services import candles
+
+    coin_id = await seed_coin()
+    other_id = await seed_coin(external_id="ethereum", name="Ethereum", symbol="ETH")
+    points = [
+        (cid, BASE + timedelta(minutes=7 * i), float((i * 37) % 101))
+        for cid in (coin_id, other_id)
+        for i in range(300)
+    ]
+    async with SessionLocal() as db:
+        db.add_all(PricePoint(coin_id=c, ts=ts, price_usd=p) for c, ts, p in points)
+        await db.commit()
+
+        read, _ = await candles.backfill(db, chunk_size=64)
+        assert read == len(points)
+
+        expected = fold(points, [3600])
+        got = await _candles(db, coin_id, 3600) + await _candles(db, other_id, 3600)
+        assert got == [(start, *ohlc) for (_, _, start), ohlc in sorted(expected.items())]
+
+
+async def test_backfill_keeps_old_candles_visible_until_it_commits(client, seed_coin, monkeypatch):
+    import asyncio
+
+    from app.db import SessionLocal
+    from app.models import PricePoint
+    from app.repositories.candle import CandleRepository
+    from app.repositories.price_history import PriceHistoryRepository
+    from app.services import candles
+
+    coin_id = await seed_coin()
+    async with SessionLocal() as db:
+        db.add(PricePoint(coin_id=coin_id, ts=BASE, price_usd=100.0))
+        await CandleRepository(db).apply([(coin_id, BASE, 100.0)], [3600])
+        await db.commit()
+
+    reading = asyncio.Event()
+    proceed = asyncio.Event()
+    points_after = PriceHistoryRepository.points_after
+
+    async def paused(self, *args, **kwargs):
+        reading.set()
+        await proceed.wait()
+        return await points_after(self, *args, **kwargs)
+
+    monkeypatch.setattr(PriceHistoryRepository, "points_after", paused)
+    async with SessionLocal() as db:
+        task = asyncio.create_task(candles.backfill(db))
+        await asyncio.wait_for(reading.wait(), 2)
+        async with SessionLocal() as reader:
+            assert await _candles(reader, coin_id, 3600) == [(BASE, 100.0, 100.0, 100.0, 100.0)]
+        proceed.set()
+        await asyncio.wait_for(task, 5)
+
+    async with SessionLocal() as db:
+        assert await _candles(db, coin_id, 86400) == [
+            (BASE.replace(hour=0), 100.0, 100.0, 100.0, 100.0)
+        ]
+
+
+async def test_refresh_feeds_candles_endpoint(client, fake_provider):
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 100.0})
+    async with SessionLocal() as db:
+        for price in (100.0, 80.0, 130.0, 120.0):
+            provider.prices["bitcoin"] = price
+            await build_coin_service(db, provider).refresh_from_provider()
+            refresh_flight.reset()
+
+    coin_id = (await client.get("/coins")).json()[0]["id"]
+    response = await client.get(f"/coins/{coin_id}/candles", params={"resolution": "1d"})
+    assert response.status_code == 200
+    [candle] = response.json()["candles"]
+    assert (candle["open"], candle["high"], candle["low"], candle["close"]) == (
+        100.0, 130.0, 80.0, 120.0,
+    )
+
+    bad = await client.get(f"/coins/{coin_id}/candles", params={"resolution": "7m"})
+    assert bad.status_code == 422
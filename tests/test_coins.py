@@ -19,3 +19,538 @@ async def test_list_coins_returns_seeded(client, seed_coin):
     assert body[0]["external_id"] == "bitcoin"
     assert body[0]["symbol"] == "BTC"
     assert body[0]["price_usd"] == 50000.0
+
+
+async def test_refresher_run_once_updates_status(client, fake_provider):
+    from app.services.refresher import PriceRefresher
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0})
+    refresher = PriceRefresher(interval=60, jitter=0, provider_factory=lambda: provider)
+
+    delay = await refresher.run_once()
+
+    assert delay == 60
+    assert refresher.status.last_refreshed_count == 2
+    assert refresher.status.source == "fake"
+    assert refresher.status.last_success_at is not None
+    assert refresher.status.last_error is None
+    body = (await client.get("/coins")).json()
+    assert [c["external_id"] for c in body] == ["bitcoin", "ethereum"]
+
+
+async def test_refresher_records_only_runs_it_executed(client, fake_provider):
+    from app.services.refresher import PriceRefresher
+
+    provider = fake_provider({"bitcoin": 50000.0})
+    refresher = PriceRefresher(interval=60, jitter=0, provider_factory=lambda: provider)
+    await refresher.run_once()
+    first = refresher.status.last_success_at
+
+    # Inside PRICE_REFRESH_MIN_INTERVAL_SECONDS the coalescer replays the result.
+    assert await refresher.run_once() == 60
+    assert provider.calls == 1
+    assert refresher.status.last_success_at == first
+
+
+async def test_refresher_backs_off_on_provider_failure(client, fake_provider):
+    import httpx
+
+    from app.services.refresher import PriceRefresher
+
+    provider = fake_provider(error=httpx.ConnectError("upstream down"))
+    refresher = PriceRefresher(
+        jitter=0, backoff_base=5, backoff_max=15, provider_factory=lambda: provider
+    )
+
+    delays = [await refresher.run_once() for _ in range(4)]
+
+    assert delays == [5, 10, 15, 15]
+    assert refresher.status.consecutive_failures == 4
+    assert "upstream down" in refresher.status.last_error
+    assert refresher.status.last_success_at is None
+
+
+async def test_refresh_endpoint_only_nudges(client, fake_provider):
+    import asyncio
+
+    from app.deps import get_refresher
+    from app.main import app
+    from app.services.refresher import PriceRefresher
+
+    provider = fake_provider()
+    refresher = PriceRefresher(provider_factory=lambda: provider)
+    app.dependency_overrides[get_refresher] = lambda: refresher
+    try:
+        response = await client.post("/coins/refresh")
+        assert response.status_code == 202
+        assert response.json()["last_success_at"] is None
+
+        await asyncio.wait_for(refresher._oneshot, timeout=5)
+        status = (await client.get("/coins/refresh/status")).json()
+        assert status["last_refreshed_count"] == 1
+        assert status["source"] == "fake"
+    finally:
+        app.dependency_overrides.pop(get_refresher, None)
+
+
+async def test_concurrent_refreshes_share_one_fetch(client, fake_provider):
+    import asyncio
+
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0})
+    sessions = [SessionLocal() for _ in range(10)]
+    services = [build_coin_service(db, provider) for db in sessions]
+    try:
+        results = await asyncio.gather(*(s.refresh_from_provider() for s in services))
+        # Inside the minimum interval the last result is replayed.
+        again = await services[0].refresh_from_provider()
+    finally:
+        for db in sessions:
+            await db.close()
+
+    assert provider.calls == 1
+    assert sorted(results) == [(2, 2, "fake", False)] * 9 + [(2, 2, "fake", True)]
+    assert again == (2, 2, "fake", False)
+    assert refresh_flight.executed == 1
+    assert refresh_flight.coalesced == 9
+    assert refresh_flight.throttled == 1
+
+    status = (await client.get("/coins/refresh/status")).json()
+    assert status["executed_refreshes"] == 1
+    assert status["coalesced_refreshes"] == 9
+
+
+async def test_cancelled_leader_does_not_cancel_the_shared_refresh(client, fake_provider):
+    import asyncio
+
+    import pytest
+
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0})
+    release = asyncio.Event()
+    fetch = provider.fetch_market_coins
+
+    async def slow_fetch(*args, **kwargs):
+        await release.wait()
+        return await fetch(*args, **kwargs)
+
+    provider.fetch_market_coins = slow_fetch
+    async with SessionLocal() as leader_db, SessionLocal() as follower_db:
+        leader = asyncio.ensure_future(
+            build_coin_service(leader_db, provider).refresh_from_provider()
+        )
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(
+            build_coin_service(follower_db, provider).refresh_from_provider()
+        )
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == (1, 1, "fake", False)
+    assert refresh_flight.executed == 1
+
+    # Shutdown cancels the run itself, for every caller.
+    refresh_flight.reset()
+    release.clear()
+    async with SessionLocal() as db:
+        run = asyncio.ensure_future(build_coin_service(db, provider).refresh_from_provider())
+        await asyncio.sleep(0)
+        refresh_flight.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+
+async def test_list_coins_etag_and_304(client, seed_coin):
+    await seed_coin()
+    first = await client.get("/coins")
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    cached = await client.get("/coins", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    stale = await client.get("/coins", headers={"If-None-Match": '"something-else"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+async def test_refresh_invalidates_coin_list_cache(client, fake_provider):
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service
+
+    before = await client.get("/coins")
+    assert before.json() == []
+
+    async with SessionLocal() as db:
+        await build_coin_service(db, fake_provider()).refresh_from_provider()
+
+    after = await client.get("/coins", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()[0]["external_id"] == "bitcoin"
+
+
+async def test_preserialized_list_matches_response_model(client, seed_coin):
+    from pydantic import TypeAdapter
+
+    from app.schemas.coin import CoinResponse
+
+    await seed_coin()
+    await seed_coin(external_id="ethereum", name="Ethereum", symbol="ETH")
+    response = await client.get("/coins")
+    assert response.headers["content-type"] == "application/json"
+
+    validated = TypeAdapter(list[CoinResponse]).validate_json(response.content)
+    assert response.json() == TypeAdapter(list[CoinResponse]).dump_python(
+        validated, mode="json"
+    )
+
+    schema = (await client.get("/openapi.json")).json()
+    ok = schema["paths"]["/coins"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert ok["schema"]["items"]["$ref"].endswith("/CoinResponse")
+
+
+async def _seed_market(rows: list[tuple[str, int | None, float]]) -> None:
+    from datetime import datetime
+
+    from app.db import SessionLocal
+    from app.models import Coin
+
+    async with SessionLocal() as db:
+        for external_id, rank, price in rows:
+            db.add(
+                Coin(
+                    external_id=external_id,
+                    name=external_id.title(),
+                    symbol=external_id[:3].upper(),
+                    market_cap_rank=rank,
+                    price_usd=price,
+                    image_url=None,
+                    last_updated=datetime(2026, 5, 4, 12, 0),
+                )
+            )
+        await db.commit()
+
+
+MARKET = [
+    ("bitcoin", 1, 50000.0),
+    ("ethereum", 2, 3000.0),
+    ("tether", 3, 1.0),
+    ("solana", 5, 150.0),
+    ("dogecoin", None, 0.1),
+    ("pepe", None, 0.00001),
+]
+
+
+async def _walk(client, **params) -> list[str]:
+    seen, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = await client.get("/coins", params=query)
+        assert response.status_code == 200
+        seen += [c["external_id"] for c in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return seen
+
+
+async def test_keyset_pages_by_rank_with_unranked_last(client):
+    await _seed_market(MARKET)
+    full = [c["external_id"] for c in (await client.get("/coins")).json()]
+    assert full[:4] == ["bitcoin", "ethereum", "tether", "solana"]
+
+    assert await _walk(client, limit=2) == full
+    assert await _walk(client, limit=4) == full
+    assert await _walk(client, limit=500) == full
+
+
+async def test_keyset_sorts_and_filters(client):
+    await _seed_market(MARKET)
+
+    assert await _walk(client, limit=2, sort="-price") == [
+        "bitcoin", "ethereum", "solana", "tether", "dogecoin", "pepe",
+    ]
+    assert await _walk(client, limit=1, sort="price", max_price=200) == [
+        "pepe", "dogecoin", "tether", "solana",
+    ]
+    assert await _walk(client, limit=2, min_rank=2, max_rank=5) == [
+        "ethereum", "tether", "solana",
+    ]
+    assert await _walk(client, limit=2, symbol="eth") == ["ethereum"]
+
+
+async def test_invalid_cursor_rejected(client):
+    await _seed_market(MARKET)
+    assert (await client.get("/coins", params={"cursor": "!!not-a-cursor"})).status_code == 400
+
+    first = await client.get("/coins", params={"limit": 1, "sort": "price"})
+    cursor = first.headers["x-next-cursor"]
+    mismatched = await client.get("/coins", params={"cursor": cursor, "sort": "-price"})
+    assert mismatched.status_code == 400
+
+
+async def test_refresh_appends_price_points(client, fake_provider):
+    from sqlalchemy import func, select
+
+    from app.db import SessionLocal
+    from app.models import PricePoint
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0})
+    async with SessionLocal() as db:
+        await build_coin_service(db, provider).refresh_from_provider()
+        refresh_flight.reset()
+        provider.prices["bitcoin"] = 51000.0
+        await build_coin_service(db, provider).refresh_from_provider()
+        count = await db.scalar(select(func.count()).select_from(PricePoint))
+
+    assert count == 4
+
+
+async def test_unchanged_coins_still_get_a_price_point_per_refresh(client, fake_provider):
+    from datetime import datetime
+
+    from sqlalchemy import func, select
+
+    from app.broadcast import price_broadcaster
+    from app.db import SessionLocal
+    from app.models import PricePoint
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0})
+    provider.last_updated = datetime(2026, 5, 4)
+    subscription = price_broadcaster.subscribe()
+    try:
+        for expected in ((2, 2, "fake", True), (2, 0, "fake", True)):
+            refresh_flight.reset()
+            async with SessionLocal() as db:
+                assert await build_coin_service(db, provider).refresh_from_provider() == expected
+        updates, _ = await subscription.next_batch()
+        assert len(updates) == 2  # only the first refresh's prices were news
+    finally:
+        price_broadcaster.unsubscribe(subscription)
+
+    async with SessionLocal() as db:
+        per_coin = await db.execute(
+            select(PricePoint.coin_id, func.count()).group_by(PricePoint.coin_id)
+        )
+        assert [count for _, count in per_coin] == [2, 2]
+
+
+async def test_price_moves_recorded_when_provider_timestamp_is_stuck(client, fake_provider):
+    from datetime import datetime
+
+    from sqlalchemy import select
+
+    from app.broadcast import price_broadcaster
+    from app.db import SessionLocal
+    from app.models import PricePoint
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 100.0})
+    provider.last_updated = datetime(1970, 1, 1)  # e.g. CoinCap without `time`
+    subscription = price_broadcaster.subscribe()
+    published = []
+    try:
+        for price in (100.0, 200.0, 300.0):
+            provider.prices["bitcoin"] = price
+            refresh_flight.reset()
+            async with SessionLocal() as db:
+                await build_coin_service(db, provider).refresh_from_provider()
+            updates, _ = await subscription.next_batch()
+            published += [u.price_usd for u in updates]
+    finally:
+        price_broadcaster.unsubscribe(subscription)
+
+    async with SessionLocal() as db:
+        recorded = list(await db.scalars(select(PricePoint.price_usd).order_by(PricePoint.ts)))
+    assert recorded == [100.0, 200.0, 300.0]
+    assert published == [100.0, 200.0, 300.0]
+
+
+async def test_history_downsamples_server_side(client, seed_coin):
+    from datetime import datetime, timedelta
+
+    from app.db import SessionLocal
+    from app.models import PricePoint
+
+    coin_id = await seed_coin()
+    base = datetime(2026, 5, 4, 12, 0)
+    async with SessionLocal() as db:
+        # one point per minute for two hours, price == minute index
+        db.add_all(
+            PricePoint(coin_id=coin_id, ts=base + timedelta(minutes=i), price_usd=float(i))
+            for i in range(120)
+        )
+        await db.commit()
+
+    response = await client.get(
+        f"/coins/{coin_id}/history",
+        params={"from": "2026-05-04T12:00:00Z", "to": "2026-05-04T14:00:00Z", "step": "1h"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["step_seconds"] == 3600
+    assert body["points"] == [
+        {"ts": "2026-05-04T12:00:00", "price_usd": 29.5},
+        {"ts": "2026-05-04T13:00:00", "price_usd": 89.5},
+    ]
+
+
+async def test_history_rejects_bad_ranges(client, seed_coin):
+    coin_id = await seed_coin()
+    url = f"/coins/{coin_id}/history"
+    assert (await client.get("/coins/9999/history")).status_code == 404
+    inverted = {"from": "2026-05-05T00:00:00", "to": "2026-05-04T00:00:00"}
+    assert (await client.get(url, params=inverted)).status_code == 400
+    too_fine = {"from": "2026-01-01T00:00:00", "to": "2026-05-01T00:00:00", "step": "1s"}
+    assert (await client.get(url, params=too_fine)).status_code == 400
+    assert (await client.get(url, params={"step": "5 minutes"})).status_code == 422
+
+
+async def test_refresh_writes_only_changed_rows(client, fake_provider):
+    from datetime import datetime
+
+    from sqlalchemy import select, update
+
+    from app.db import SessionLocal
+    from app.models import Coin
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0, "solana": 150.0})
+    provider.last_updated = datetime(2026, 5, 4, 12, 0)
+
+    async def refresh():
+        refresh_flight.reset()
+        async with SessionLocal() as db:
+            return await build_coin_service(db, provider).refresh_from_provider()
+
+    assert await refresh() == (3, 3, "fake", True)
+    assert await refresh() == (3, 0, "fake", True)
+
+    # A price move is a narrow update; a rank swap rewrites the metadata.
+    provider.prices = {"ethereum": 3000.0, "bitcoin": 50000.0, "solana": 155.0}
+    provider.last_updated = datetime(2026, 5, 4, 12, 1)
+    assert await refresh() == (3, 3, "fake", True)
+
+    # Another worker wrote a different price: the baseline comes from the
+    # table, so this worker's (unchanged) snapshot is still written back.
+    async with SessionLocal() as db:
+        await db.execute(update(Coin).where(Coin.external_id == "solana").values(price_usd=1.0))
+        await db.commit()
+    assert await refresh() == (3, 1, "fake", True)
+    assert await refresh() == (3, 0, "fake", True)
+
+    async with SessionLocal() as db:
+        coins = {c.external_id: c for c in await db.scalars(select(Coin))}
+    assert coins["solana"].price_usd == 155.0
+    assert coins["ethereum"].market_cap_rank == 1
+    assert coins["bitcoin"].market_cap_rank == 2
+
+
+async def test_upsert_chunks_under_the_bind_parameter_limit(client):
+    from datetime import datetime
+
+    from sqlalchemy import func, select
+
+    from app.db import SessionLocal
+    from app.models import Coin
+    from app.providers.base import MarketCoin
+    from app.repositories.coin import CoinRepository
+
+    coins = [
+        MarketCoin(f"coin-{i}", f"Coin {i}", f"C{i}", i + 1, 1.0 + i, None, datetime(2026, 5, 4))
+        for i in range(1000)
+    ]
+    async with SessionLocal() as db:
+        result = await CoinRepository(db).upsert_many(coins)
+        await db.commit()
+        assert await db.scalar(select(func.count()).select_from(Coin)) == 1000
+
+    assert (result.received, result.inserted, result.changed) == (1000, 1000, 1000)
+
+
+def test_copy_path_only_for_large_postgres_batches(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.config import settings
+    from app.repositories.bulk import use_copy
+
+    def session(dialect):
+        return SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name=dialect)))
+
+    monkeypatch.setattr(settings, "BULK_COPY_MIN_ROWS", 2000)
+    assert use_copy(session("postgresql"), 2000)
+    assert not use_copy(session("postgresql"), 1999)
+    assert not use_copy(session("sqlite"), 100_000)
+    monkeypatch.setattr(settings, "BULK_COPY_MIN_ROWS", 0)
+    assert not use_copy(session("postgresql"), 100_000)
+
+
+async def test_copy_merge_stages_with_copy_then_merges():
+    # Postgres-only path; a stub session records the SQL and the COPY call.
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import postgresql
+
+    from app.models import Coin
+    from app.repositories.bulk import copy_merge
+
+    statements: list[str] = []
+    copies: list[dict] = []
+
+    async def copy_records_to_table(name, *, records, columns):
+        copies.append({"name": name, "records": records, "columns": columns})
+
+    raw = SimpleNamespace(driver_connection=SimpleNamespace(copy_records_to_table=copy_records_to_table))
+
+    class Session:
+        async def execute(self, stmt):
+            statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+        async def connection(self):
+            async def get_raw_connection():
+                return raw
+
+            return SimpleNamespace(get_raw_connection=get_raw_connection)
+
+    rows = [
+        {"external_id": "bitcoin", "name": "Bitcoin", "price_usd": 1.0},
+        {"external_id": "ether", "name": "Ether", "price_usd": 2.0},
+    ]
+    def merge(rows: list[dict]):
+        return copy_merge(
+            Session(),
+            Coin.__table__,
+            rows,
+            index_elements=["external_id"],
+            set_=lambda excluded: {"price_usd": excluded.price_usd},
+        )
+
+    await merge([])
+    assert statements == [] and copies == []
+
+    await merge(rows)
+    create, truncate, upsert = statements
+    assert create.startswith('CREATE TEMP TABLE IF NOT EXISTS "_stage_coins" ON COMMIT DROP')
+    assert '"external_id", "name", "price_usd" FROM "coins" WITH NO DATA' in create
+    assert truncate == 'TRUNCATE "_stage_coins"'
+    assert copies == [
+        {
+            "name": "_stage_coins",
+            "records": [("bitcoin", "Bitcoin", 1.0), ("ether", "Ether", 2.0)],
+            "columns": ["external_id", "name", "price_usd"],
+        }
+    ]
+    upsert = " ".join(upsert.split())
+    assert upsert.startswith("INSERT INTO coins (external_id, name, price_usd) SELECT")
+    assert "FROM _stage_coins ON CONFLICT (external_id) DO UPDATE SET price_usd = excluded.price_usd" in upsert
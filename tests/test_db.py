@@ -0,0 +1,162 @@
+async def test_sqlite_connections_get_pragmas(client):
+    from sqlalchemy import text
+
+    from app.db import engine
+
+    async with engine.connect() as conn:
+        pragmas = {
+            name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size")
+        }
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["mmap_size"] > 0
+
+
+async def test_pool_stats_report_checkouts_overflow_and_timeouts(tmp_path):
+    import pytest
+    from sqlalchemy import exc
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.db import InstrumentedQueuePool, PoolMonitor
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    monitor = PoolMonitor(engine)
+    try:
+        async with engine.connect(), engine.connect():
+            stats = monitor.stats()
+            assert (stats.checked_out, stats.overflow) == (2, 1)
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        stats = monitor.stats()
+        assert stats.checked_out == 0
+        assert (stats.checkouts, stats.timeouts) == (3, 1)
+        assert stats.wait_ms_max >= 50
+    finally:
+        await engine.dispose()
+
+
+async def test_db_pool_endpoint(client):
+    body = (await client.get("/health/db-pool")).json()
+    assert body["pool"] == "NullPool"
+    assert body["checked_out"] == 0
+
+
+def test_read_replicas_round_robin_and_ejection(tmp_path, monkeypatch):
+    from app import db
+
+    replicas = db.ReadReplicas(
+        [f"sqlite+aiosqlite:///{tmp_path / n}" for n in ("a.db", "b.db")], eject_seconds=30
+    )
+    assert [replicas.pick() for _ in range(3)] == [0, 1, 0]
+    replicas.eject(0)
+    assert [replicas.pick() for _ in range(2)] == [1, 1]
+    replicas.eject(1)
+    assert replicas.pick() is None  # everyone ejected: callers fall back to the primary
+
+    later = db.time.monotonic() + 31
+    monkeypatch.setattr(db.time, "monotonic", lambda: later)
+    assert {replicas.pick(), replicas.pick()} == {0, 1}
+    assert [s.ejections for s in replicas.status()] == [1, 1]
+
+
+async def _replica(tmp_path, name: str):
+    from datetime import datetime
+
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.models import Base, Coin
+
+    url = f"sqlite+aiosqlite:///{tmp_path / name}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Coin), [
+            {"id": 1, "external_id": "replica-coin", "name": "Replica", "symbol": "REP",
+             "market_cap_rank": 1, "price_usd": 1.0, "last_updated": datetime(2026, 1, 1)},
+        ])
+    await engine.dispose()
+    return url
+
+
+async def test_reads_route_to_replica_with_read_your_writes(
+    client, random_credentials, seed_coin, tmp_path, monkeypatch
+):
+    from app import db
+
+    coin_id = await seed_coin()
+    replicas = db.ReadReplicas([await _replica(tmp_path, "replica.db")], eject_seconds=30)
+    monkeypatch.setattr(db, "read_replicas", replicas)
+
+    coins = (await client.get("/coins", params={"limit": 10})).json()
+    assert [c["external_id"] for c in coins] == ["replica-coin"]
+    # The cached full listing is built from the primary, never a lagging replica.
+    assert [c["external_id"] for c in (await client.get("/coins")).json()] == ["bitcoin"]
+
+    register = await client.post("/auth/register", json={
+        "email": random_credentials["email"],
+        "password": random_credentials["password"],
+        "password_confirmation": random_credentials["password"],
+    })
+    headers = {"Authorization": f"Bearer {register.json()['access_token']}"}
+    await client.post("/portfolio", json={"coin_id": coin_id}, headers=headers)
+
+    # Just wrote: read from the primary, which has the new holding.
+    assert len((await client.get("/portfolio", headers=headers)).json()) == 1
+    db.recent_writes.clear()
+    # Otherwise the (lagging) replica answers.
+    assert (await client.get("/portfolio", headers=headers)).json() == []
+    await replicas.dispose()
+
+
+async def test_failing_replica_is_ejected(client, seed_coin, tmp_path, monkeypatch):
+    from app import db
+
+    await seed_coin()
+    broken = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    replicas = db.ReadReplicas([broken], eject_seconds=30)
+    monkeypatch.setattr(db, "read_replicas", replicas)
+
+    for _ in range(2):  # retried on the primary, then primary while it is out
+        coins = (await client.get("/coins", params={"limit": 10})).json()
+        assert [c["external_id"] for c in coins] == ["bitcoin"]
+        assert [(s.healthy, s.ejections) for s in replicas.status()] == [(False, 1)]
+
+
+async def test_replica_session_fails_over_on_every_read_method(client, seed_coin, tmp_path, monkeypatch):
+    from sqlalchemy import select
+
+    from app import db
+    from app.models import Coin
+
+    coin_id = await seed_coin()
+    broken = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+
+    async def external_ids(session):
+        return list(await session.scalars(select(Coin.external_id)))
+
+    async def get(session):
+        return [(await session.get(Coin, coin_id)).external_id]
+
+    async def stream(session):
+        result = await session.stream_scalars(select(Coin.external_id))
+        return [external_id async for external_id in result]
+
+    for read in (external_ids, get, stream):
+        replicas = db.ReadReplicas([broken], eject_seconds=30)
+        monkeypatch.setattr(db, "read_replicas", replicas)
+        async with db.SessionLocal() as primary, db.read_session(primary) as session:
+            assert isinstance(session, db.ReplicaSession)
+            assert await read(session) == ["bitcoin"], read.__name__
+            assert session.failed_over
+        assert [s.healthy for s in replicas.status()] == [False]
+        await replicas.dispose()
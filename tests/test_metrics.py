@@ -0,0 +1,84 @@
+import httpx
+import pytest
+
+
+def _samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    }
+
+
+def test_histogram_renders_cumulative_buckets():
+    from app.metrics import Histogram
+
+    histogram = Histogram("demo_seconds", "Demo.", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+
+    assert list(histogram.render()) == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 2',  # bounds are inclusive
+        'demo_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a\\"b"} 3.65',
+        'demo_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+async def test_requests_are_labelled_by_route_template(client, seed_coin):
+    coin_id = await seed_coin()
+    before = _samples((await client.get("/metrics")).text)
+    assert (await client.get(f"/coins/{coin_id}/history")).status_code == 200
+    assert (await client.get("/coins/999999/history")).status_code == 404
+    assert (await client.get("/no-such-page")).status_code == 404
+    await client.request("BREW", "/no-such-page")
+    await client.request("SPLAT", "/no-such-page")
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = _samples(response.text)
+
+    def delta(key: str) -> float:
+        return after.get(key, 0) - before.get(key, 0)
+
+    route = 'method="GET",route="/coins/{coin_id}/history"'
+    assert delta(f"http_requests_total{{{route},status=\"200\"}}") == 1
+    assert delta(f"http_requests_total{{{route},status=\"404\"}}") == 1
+    assert delta('http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    assert delta('http_requests_total{method="other",route="unmatched",status="404"}') == 2
+    assert not any("BREW" in key or "SPLAT" in key for key in after)
+    assert delta(f"http_request_duration_seconds_count{{{route}}}") == 2
+    assert after["http_requests_in_flight"] == 1  # the scrape itself
+    assert not any(f"/coins/{coin_id}/" in key for key in after)
+
+
+async def test_provider_and_upsert_metrics(client, fake_provider):
+    from app.db import SessionLocal
+    from app.metrics import coin_upsert_rows, provider_fetch_duration, provider_fetch_errors
+    from app.providers.coingecko import CoinGeckoProvider
+    from app.services.coin import build_coin_service
+
+    inserted = coin_upsert_rows.values.get(("inserted",), 0)
+    async with SessionLocal() as db:
+        provider = fake_provider({"bitcoin": 1.0, "ether": 2.0})
+        await build_coin_service(db, provider).refresh_from_provider()
+    assert coin_upsert_rows.values[("inserted",)] - inserted == 2
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        provider = CoinGeckoProvider(url="http://stub/markets", client=http)
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.fetch_page(1)
+    assert provider_fetch_errors.values[("coingecko", "HTTPStatusError")] >= 1
+
+    timed = provider_fetch_duration.series.get(("coingecko",))
+    fetched = sum(timed.counts) if timed else 0
+    empty = httpx.MockTransport(lambda _: httpx.Response(200, json=[]))
+    async with httpx.AsyncClient(transport=empty) as http:
+        await CoinGeckoProvider(url="http://stub/markets", client=http).fetch_page(1)
+    assert sum(provider_fetch_duration.series[("coingecko",)].counts) == fetched + 1
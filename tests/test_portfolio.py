@@ -65,6 +65,40 @@ async def test_remove_from_portfolio(client, auth_headers, seed_coin):
     assert listing.json() == []
 
 
+async def test_batch_add_and_remove_report_per_id(client, auth_headers, seed_coin):
+    btc = await seed_coin()
+    eth = await seed_coin("ethereum", "Ethereum", "ETH")
+    await client.post("/portfolio", json={"coin_id": btc}, headers=auth_headers)
+
+    added = await client.post(
+        "/portfolio/batch", json={"coin_ids": [eth, btc, 9999, eth]}, headers=auth_headers
+    )
+    assert added.status_code == 200
+    assert added.json()["results"] == [
+        {"coin_id": eth, "status": "added"},
+        {"coin_id": btc, "status": "already_in_portfolio"},
+        {"coin_id": 9999, "status": "coin_not_found"},
+    ]
+    listing = await client.get("/portfolio", headers=auth_headers)
+    assert sorted(item["coin"]["id"] for item in listing.json()) == [btc, eth]
+
+    removed = await client.request(
+        "DELETE", "/portfolio/batch", json={"coin_ids": [btc, 9999]}, headers=auth_headers
+    )
+    assert removed.status_code == 200
+    assert removed.json()["results"] == [
+        {"coin_id": btc, "status": "removed"},
+        {"coin_id": 9999, "status": "not_in_portfolio"},
+    ]
+    listing = await client.get("/portfolio", headers=auth_headers)
+    assert [item["coin"]["id"] for item in listing.json()] == [eth]
+
+    too_many = await client.post(
+        "/portfolio/batch", json={"coin_ids": list(range(1, 502))}, headers=auth_headers
+    )
+    assert too_many.status_code == 422
+
+
 async def test_remove_nonexistent_returns_404(client, auth_headers):
     response = await client.delete("/portfolio/12345", headers=auth_headers)
     assert response.status_code == 404
@@ -75,3 +109,175 @@ async def test_invalid_coin_id_validation(client, auth_headers):
         "/portfolio", json={"coin_id": 0}, headers=auth_headers
     )
     assert response.status_code == 422
+
+
+async def test_valuation_of_empty_portfolio(client, auth_headers):
+    response = await client.get("/portfolio/valuation", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_value_usd": 0.0,
+        "total_cost_basis_usd": 0.0,
+        "unrealized_pnl_usd": 0.0,
+        "positions": [],
+    }
+
+
+async def test_valuation_values_holdings_at_latest_price(client, auth_headers, seed_coin):
+    btc = await seed_coin()
+    eth = await seed_coin(external_id="ethereum", name="Ethereum", symbol="ETH")
+    await client.post(
+        "/portfolio",
+        json={"coin_id": btc, "quantity": 2, "cost_basis_usd": 60000},
+        headers=auth_headers,
+    )
+    await client.post(
+        "/portfolio",
+        json={"coin_id": eth, "quantity": 1, "cost_basis_usd": 40000},
+        headers=auth_headers,
+    )
+
+    body = (await client.get("/portfolio/valuation", headers=auth_headers)).json()
+    assert body["total_value_usd"] == 150000.0
+    assert body["total_cost_basis_usd"] == 100000.0
+    assert body["unrealized_pnl_usd"] == 50000.0
+
+    by_symbol = {p["symbol"]: p for p in body["positions"]}
+    assert by_symbol["BTC"]["value_usd"] == 100000.0
+    assert by_symbol["BTC"]["unrealized_pnl_usd"] == 40000.0
+    assert abs(by_symbol["BTC"]["allocation"] - 2 / 3) < 1e-9
+    assert abs(by_symbol["ETH"]["allocation"] - 1 / 3) < 1e-9
+
+
+async def test_update_holding(client, auth_headers, seed_coin):
+    coin_id = await seed_coin()
+    await client.post("/portfolio", json={"coin_id": coin_id}, headers=auth_headers)
+
+    response = await client.patch(
+        f"/portfolio/{coin_id}",
+        json={"quantity": 0.5, "cost_basis_usd": 20000},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0.5
+    assert response.json()["cost_basis_usd"] == 20000
+
+    missing = await client.patch(
+        "/portfolio/12345", json={"quantity": 1, "cost_basis_usd": 0}, headers=auth_headers
+    )
+    assert missing.status_code == 404
+    negative = await client.patch(
+        f"/portfolio/{coin_id}", json={"quantity": -1, "cost_basis_usd": 0}, headers=auth_headers
+    )
+    assert negative.status_code == 422
+
+
+async def test_performance_series_forward_fills_and_is_cached(client, auth_headers, seed_coin):
+    from datetime import datetime
+
+    from app.db import SessionLocal
+    from app.models import PricePoint
+
+    btc = await seed_coin()
+    eth = await seed_coin(external_id="ethereum", name="Ethereum", symbol="ETH")
+    await client.post(
+        "/portfolio",
+        json={"coin_id": btc, "quantity": 2, "cost_basis_usd": 100},
+        headers=auth_headers,
+    )
+    await client.post(
+        "/portfolio", json={"coin_id": eth, "quantity": 10}, headers=auth_headers
+    )
+    async with SessionLocal() as db:
+        db.add_all([
+            PricePoint(coin_id=btc, ts=datetime(2026, 5, 4, 12, 10), price_usd=100.0),
+            PricePoint(coin_id=btc, ts=datetime(2026, 5, 4, 14, 10), price_usd=130.0),
+            PricePoint(coin_id=eth, ts=datetime(2026, 5, 4, 13, 30), price_usd=5.0),
+        ])
+        await db.commit()
+
+    url = "/portfolio/performance"
+    params = {"from": "2026-05-04T11:00:00Z", "to": "2026-05-04T15:00:00Z", "step": "1h"}
+    response = await client.get(url, params=params, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["step_seconds"] == 3600
+    assert body["total_cost_basis_usd"] == 100
+    # 11:00 has no price yet; ETH is unknown until 13:00, BTC carries forward.
+    assert [(p["ts"], p["value_usd"]) for p in body["points"]] == [
+        ("2026-05-04T12:00:00", 200.0),
+        ("2026-05-04T13:00:00", 250.0),
+        ("2026-05-04T14:00:00", 310.0),
+    ]
+    assert body["points"][-1]["unrealized_pnl_usd"] == 210.0
+
+    # Served from cache until prices or holdings change.
+    async with SessionLocal() as db:
+        db.add(PricePoint(coin_id=eth, ts=datetime(2026, 5, 4, 14, 20), price_usd=7.0))
+        await db.commit()
+    again = await client.get(url, params=params, headers=auth_headers)
+    assert again.json() == body
+
+    await client.patch(
+        f"/portfolio/{btc}", json={"quantity": 1, "cost_basis_usd": 100}, headers=auth_headers
+    )
+    updated = (await client.get(url, params=params, headers=auth_headers)).json()
+    assert updated["points"][-1]["value_usd"] == 130.0 + 10 * 7.0
+
+
+async def test_performance_series_carries_in_prices_from_before_the_range(
+    client, auth_headers, seed_coin
+):
+    from datetime import datetime
+
+    from app.db import SessionLocal
+    from app.models import PricePoint
+
+    btc = await seed_coin()
+    eth = await seed_coin(external_id="ethereum", name="Ethereum", symbol="ETH")
+    for coin_id in (btc, eth):
+        await client.post(
+            "/portfolio", json={"coin_id": coin_id, "quantity": 1}, headers=auth_headers
+        )
+    async with SessionLocal() as db:
+        db.add_all([
+            PricePoint(coin_id=btc, ts=datetime(2026, 5, 4, 9, 0), price_usd=90.0),
+            PricePoint(coin_id=btc, ts=datetime(2026, 5, 4, 12, 30), price_usd=100.0),
+            # ETH last moved before the range and has no point inside it.
+            PricePoint(coin_id=eth, ts=datetime(2026, 5, 4, 8, 0), price_usd=4.0),
+            PricePoint(coin_id=eth, ts=datetime(2026, 5, 4, 10, 0), price_usd=5.0),
+        ])
+        await db.commit()
+
+    params = {"from": "2026-05-04T11:00:00Z", "to": "2026-05-04T14:00:00Z", "step": "1h"}
+    body = (await client.get("/portfolio/performance", params=params, headers=auth_headers)).json()
+    assert [(p["ts"], p["value_usd"]) for p in body["points"]] == [
+        ("2026-05-04T11:00:00", 95.0),
+        ("2026-05-04T12:00:00", 105.0),
+        ("2026-05-04T13:00:00", 105.0),
+    ]
+
+
+async def test_rolling_performance_window_is_not_cached(client, auth_headers, seed_coin):
+    from datetime import datetime, timedelta, timezone
+
+    from app.cache import performance_cache
+    from app.db import SessionLocal
+    from app.models import PricePoint
+
+    btc = await seed_coin()
+    await client.post("/portfolio", json={"coin_id": btc, "quantity": 1}, headers=auth_headers)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async def latest_value() -> float:
+        body = (await client.get("/portfolio/performance", headers=auth_headers)).json()
+        return body["points"][-1]["value_usd"]
+
+    async with SessionLocal() as db:
+        db.add(PricePoint(coin_id=btc, ts=now - timedelta(hours=2), price_usd=100.0))
+        await db.commit()
+    assert await latest_value() == 100.0
+    async with SessionLocal() as db:
+        db.add(PricePoint(coin_id=btc, ts=now - timedelta(minutes=1), price_usd=120.0))
+        await db.commit()
+    assert await latest_value() == 120.0
+    assert len(performance_cache._entries) == 0
@@ -0,0 +1,333 @@
+import httpx
+
+
+COINGECKO_ITEM = {
+    "id": "bitcoin",
+    "name": "Bitcoin",
+    "symbol": "btc",
+    "market_cap_rank": 1,
+    "current_price": 50000,
+    "image": "https://example.com/btc.png",
+    "last_updated": "2026-05-04T12:00:00.000Z",
+}
+
+COINCAP_ITEM = {
+    "id": "ethereum",
+    "name": "Ethereum",
+    "symbol": "eth",
+    "rank": "2",
+    "priceUsd": "3000.5",
+    "time": 1714824000000,
+}
+
+
+async def test_coingecko_reuses_injected_client():
+    from app.providers.coingecko import CoinGeckoProvider
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=[COINGECKO_ITEM])
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        provider = CoinGeckoProvider(url="http://stub/markets", client=client)
+        first = await provider.fetch_market_coins()
+        await provider.fetch_market_coins()
+        assert not client.is_closed
+
+    assert len(calls) == 2
+    assert first[0].external_id == "bitcoin"
+    assert first[0].symbol == "BTC"
+    assert first[0].price_usd == 50000.0
+
+
+async def test_coincap_sends_bearer_through_injected_client():
+    from app.providers.coincap import CoinCapProvider
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"] == "Bearer k"
+        return httpx.Response(200, json={"data": [COINCAP_ITEM]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        provider = CoinCapProvider(api_key="k", url="http://stub/assets", client=client)
+        coins = await provider.fetch_market_coins()
+
+    assert coins[0].external_id == "ethereum"
+    assert coins[0].market_cap_rank == 2
+    assert coins[0].price_usd == 3000.5
+
+
+class _ScriptedProvider:
+    id_scheme = "scripted"
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception | None = None) -> None:
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch_market_coins(self):
+        import asyncio
+
+        from app.providers.base import MarketCoin
+
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return [MarketCoin(self.name, self.name, "X", 1, 1.0, None, COINGECKO_ITEM["last_updated"])]
+
+
+def _hedged(*providers, **kwargs):
+    from app.providers.hedged import HedgedProvider, ProviderStatsRegistry
+
+    kwargs.setdefault("initial_delay", 0.05)
+    kwargs.setdefault("min_delay", 0.01)
+    return HedgedProvider(list(providers), stats=ProviderStatsRegistry(20), **kwargs)
+
+
+def test_hedging_only_mixes_endpoints_of_one_api(monkeypatch):
+    import pytest
+
+    from app.config import settings
+    from app.providers.coincap import CoinCapProvider
+    from app.providers.coingecko import CoinGeckoProvider
+    from app.providers.factory import get_price_provider
+    from app.providers.hedged import HedgedProvider
+
+    with pytest.raises(ValueError):  # "xrp" on one is "ripple" on the other
+        HedgedProvider([CoinCapProvider(api_key="k"), CoinGeckoProvider()])
+    with pytest.raises(ValueError):  # stats are kept by name
+        HedgedProvider([CoinGeckoProvider(), CoinGeckoProvider(url="http://mirror.stub/markets")])
+
+    client = httpx.AsyncClient()
+    monkeypatch.setattr(settings, "COINCAP_API_KEY", "k")
+    monkeypatch.setattr(settings, "PROVIDER_HEDGE_URLS", [])
+    assert isinstance(get_price_provider(client), CoinCapProvider)
+
+    monkeypatch.setattr(settings, "PROVIDER_HEDGE_URLS", ["http://eu.coincap.stub/assets"])
+    hedged = get_price_provider(client)
+    assert [type(p) for p in hedged.providers] == [CoinCapProvider, CoinCapProvider]
+    assert hedged.name == "coincap+coincap@eu.coincap.stub"
+    assert hedged.providers[1].url == "http://eu.coincap.stub/assets"
+
+
+async def test_hedged_fails_over_immediately_on_error():
+    primary = _ScriptedProvider("a", error=httpx.ConnectError("down"))
+    backup = _ScriptedProvider("b")
+    provider = _hedged(primary, backup, initial_delay=10)
+
+    coins = await provider.fetch_market_coins()
+
+    assert coins[0].external_id == "b"
+    assert provider.name == "b"
+    assert provider.stats.get("a").errors == 1
+    # The failing provider drops behind the healthy one.
+    assert [p.name for p in provider.preference()] == ["b", "a"]
+
+
+async def test_hedged_races_a_slow_primary_and_cancels_the_loser():
+    primary = _ScriptedProvider("a", delay=5)
+    backup = _ScriptedProvider("b", delay=0.01)
+    provider = _hedged(primary, backup)
+
+    coins = await provider.fetch_market_coins()
+
+    assert coins[0].external_id == "b"
+    assert primary.calls == backup.calls == 1
+    assert primary.cancelled == 1
+    # Cancellation is not counted against the slow provider.
+    assert provider.stats.get("a").requests == 0
+
+
+def test_hedged_preference_tolerates_noise_and_forgets_old_errors(monkeypatch):
+    from app.providers import hedged
+
+    primary, backup = _ScriptedProvider("a"), _ScriptedProvider("b")
+    provider = _hedged(primary, backup, error_tolerance=0.1)
+    for _ in range(19):
+        provider.stats.get("a").record(0.2, ok=True)
+        provider.stats.get("b").record(0.2, ok=True)
+    provider.stats.get("a").record(0.2, ok=False)  # 5% errors: within tolerance
+    assert [p.name for p in provider.preference()] == ["a", "b"]
+
+    for _ in range(10):
+        provider.stats.get("a").record(0.2, ok=False)
+    assert [p.name for p in provider.preference()] == ["b", "a"]
+
+    # Past the max age the failures are forgotten and "a" is tried first again.
+    now = hedged.time.monotonic()
+    monkeypatch.setattr(hedged.time, "monotonic", lambda: now + provider.stats.max_age + 1)
+    assert [p.name for p in provider.preference()] == ["a", "b"]
+
+
+async def test_hedged_logs_a_loser_that_fails_instead_of_cancelling(caplog):
+    import asyncio
+
+    class Stubborn(_ScriptedProvider):
+        async def fetch_market_coins(self):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise RuntimeError("connection reset while closing")
+
+    provider = _hedged(Stubborn("a"), _ScriptedProvider("b", delay=0.01))
+    with caplog.at_level("WARNING", logger="app.providers.hedged"):
+        coins = await provider.fetch_market_coins()
+
+    assert coins[0].external_id == "b"
+    assert "a failed after losing the race" in caplog.text
+
+
+async def test_hedged_raises_http_error_when_all_fail():
+    import pytest
+
+    provider = _hedged(
+        _ScriptedProvider("a", error=httpx.ReadTimeout("slow")),
+        _ScriptedProvider("b", error=ValueError("bad payload")),
+    )
+    with pytest.raises(httpx.HTTPError, match="a: .*b: "):
+        await provider.fetch_market_coins()
+
+
+async def test_coingecko_fetches_pages_concurrently():
+    from app.providers.coingecko import CoinGeckoProvider
+
+    pages = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page, per_page = int(request.url.params["page"]), int(request.url.params["per_page"])
+        pages.append(page)
+        start = (page - 1) * per_page
+        return httpx.Response(
+            200, json=[{**COINGECKO_ITEM, "id": f"coin-{i}"} for i in range(start, start + per_page)]
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        provider = CoinGeckoProvider(url="http://stub/markets", client=client, total=1000)
+        batches = [batch async for batch in provider.iter_market_batches()]
+
+    assert sorted(pages) == [1, 2, 3, 4]
+    assert [len(b) for b in batches] == [250] * 4
+    assert len({c.external_id for b in batches for c in b}) == 1000
+
+
+async def test_coingecko_cuts_the_last_page_at_the_market_size():
+    from app.providers.coingecko import CoinGeckoProvider
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page, per_page = int(request.url.params["page"]), int(request.url.params["per_page"])
+        start = (page - 1) * per_page
+        return httpx.Response(
+            200, json=[{**COINGECKO_ITEM, "id": f"coin-{i}"} for i in range(start, start + per_page)]
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        # Own host: host budgets are process-wide and bound to the first event loop.
+        provider = CoinGeckoProvider(url="http://last-page.stub/markets", client=client, total=300)
+        coins = await provider.fetch_market_coins()
+
+    assert len(coins) == 300
+    assert {c.external_id for c in coins} == {f"coin-{i}" for i in range(300)}
+
+
+async def test_hedged_provider_streams_hedged_pages():
+    from app.providers.base import MarketCoin
+    from app.providers.paging import market_batches
+
+    class Paged(_ScriptedProvider):
+        total, page_size = 6, 2
+
+        def __init__(self, name: str, failing_pages=()) -> None:
+            super().__init__(name)
+            self.failing_pages = set(failing_pages)
+            self.pages = []
+
+        async def fetch_page(self, page: int):
+            self.pages.append(page)
+            if page in self.failing_pages:
+                raise httpx.ConnectError("down")
+            first = (page - 1) * self.page_size
+            return [
+                MarketCoin(f"coin-{i}", self.name, "X", i, 1.0, None, COINGECKO_ITEM["last_updated"])
+                for i in range(first, first + self.page_size)
+            ]
+
+    primary, backup = Paged("a", failing_pages={2}), Paged("b")
+    provider = _hedged(primary, backup, initial_delay=10)
+
+    batches = [batch async for batch in market_batches(provider)]
+
+    assert primary.calls == backup.calls == 0  # never the whole market at once
+    assert sorted(primary.pages) == [1, 2, 3]
+    assert backup.pages == [2]
+    assert sorted(c.external_id for b in batches for c in b) == [f"coin-{i}" for i in range(6)]
+    assert len(batches) == 3
+
+
+async def test_fetch_pages_retries_only_the_failed_page():
+    import pytest
+
+    from app.providers.paging import fetch_pages
+
+    attempts: dict[int, int] = {}
+
+    async def fetch_page(page: int):
+        attempts[page] = attempts.get(page, 0) + 1
+        request = httpx.Request("GET", "http://stub")
+        if page == 2 and attempts[page] == 1:
+            raise httpx.HTTPStatusError("busy", request=request, response=httpx.Response(503))
+        if page == 3:
+            raise httpx.HTTPStatusError("gone", request=request, response=httpx.Response(404))
+        return [page]
+
+    batches = [b async for b in fetch_pages(fetch_page, 2, retries=2, backoff=0)]
+    assert sorted(batches) == [[1], [2]]
+    assert attempts == {1: 1, 2: 2}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        async for _ in fetch_pages(fetch_page, 3, retries=2, backoff=0):
+            pass
+    assert attempts[3] == 1  # 4xx other than 429 is not retried
+
+
+def test_json_array_items_handles_any_chunking():
+    import json
+
+    import pytest
+
+    from app.providers.streaming import JsonArrayItems
+
+    items = [
+        {"id": "a", "name": 'brace } and bracket ] in "quotes" \\', "nested": {"x": [1, {"y": 2}]}},
+        {"id": "b", "name": "unicode é中", "tags": []},
+        {"id": "c", "name": "", "n": None},
+    ]
+    for key, document in ((None, items), ("data", {"data": items, "timestamp": 1})):
+        body = json.dumps(document, ensure_ascii=False).encode()
+        for size in (1, 2, 7, len(body)):
+            stream = JsonArrayItems(key)
+            found = []
+            for i in range(0, len(body), size):
+                found.extend(stream.feed(body[i:i + size]))
+            stream.close()
+            assert found == items, (key, size)
+
+    truncated = JsonArrayItems()
+    truncated.feed(b'[{"id": "a"}, {"id"')
+    with pytest.raises(ValueError):
+        truncated.close()
+
+    missing = JsonArrayItems("data")
+    assert missing.feed(b'{"error": "rate limited", "timestamp": 1}') == []
+    missing.close()  # no "data" key: no items, as with .get("data", [])
+    cut_off = JsonArrayItems("data")
+    cut_off.feed(b'{"timestamp": 1, "da')
+    with pytest.raises(ValueError):
+        cut_off.close()
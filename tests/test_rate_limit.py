@@ -0,0 +1,105 @@
+import pytest
+
+
+def test_parse_rate():
+    from app.rate_limit import parse_rate
+
+    assert parse_rate("5/minute") == (5, 60.0)
+    assert parse_rate("100/hours") == (100, 3600.0)
+    with pytest.raises(ValueError):
+        parse_rate("0/minute")
+    with pytest.raises(ValueError):
+        parse_rate("5/fortnight")
+
+
+def test_local_buckets_refill_and_retry_after():
+    from app.rate_limit import LocalBuckets
+
+    buckets = LocalBuckets(max_keys=10)
+    assert [buckets.hit_now("k", 3, 60, 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.hit_now("k", 3, 60, 0.0) == pytest.approx(20.0)  # one token per 20s
+    assert buckets.hit_now("k", 3, 60, 15.0) == pytest.approx(5.0)
+    assert buckets.hit_now("k", 3, 60, 20.0) == 0.0
+    assert buckets.hit_now("other", 3, 60, 20.0) == 0.0  # buckets are per key
+
+
+def test_local_buckets_stay_bounded():
+    from app.rate_limit import LocalBuckets
+
+    buckets = LocalBuckets(max_keys=100)
+    for i in range(1000):
+        buckets.hit_now(f"idle-{i}", 5, 1, float(i))  # refilled long before they are evicted
+    assert len(buckets) == 100
+    assert buckets.evicted == 0
+
+    for i in range(200):
+        buckets.hit_now(f"busy-{i}", 5, 60, 2000.0)
+    assert len(buckets) == 100
+    assert buckets.evicted == 100  # keys still owing tokens, forgotten early
+
+
+def test_identity_prefers_the_token_user():
+    from starlette.requests import Request
+
+    from app.rate_limit import identity
+    from app.security import create_access_token
+
+    def request(headers: dict[str, str]) -> Request:
+        raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "headers": raw, "client": ("10.0.0.7", 1234)})
+
+    token = create_access_token(user_id=42, email="a@example.com")
+    assert identity(request({"Authorization": f"Bearer {token}"})) == "user:42"
+    assert identity(request({"Authorization": "Bearer not-a-jwt"})) == "ip:10.0.0.7"
+    assert identity(request({})) == "ip:10.0.0.7"
+
+
+async def test_limited_route_returns_429_with_retry_after(client, random_credentials, monkeypatch):
+    from app.rate_limit import LocalBuckets, limiter
+
+    monkeypatch.setattr(limiter, "enabled", True)
+    monkeypatch.setattr(limiter, "storage", LocalBuckets(max_keys=100))
+    body = {"email": random_credentials["email"], "password": "wrong-password"}
+
+    statuses = [(await client.post("/auth/login", json=body)).status_code for _ in range(5)]
+    assert statuses == [401] * 5
+    limited = await client.post("/auth/login", json=body)
+    assert limited.status_code == 429
+    assert limited.json()["detail"] == "Rate limit exceeded: 5/minute"
+    assert int(limited.headers["Retry-After"]) == 12
+    # A different route has its own bucket.
+    assert (await client.post("/auth/refresh", json={"refresh_token": "x"})).status_code == 401
+
+
+async def test_authenticated_routes_are_limited_per_user(client, fake_provider, monkeypatch):
+    from app.deps import get_refresher
+    from app.main import app
+    from app.rate_limit import LocalBuckets, limiter
+    from app.security import create_access_token
+    from app.services.refresher import PriceRefresher
+
+    monkeypatch.setattr(limiter, "enabled", True)
+    monkeypatch.setattr(limiter, "storage", LocalBuckets(max_keys=100))
+    refresher = PriceRefresher(provider_factory=lambda: fake_provider())
+    monkeypatch.setattr(refresher, "nudge", lambda: None)
+    app.dependency_overrides[get_refresher] = lambda: refresher
+
+    def as_user(user_id: int) -> dict[str, str]:
+        token = create_access_token(user_id=user_id, email=f"u{user_id}@example.com")
+        return {"Authorization": f"Bearer {token}"}
+
+    try:
+        statuses = [
+            (await client.post("/coins/refresh", headers=as_user(1))).status_code for _ in range(7)
+        ]
+        assert statuses == [202] * 6 + [429]
+        # Same client address, different user: a bucket of its own.
+        assert (await client.post("/coins/refresh", headers=as_user(2))).status_code == 202
+        assert (await client.post("/coins/refresh")).status_code == 202
+    finally:
+        app.dependency_overrides.pop(get_refresher, None)
+
+    # Router-wide budgets count every route under the prefix.
+    statuses = {(await client.get("/alerts", headers=as_user(3))).status_code for _ in range(60)}
+    assert statuses == {200}
+    assert (await client.delete("/alerts/1", headers=as_user(3))).status_code == 429
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime
+
+TS = datetime(2026, 5, 4, 12, 0)
+
+
+async def test_broadcaster_filters_and_drops_oldest():
+    from app.broadcast import PriceBroadcaster
+
+    broadcaster = PriceBroadcaster(queue_size=3)
+    everything = broadcaster.subscribe()
+    only_btc = broadcaster.subscribe([1])
+
+    broadcaster.publish([(1, TS, 100.0), (2, TS, 5.0)])
+    broadcaster.publish([(1, TS, 100.0)])  # unchanged price: not pushed
+    broadcaster.publish([(2, TS, 6.0), (2, TS, 7.0), (2, TS, 8.0)])
+
+    updates, dropped = await everything.next_batch()
+    assert [(u.coin_id, u.price_usd) for u in updates] == [(2, 6.0), (2, 7.0), (2, 8.0)]
+    assert dropped == 2
+    updates, dropped = await only_btc.next_batch()
+    assert [(u.coin_id, u.price_usd) for u in updates] == [(1, 100.0)]
+    assert dropped == 0
+
+    broadcaster.unsubscribe(everything)
+    broadcaster.unsubscribe(only_btc)
+    assert broadcaster.subscribers == 0
+
+
+async def _wait_for_subscriber(broadcaster) -> None:
+    for _ in range(100):
+        if broadcaster.subscribers:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("stream never subscribed")
+
+
+def _scope(kind: str, query: bytes) -> dict:
+    return {
+        "type": kind,
+        "path": "/coins/stream",
+        "raw_path": b"/coins/stream",
+        "query_string": query,
+        "headers": [],
+        "scheme": "ws" if kind == "websocket" else "http",
+        "method": "GET",
+        "http_version": "1.1",
+        "server": ("test", 80),
+        "client": ("test", 1234),
+        "root_path": "",
+        "subprotocols": [],
+    }
+
+
+async def test_sse_stream_pushes_price_changes(client):
+    from app.broadcast import price_broadcaster
+    from app.main import app
+
+    disconnected = asyncio.Event()
+    bodies: list[bytes] = []
+    got_prices = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers = dict(message["headers"])
+            assert headers[b"content-type"].startswith(b"text/event-stream")
+        elif message.get("body"):
+            bodies.append(message["body"])
+            if message["body"].startswith(b"event: prices"):
+                got_prices.set()
+
+    task = asyncio.create_task(app(_scope("http", b"coin_ids=1"), receive, send))
+    await _wait_for_subscriber(price_broadcaster)
+    price_broadcaster.publish([(1, TS, 100.0), (2, TS, 5.0)])
+    await asyncio.wait_for(got_prices.wait(), 2)
+    disconnected.set()
+    await asyncio.wait_for(task, 2)
+
+    event = bodies[-1].decode()
+    payload = json.loads(event.split("data: ", 1)[1])
+    assert payload["dropped"] == 0
+    assert [p["coin_id"] for p in payload["prices"]] == [1]
+    assert price_broadcaster.subscribers == 0
+
+
+async def test_websocket_stream_pushes_price_changes(client):
+    from app.broadcast import price_broadcaster
+    from app.main import app
+
+    inbox: asyncio.Queue = asyncio.Queue()
+    sent: asyncio.Queue = asyncio.Queue()
+    await inbox.put({"type": "websocket.connect"})
+
+    async def receive():
+        return await inbox.get()
+
+    async def send(message):
+        await sent.put(message)
+
+    task = asyncio.create_task(app(_scope("websocket", b""), receive, send))
+    assert (await asyncio.wait_for(sent.get(), 2))["type"] == "websocket.accept"
+    await _wait_for_subscriber(price_broadcaster)
+
+    price_broadcaster.publish([(1, TS, 100.0), (2, TS, 5.0)])
+    frame = await asyncio.wait_for(sent.get(), 2)
+    payload = json.loads(frame["text"])
+    assert [p["coin_id"] for p in payload["prices"]] == [1, 2]
+
+    await inbox.put({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait_for(task, 2)
+    assert price_broadcaster.subscribers == 0
+
+
+async def test_refresh_publishes_committed_price_changes(client, fake_provider):
+    from app.broadcast import price_broadcaster
+    from app.db import SessionLocal
+    from app.services.coin import build_coin_service, refresh_flight
+
+    provider = fake_provider({"bitcoin": 50000.0, "ethereum": 3000.0})
+    subscription = price_broadcaster.subscribe()
+    try:
+        async with SessionLocal() as db:
+            await build_coin_service(db, provider).refresh_from_provider()
+        updates, _ = await asyncio.wait_for(subscription.next_batch(), 1)
+        assert sorted(u.price_usd for u in updates) == [3000.0, 50000.0]
+
+        refresh_flight.reset()
+        provider.prices["bitcoin"] = 51000.0
+        async with SessionLocal() as db:
+            await build_coin_service(db, provider).refresh_from_provider()
+        updates, _ = await asyncio.wait_for(subscription.next_batch(), 1)
+        assert [u.price_usd for u in updates] == [51000.0]
+    finally:
+        price_broadcaster.unsubscribe(subscription)